@@ -3,6 +3,7 @@ SAMSUM Center - Samsung E-commerce Application
 Clean Architecture Implementation
 """
 from urllib.parse import urlparse, parse_qs, unquote
+import click
 from flask import Flask, render_template, request, session, url_for
 from config import SECRET_KEY
 from src.container import container
@@ -11,15 +12,25 @@ from src.container import container
 app = Flask(__name__)
 app.secret_key = SECRET_KEY
 
+# Commit the per-request database transaction before each response; release it on teardown
+container.unit_of_work.init_app(app)
+
 # Get controllers from DI container
 user_controller = container.user_controller
 product_controller = container.product_controller
 order_controller = container.order_controller
 
 # Get use cases for home page
-get_all_products = container.get_all_products_use_case
+get_home_page = container.get_home_page_use_case
 get_all_categories = container.get_all_categories_use_case
 
+# Load the category cache before the first request
+container.category_repository.warm()
+
+# Build the catalog indexes in the background once the server takes requests
+# (not at import, so CLI commands never start the thread)
+app.before_request(container.catalog_refresher.start)
+
 
 # ============================================
 # HOME & PUBLIC ROUTES
@@ -27,10 +38,9 @@ get_all_categories = container.get_all_categories_use_case
 
 @app.route('/')
 def index():
-    """Home page with featured products"""
-    products = get_all_products.execute()
-    categories = get_all_categories.execute()
-    return render_template('index.html', products=products[:6], categories=categories)
+    """Home page with featured products (cached view model)"""
+    home = get_home_page.execute()
+    return render_template('index.html', products=home.featured_products, categories=home.categories)
 
 
 # ============================================
@@ -83,6 +93,18 @@ def search_products():
     return product_controller.search_products()
 
 
+@app.route('/api/search/suggest')
+def suggest_products():
+    """Search-as-you-type suggestions (JSON)"""
+    return product_controller.suggest_products()
+
+
+@app.route('/api/chatbot/recommend')
+def chatbot_recommend():
+    """Chatbot product recommendations (JSON)"""
+    return product_controller.recommend_products()
+
+
 # ============================================
 # CART & ORDER ROUTES
 # ============================================
@@ -147,6 +169,18 @@ def admin_products():
     return product_controller.admin_list_products()
 
 
+@app.route('/admin/products/data')
+def admin_products_data():
+    """Admin API: product grid page"""
+    return product_controller.admin_products_data()
+
+
+@app.route('/admin/products/bulk', methods=['POST'])
+def admin_bulk_products():
+    """Admin API: bulk product action"""
+    return product_controller.admin_bulk_products()
+
+
 @app.route('/admin/product/add', methods=['GET', 'POST'])
 def admin_add_product():
     """Admin: Add product"""
@@ -191,10 +225,35 @@ def admin_update_order_status(order_id):
 # TEMPLATE CONTEXT
 # ============================================
 
+class LazyList:
+    """List-like proxy that only calls its loader when a template touches it"""
+
+    def __init__(self, loader):
+        self._loader = loader
+        self._items = None
+
+    def _load(self):
+        if self._items is None:
+            self._items = self._loader()
+        return self._items
+
+    def __iter__(self):
+        return iter(self._load())
+
+    def __len__(self):
+        return len(self._load())
+
+    def __bool__(self):
+        return bool(self._load())
+
+    def __getitem__(self, index):
+        return self._load()[index]
+
+
 @app.context_processor
 def inject_categories():
-    """Inject categories into all templates"""
-    categories = get_all_categories.execute()
+    """Inject categories into all templates (fetched only if a template uses them)"""
+    categories = LazyList(get_all_categories.execute)
 
     def resolve_image_src(image_value):
         """Resolve image source for both external URL and static image filename."""
@@ -235,6 +294,89 @@ def internal_error(error):
     return render_template('500.html'), 500
 
 
+# ============================================
+# BATCH JOBS (flask --app app <command>)
+# ============================================
+
+# Run outside an app context so each batch commits immediately instead of
+# waiting for a request teardown that never comes
+@app.cli.command('copurchase', with_appcontext=False)
+@click.option('--rebuild', is_flag=True, help='Drop all counts and re-mine every order.')
+def copurchase_command(rebuild):
+    """Mine "bought together" associations from orders placed since the last run"""
+    stats = container.copurchase_job.run(rebuild=rebuild, log=click.echo)
+    click.echo(f"Orders: {stats['orders']}, pairs: {stats['pairs']}, products refreshed: {stats['products']}")
+
+
+@app.cli.command('order-summaries', with_appcontext=False)
+def order_summaries_command():
+    """Refill the order history projection from orders (repair; `migrate` creates it)"""
+    count = container.order_repository.rebuild_summaries()
+    click.echo(f"Order summaries: {count}")
+
+
+@app.cli.command('migrate', with_appcontext=False)
+@click.option('--status', 'show_status', is_flag=True, help='List applied and pending versions only.')
+@click.option('--target', type=int, default=None, help='Stop after this version.')
+def migrate_command(show_status, target):
+    """Create or upgrade the schema and its indexes; run before every deploy (safe to re-run)"""
+    runner = container.migration_runner
+    try:
+        if show_status:
+            applied = set(runner.applied_versions())
+            for migration in runner.migrations:
+                state = 'applied' if migration.version in applied else 'pending'
+                click.echo(f"{migration.version:03d}_{migration.name}: {state}")
+            return
+        applied = runner.migrate(target=target, log=click.echo)
+    except Exception as e:
+        # Non-zero exit so a deploy script stops here
+        raise click.ClickException(f"Migration failed: {e}")
+    click.echo(f"Applied: {', '.join(f'{v:03d}' for v in applied)}" if applied else "Schema is up to date")
+
+
+@app.cli.command('query-plans', with_appcontext=False)
+@click.option('--seed', is_flag=True, help='Migrate and fill an EMPTY local database with synthetic data first.')
+@click.option('--verbose', '-v', is_flag=True, help='Print every statement, not only regressions.')
+def query_plans_command(seed, verbose):
+    """EXPLAIN every repository query; exits non-zero when an indexed query degrades to a scan"""
+    checker = container.query_plan_checker
+    try:
+        if seed:
+            container.migration_runner.migrate(log=click.echo)
+            checker.seed(log=click.echo)
+        pending = container.migration_runner.pending()
+        if pending:
+            raise click.ClickException(
+                f"Unapplied migrations ({', '.join(f'{m.version:03d}' for m in pending)}); run `migrate` first"
+            )
+        report = checker.run()
+    except click.ClickException:
+        raise
+    except Exception as e:
+        raise click.ClickException(f"Query plan check failed: {e}")
+
+    for statement in report.statements:
+        if not verbose and not statement.problems:
+            continue
+        state = 'FAIL' if statement.problems else 'ok'
+        click.echo(f"[{state}] {statement.case}: {statement.sql[:100]}")
+        for row in statement.rows:
+            allowed = ' (allowed scan)' if row.table in statement.allowed_scans else ''
+            click.echo(f"       {row.table}: {row.access} key={row.key} rows~{row.rows} {row.extra}{allowed}")
+        for problem in statement.problems:
+            click.echo(f"       -> {problem}")
+    for method in report.unchecked:
+        click.echo(f"[FAIL] {method}: repository method has no plan case")
+    for error in report.errors:
+        click.echo(f"[FAIL] {error}")
+
+    click.echo(f"Statements: {len(report.statements)}, regressions: {len(report.failures)}, "
+               f"uncovered methods: {len(report.unchecked)}, errors: {len(report.errors)}")
+    if not report.ok:
+        raise SystemExit(1)
+
+
 # ============================================
 # RUN APPLICATION
 # ============================================
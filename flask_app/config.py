@@ -11,6 +11,47 @@ MYSQL_CONFIG = {
     'autocommit': True
 }
 
+# MySQL Connection Pool - dùng chung cho tất cả repository
+MYSQL_POOL_CONFIG = {
+    'pool_size': 10,             # Số kết nối tối đa
+    'max_lifetime': 1800,        # Giây - đóng và mở lại kết nối sau thời gian này
+    'health_check_after': 30,    # Giây nhàn rỗi trước khi ping kiểm tra kết nối
+    'checkout_timeout': 10       # Giây chờ kết nối rảnh trước khi báo lỗi
+}
+
+# Cache sản phẩm trong bộ nhớ (LRU + TTL)
+PRODUCT_CACHE_CONFIG = {
+    'max_entries': 2048,   # Số mục tối đa trước khi loại bỏ mục ít dùng nhất
+    'ttl': 300             # Giây - thời gian sống của mỗi mục
+}
+
+# Cache danh mục (giây) - danh mục hiếm khi thay đổi
+CATEGORY_CACHE_TTL = 3600
+
+# Tìm kiếm trong bộ nhớ - xây lại toàn bộ chỉ mục sau mỗi khoảng (giây)
+SEARCH_INDEX_REBUILD_INTERVAL = 600
+
+# Xếp hạng bán chạy - số ngày bán hàng gần nhất được tính
+SALES_RANKING_WINDOW_DAYS = 30
+
+# Cache kết quả tìm kiếm (theo truy vấn đã chuẩn hóa)
+SEARCH_CACHE_CONFIG = {
+    'max_entries': 1024,
+    'ttl': 300
+}
+
+# Gợi ý "thường được mua cùng" - job chạy định kỳ: flask --app app copurchase
+COPURCHASE_CONFIG = {
+    'top_k': 8,            # Số sản phẩm liên quan lưu cho mỗi sản phẩm
+    'min_pair_count': 1,   # Số đơn tối thiểu có cả hai sản phẩm
+    'batch_size': 500      # Số đơn đọc mỗi lượt
+}
+ASSOCIATION_CACHE_TTL = 600
+
+# Trang chủ - số sản phẩm nổi bật và thời gian cache (giây)
+FEATURED_PRODUCTS_LIMIT = 6
+HOMEPAGE_CACHE_TTL = 60
+
 # Flask Secret Key
 SECRET_KEY = 'your-secret-key-here-change-in-production'
 
@@ -6,12 +6,20 @@ from .user_use_cases import (
 )
 from .product_use_cases import (
     GetAllProductsUseCase,
+    FilterProductsUseCase,
+    GetFeaturedProductsUseCase,
     GetProductByIdUseCase,
+    GetProductsByIdsUseCase,
+    GetSimilarProductsUseCase,
+    GetBoughtTogetherUseCase,
     GetProductsByCategoryUseCase,
     SearchProductsUseCase,
+    SuggestProductsUseCase,
+    RecommendProductsUseCase,
     CreateProductUseCase,
     UpdateProductUseCase,
-    DeleteProductUseCase
+    DeleteProductUseCase,
+    BulkUpdateProductsUseCase
 )
 from .order_use_cases import (
     CreateOrderUseCase,
@@ -25,6 +33,10 @@ from .category_use_cases import (
     GetAllCategoriesUseCase,
     GetCategoryByIdUseCase
 )
+from .home_use_cases import (
+    HomePageViewModel,
+    GetHomePageUseCase
+)
 
 __all__ = [
     # User
@@ -34,12 +46,20 @@ __all__ = [
     'UpdateUserProfileUseCase',
     # Product
     'GetAllProductsUseCase',
+    'FilterProductsUseCase',
+    'GetFeaturedProductsUseCase',
     'GetProductByIdUseCase',
+    'GetProductsByIdsUseCase',
+    'GetSimilarProductsUseCase',
+    'GetBoughtTogetherUseCase',
     'GetProductsByCategoryUseCase',
     'SearchProductsUseCase',
+    'SuggestProductsUseCase',
+    'RecommendProductsUseCase',
     'CreateProductUseCase',
     'UpdateProductUseCase',
     'DeleteProductUseCase',
+    'BulkUpdateProductsUseCase',
     # Order
     'CreateOrderUseCase',
     'GetUserOrdersUseCase',
@@ -49,5 +69,8 @@ __all__ = [
     'CancelOrderUseCase',
     # Category
     'GetAllCategoriesUseCase',
-    'GetCategoryByIdUseCase'
+    'GetCategoryByIdUseCase',
+    # Home
+    'HomePageViewModel',
+    'GetHomePageUseCase'
 ]
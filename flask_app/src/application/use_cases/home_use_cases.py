@@ -0,0 +1,39 @@
+"""Home Page Use Cases - Application Business Logic"""
+import time
+from dataclasses import dataclass, field
+from typing import List
+from ...domain.entities import ProductSummary, Category
+from ...domain.repositories import IHomePageCache
+from .product_use_cases import GetFeaturedProductsUseCase
+from .category_use_cases import GetAllCategoriesUseCase
+
+
+@dataclass
+class HomePageViewModel:
+    """Everything index.html needs, composed once"""
+    featured_products: List[ProductSummary] = field(default_factory=list)
+    categories: List[Category] = field(default_factory=list)
+    built_at: float = 0.0
+
+
+class GetHomePageUseCase:
+    """Use case for the homepage; the composed view model is shared through the homepage cache"""
+    
+    def __init__(self, get_featured_products_use_case: GetFeaturedProductsUseCase,
+                 get_all_categories_use_case: GetAllCategoriesUseCase,
+                 homepage_cache: IHomePageCache, featured_limit: int = 6):
+        self.get_featured_products_use_case = get_featured_products_use_case
+        self.get_all_categories_use_case = get_all_categories_use_case
+        self.homepage_cache = homepage_cache
+        self.featured_limit = featured_limit
+    
+    def execute(self) -> HomePageViewModel:
+        """Get the homepage view model, composing it only on a cache miss"""
+        return self.homepage_cache.get_or_build(self._build)
+    
+    def _build(self) -> HomePageViewModel:
+        return HomePageViewModel(
+            featured_products=self.get_featured_products_use_case.execute(self.featured_limit),
+            categories=self.get_all_categories_use_case.execute(),
+            built_at=time.monotonic()
+        )
@@ -1,14 +1,23 @@
 """Order Use Cases - Application Business Logic"""
-from typing import List, Optional
-from ...domain.entities import Order, OrderItem, OrderStatus
-from ...domain.repositories import IOrderRepository, IProductRepository
+from typing import Dict, List, Optional
+from ...domain.entities import (
+    Order, OrderItem, OrderStatus, OrderFilter, OrderSort, Page, encode_cursor, decode_cursor
+)
+from ...domain.repositories import IOrderRepository, IProductRepository, IProductIndex, ISalesRanking, IUnitOfWork
+from .product_use_cases import run_after_commit
 import time
 import uuid
 class CreateOrderUseCase:
     """Use case for creating order""" 
-    def __init__(self, order_repository: IOrderRepository, product_repository: IProductRepository):
+    def __init__(self, order_repository: IOrderRepository, product_repository: IProductRepository,
+                 product_indexes: Optional[List[IProductIndex]] = None,
+                 sales_ranking: Optional[ISalesRanking] = None,
+                 unit_of_work: Optional[IUnitOfWork] = None):
         self.order_repository = order_repository
         self.product_repository = product_repository   
+        self.product_indexes = product_indexes or []
+        self.sales_ranking = sales_ranking
+        self.unit_of_work = unit_of_work
     def execute(self, order: Order) -> tuple[bool, str, Optional[str]]:
         """
         Create new order
@@ -20,9 +29,13 @@ class CreateOrderUseCase:
         is_valid, error_msg = order.is_valid()
         if not is_valid:
             return False, error_msg, None   
-        # Validate stock for all items
+        # Validate stock for all items (one query for the whole cart)
+        products = {
+            str(product.id): product
+            for product in self.product_repository.get_by_ids([item.product_id for item in order.items])
+        }
         for item in order.items:
-            product = self.product_repository.get_by_id(item.product_id)
+            product = products.get(str(item.product_id))
             if not product:
                 return False, f"Sản phẩm {item.product_name} không tồn tại", None    
             can_buy, error_msg = product.can_purchase(item.quantity)
@@ -32,23 +45,48 @@ class CreateOrderUseCase:
         timestamp = time.strftime("%Y%m%d%H%M%S")
         unique_id = str(uuid.uuid4())[:4]
         order.id = f"ORD{timestamp}{unique_id.upper()}" 
-        # Create order
-        order_id = self.order_repository.create(order)
+        # Create order and decrement stock atomically
+        order_id, out_of_stock_id = self.order_repository.place_order(order)
         if order_id:
-            # Update stock for all items
+            deltas = {}
             for item in order.items:
-                product = self.product_repository.get_by_id(item.product_id)
-                new_stock = product.stock_quantity - item.quantity
-                self.product_repository.update_stock(item.product_id, new_stock)    
+                key = str(item.product_id)
+                deltas[key] = deltas.get(key, 0) - item.quantity
+            run_after_commit(self.unit_of_work, lambda: self._placed(deltas))
             return True, "Đặt hàng thành công", order_id
+        if out_of_stock_id:
+            product_name = next(
+                (item.product_name for item in order.items if str(item.product_id) == out_of_stock_id),
+                out_of_stock_id
+            )
+            return False, f"{product_name}: Sản phẩm không đủ số lượng trong kho", None
         return False, "Đã xảy ra lỗi khi tạo đơn hàng", None
+    def _placed(self, deltas: Dict[str, int]) -> None:
+        """Move the in-memory stock and sales counters once the order is committed"""
+        # Stock changed behind the product repository's back
+        if hasattr(self.product_repository, "invalidate"):
+            self.product_repository.invalidate(deltas)
+        for index in self.product_indexes:
+            index.stock_changed(deltas)
+        if self.sales_ranking:
+            self.sales_ranking.record_sales({pid: -delta for pid, delta in deltas.items()})
 class GetUserOrdersUseCase:
     """Use case for getting user's orders""" 
     def __init__(self, order_repository: IOrderRepository):
         self.order_repository = order_repository
-    def execute(self, user_id: int) -> List[Order]:
-        """Get all orders by user"""
-        return self.order_repository.get_by_user(user_id)
+    def execute(self, user_id: int, include_items: bool = False) -> List[Order]:
+        """Get all orders by user (with their items in one extra query if include_items)"""
+        return self.order_repository.get_by_user(user_id, include_items)
+    def execute_page(self, user_id: str, cursor: Optional[str] = None, page_size: int = 20) -> Page:
+        """
+        Get one keyset page of the user's order history (newest first).
+        Reads the order_summaries projection, which `flask migrate` must have created.
+        """
+        page_size = max(1, min(page_size or 20, 100))
+        rows = self.order_repository.get_summaries_page(user_id, decode_cursor(cursor), page_size + 1)
+        items = rows[:page_size]
+        next_cursor = encode_cursor(items[-1].sort_key()) if len(rows) > page_size else None
+        return Page(items=items, next_cursor=next_cursor, page_size=page_size)
 class GetOrderByIdUseCase:
     """Use case for getting order by ID""" 
     def __init__(self, order_repository: IOrderRepository):
@@ -60,13 +98,31 @@ class GetAllOrdersUseCase:
     """Use case for getting all orders (admin)"""  
     def __init__(self, order_repository: IOrderRepository):
         self.order_repository = order_repository  
-    def execute(self) -> List[Order]:
-        """Get all orders"""
-        return self.order_repository.get_all()
+    def execute(self, include_items: bool = False) -> List[Order]:
+        """Get all orders (with their items in one extra query if include_items)"""
+        return self.order_repository.get_all(include_items)
+    def execute_page(self, filters: OrderFilter, sort: str = OrderSort.NEWEST.value, cursor: Optional[str] = None,
+                     page_size: int = 25, include_items: bool = True) -> tuple[Page, Dict[str, int]]:
+        """
+        One keyset page of filtered orders plus per-status counts
+        Returns: (page, {status: count, ..., 'all': total})
+        """
+        order_sort = OrderSort.from_string(sort)
+        page_size = max(1, min(page_size or 25, 100))
+        rows = self.order_repository.get_page(filters, order_sort, decode_cursor(cursor), page_size + 1,
+                                              include_items)
+        items = rows[:page_size]
+        next_cursor = encode_cursor(order_sort.key_of(items[-1])) if len(rows) > page_size else None
+        counts = self.order_repository.count_by_status(filters)
+        counts['all'] = sum(counts.values())
+        return Page(items=items, next_cursor=next_cursor, page_size=page_size), counts
 class UpdateOrderStatusUseCase:
     """Use case for updating order status (admin)""" 
-    def __init__(self, order_repository: IOrderRepository):
+    def __init__(self, order_repository: IOrderRepository, sales_ranking: Optional[ISalesRanking] = None,
+                 unit_of_work: Optional[IUnitOfWork] = None):
         self.order_repository = order_repository 
+        self.sales_ranking = sales_ranking
+        self.unit_of_work = unit_of_work
     def execute(self, order_id: str, new_status: str) -> tuple[bool, str]:
         """
         Update order status
@@ -88,13 +144,27 @@ class UpdateOrderStatusUseCase:
         # Update status
         success = self.order_repository.update_status(order_id, status.value)
         if success:
+            if status == OrderStatus.CANCELLED and order.status != OrderStatus.CANCELLED and self.sales_ranking:
+                # A cancelled order no longer counts as sold, as in CancelOrderUseCase
+                deltas = {}
+                for item in order.items:
+                    key = str(item.product_id)
+                    deltas[key] = deltas.get(key, 0) - item.quantity
+                run_after_commit(self.unit_of_work,
+                                 lambda: self.sales_ranking.record_sales(deltas, order.created_at))
             return True, f"Cập nhật trạng thái thành {status.get_display_name()}"   
         return False, "Đã xảy ra lỗi khi cập nhật"
 class CancelOrderUseCase:
     """Use case for cancelling order"""
-    def __init__(self, order_repository: IOrderRepository, product_repository: IProductRepository):
+    def __init__(self, order_repository: IOrderRepository, product_repository: IProductRepository,
+                 product_indexes: Optional[List[IProductIndex]] = None,
+                 sales_ranking: Optional[ISalesRanking] = None,
+                 unit_of_work: Optional[IUnitOfWork] = None):
         self.order_repository = order_repository
         self.product_repository = product_repository
+        self.product_indexes = product_indexes or []
+        self.sales_ranking = sales_ranking
+        self.unit_of_work = unit_of_work
     def execute(self, order_id: str, user_id: int) -> tuple[bool, str]:
         """
         Cancel order
@@ -113,11 +183,19 @@ class CancelOrderUseCase:
         # Update status to cancelled
         success = self.order_repository.update_status(order_id, OrderStatus.CANCELLED.value)
         if success:
-            # Restore stock
+            # Restore stock (relative increment, one statement)
+            deltas = {}
             for item in order.items:
-                product = self.product_repository.get_by_id(item.product_id)
-                if product:
-                    new_stock = product.stock_quantity + item.quantity
-                    self.product_repository.update_stock(item.product_id, new_stock)
+                key = str(item.product_id)
+                deltas[key] = deltas.get(key, 0) + item.quantity
+            stock_restored = self.product_repository.adjust_stock(deltas)
+            run_after_commit(self.unit_of_work, lambda: self._cancelled(order, deltas, stock_restored))
             return True, "Hủy đơn hàng thành công" 
         return False, "Đã xảy ra lỗi khi hủy đơn hàng"
+    def _cancelled(self, order: Order, deltas: Dict[str, int], stock_restored: bool) -> None:
+        """Move the in-memory stock and sales counters once the cancellation is committed"""
+        if stock_restored:
+            for index in self.product_indexes:
+                index.stock_changed(deltas)
+        if self.sales_ranking:
+            self.sales_ranking.record_sales({pid: -units for pid, units in deltas.items()}, order.created_at)
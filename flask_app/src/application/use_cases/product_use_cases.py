@@ -1,14 +1,109 @@
 """Product Use Cases - Application Business Logic"""
-from typing import List, Optional
-from ...domain.entities import Product
-from ...domain.repositories import IProductRepository
+from typing import Callable, Dict, List, Optional
+from ...domain.entities import (
+    Product, ProductSummary, ProductFilter, Page, ProductSort, Suggestion, Recommendation,
+    encode_cursor, decode_cursor
+)
+from ...domain.repositories import (
+    IProductRepository, IProductIndex, IProductSearchIndex, IFuzzyProductIndex, ISuggestionIndex,
+    ISearchResultCache, IFacetIndex, IRecommendationIndex, ISimilarProductsIndex, IAssociationRepository,
+    ISalesRanking, IUnitOfWork
+)
+DEFAULT_PAGE_SIZE = 24
+MAX_PAGE_SIZE = 100
+def _load_facet_page(product_repository: IProductRepository, facet_index: IFacetIndex,
+                     filters: ProductFilter, product_sort: ProductSort, cursor: Optional[str],
+                     page_size: int) -> Optional[tuple[Page, dict]]:
+    """One keyset page from the facet index, or None when the index is unavailable"""
+    rows, facets = facet_index.query(filters, product_sort, decode_cursor(cursor), page_size + 1)
+    if not rows and facet_index.is_empty():
+        return None
+    page_rows = rows[:page_size]
+    products = {str(p.id): p for p in product_repository.get_by_ids([pid for pid, _ in page_rows])}
+    items = [products[pid] for pid, _ in page_rows if pid in products]
+    next_cursor = encode_cursor(page_rows[-1][1]) if len(rows) > page_size else None
+    return Page(items=items, next_cursor=next_cursor, page_size=page_size), facets
+def _load_product_page(product_repository: IProductRepository, sort: str, cursor: Optional[str],
+                       page_size: int, category_id: Optional[int] = None,
+                       name_query: Optional[str] = None, facet_index: Optional[IFacetIndex] = None) -> Page:
+    """
+    Fetch one keyset page (page_size + 1 rows to know whether more follow).
+    The bestseller sort is served by the facet index, which orders by recent
+    sales; SQL only knows the manual bestSeller flag and is the fallback.
+    """
+    product_sort = ProductSort.from_string(sort)
+    page_size = max(1, min(page_size or DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE))
+    if product_sort == ProductSort.BESTSELLER and facet_index is not None:
+        filters = ProductFilter(category_id=category_id, name_query=name_query)
+        result = _load_facet_page(product_repository, facet_index, filters, product_sort, cursor, page_size)
+        if result is not None:
+            return result[0]
+    rows = product_repository.get_page(product_sort, decode_cursor(cursor), page_size + 1,
+                                       category_id, name_query)
+    items = rows[:page_size]
+    next_cursor = encode_cursor(product_sort.key_of(items[-1])) if len(rows) > page_size else None
+    return Page(items=items, next_cursor=next_cursor, page_size=page_size)
+def run_after_commit(unit_of_work: Optional[IUnitOfWork], callback: Callable[[], None]) -> None:
+    """Update shared in-memory state only once the write is committed (now without a unit of work)"""
+    if unit_of_work is None:
+        callback()
+    else:
+        unit_of_work.after_commit(callback)
+def _reindex_product(product_repository: IProductRepository, product_indexes: List[IProductIndex],
+                     product_id) -> None:
+    """Push the stored version of a product (with category name) into every index"""
+    if not product_indexes:
+        return
+    product = product_repository.get_by_id(product_id)
+    for index in product_indexes:
+        if product:
+            index.index_product(product)
+        else:
+            index.remove_product(product_id)
 class GetAllProductsUseCase:
     """Use case for getting all products""" 
-    def __init__(self, product_repository: IProductRepository):
+    def __init__(self, product_repository: IProductRepository, facet_index: Optional[IFacetIndex] = None):
         self.product_repository = product_repository   
-    def execute(self) -> List[Product]:
+        self.facet_index = facet_index
+    def execute(self) -> List[ProductSummary]:
         """Get all products"""
         return self.product_repository.get_all()
+    def execute_page(self, sort: str = ProductSort.NEWEST.value, cursor: Optional[str] = None,
+                     page_size: int = DEFAULT_PAGE_SIZE, category_id: Optional[int] = None,
+                     name_query: Optional[str] = None) -> Page:
+        """Get one keyset page of products, optionally narrowed by category and name (admin grid)"""
+        name_query = (name_query or '').strip()[:100] or None
+        return _load_product_page(self.product_repository, sort, cursor, page_size, category_id, name_query,
+                                  self.facet_index)
+class FilterProductsUseCase:
+    """Use case for faceted product listings (filters + facet counts from memory)"""
+    def __init__(self, product_repository: IProductRepository, facet_index: IFacetIndex):
+        self.product_repository = product_repository
+        self.facet_index = facet_index
+    def execute(self, filters: ProductFilter, sort: str = ProductSort.NEWEST.value,
+                cursor: Optional[str] = None,
+                page_size: int = DEFAULT_PAGE_SIZE) -> Optional[tuple[Page, dict]]:
+        """
+        Get one keyset page of products matching the filters
+        Returns: (page, facet_counts), or None when the index is unavailable
+        """
+        product_sort = ProductSort.from_string(sort)
+        page_size = max(1, min(page_size or DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE))
+        return _load_facet_page(self.product_repository, self.facet_index, filters, product_sort, cursor, page_size)
+class GetFeaturedProductsUseCase:
+    """Use case for the homepage's featured products (bestseller first, then newest)"""
+    def __init__(self, product_repository: IProductRepository, sales_ranking: Optional[ISalesRanking] = None):
+        self.product_repository = product_repository
+        self.sales_ranking = sales_ranking
+    def execute(self, limit: int = 6) -> List[ProductSummary]:
+        """Get only the top `limit` products, ranked by recent sales when available"""
+        top_ids = self.sales_ranking.top(limit) if self.sales_ranking else []
+        if top_ids:
+            products = {str(p.id): p for p in self.product_repository.get_by_ids(top_ids)}
+            featured = [products[pid] for pid in top_ids if pid in products]
+            if featured:
+                return featured
+        return self.product_repository.get_page(ProductSort.BESTSELLER, None, limit)
 class GetProductByIdUseCase:
     """Use case for getting product by ID"""  
     def __init__(self, product_repository: IProductRepository):
@@ -16,26 +111,136 @@ class GetProductByIdUseCase:
     def execute(self, product_id: int) -> Optional[Product]:
         """Get product by ID"""
         return self.product_repository.get_by_id(product_id)
+class GetSimilarProductsUseCase:
+    """Use case for the "similar products" section of a product page"""
+    def __init__(self, product_repository: IProductRepository, similar_index: ISimilarProductsIndex):
+        self.product_repository = product_repository
+        self.similar_index = similar_index
+    def execute(self, product_id: int, limit: int = 4) -> List[ProductSummary]:
+        """Get precomputed neighbours of a product, most similar first"""
+        similar_ids = self.similar_index.similar_to(product_id, limit)
+        if not similar_ids:
+            return []
+        products = {str(p.id): p for p in self.product_repository.get_by_ids(similar_ids)}
+        return [products[pid] for pid in similar_ids if pid in products]
+class GetBoughtTogetherUseCase:
+    """Use case for the "frequently bought together" sections (product page and cart)"""
+    def __init__(self, association_repository: IAssociationRepository, product_repository: IProductRepository):
+        self.association_repository = association_repository
+        self.product_repository = product_repository
+    def execute(self, product_ids: List[int], limit: int = 4) -> List[ProductSummary]:
+        """Products often bought with any of product_ids, excluding those products and anything out of stock"""
+        exclude = {str(pid) for pid in product_ids}
+        related = self.association_repository.get_related_many(list(product_ids))
+        # Round-robin over the lists: every source item gets its best match in first
+        lists = [related.get(str(pid), []) for pid in dict.fromkeys(product_ids)]
+        candidates = []
+        for rank in range(max((len(ids) for ids in lists), default=0)):
+            for ids in lists:
+                if rank < len(ids) and ids[rank] not in exclude and ids[rank] not in candidates:
+                    candidates.append(ids[rank])
+        if not candidates:
+            return []
+        products = {str(p.id): p for p in self.product_repository.get_by_ids(candidates)}
+        available = [products[pid] for pid in candidates if pid in products and products[pid].is_available()]
+        return available[:limit]
+class GetProductsByIdsUseCase:
+    """Use case for getting several products by ID in one round trip"""
+    def __init__(self, product_repository: IProductRepository):
+        self.product_repository = product_repository
+    def execute(self, product_ids: List[int]) -> Dict[str, ProductSummary]:
+        """Get products keyed by str(product.id); missing IDs are simply absent"""
+        products = self.product_repository.get_by_ids(product_ids)
+        return {str(product.id): product for product in products}
 class GetProductsByCategoryUseCase:
     """Use case for getting products by category"""   
-    def __init__(self, product_repository: IProductRepository):
+    def __init__(self, product_repository: IProductRepository, facet_index: Optional[IFacetIndex] = None):
         self.product_repository = product_repository   
-    def execute(self, category_id: int) -> List[Product]:
+        self.facet_index = facet_index
+    def execute(self, category_id: int) -> List[ProductSummary]:
         """Get products by category"""
         return self.product_repository.get_by_category(category_id)
+    def execute_page(self, category_id: int, sort: str = ProductSort.NEWEST.value,
+                     cursor: Optional[str] = None, page_size: int = DEFAULT_PAGE_SIZE) -> Page:
+        """Get one keyset page of products in a category"""
+        return _load_product_page(self.product_repository, sort, cursor, page_size, category_id,
+                                  facet_index=self.facet_index)
 class SearchProductsUseCase:
     """Use case for searching products""" 
-    def __init__(self, product_repository: IProductRepository):
+    def __init__(self, product_repository: IProductRepository,
+                 search_index: Optional[IProductSearchIndex] = None,
+                 fuzzy_index: Optional[IFuzzyProductIndex] = None,
+                 result_cache: Optional[ISearchResultCache] = None, max_results: int = 60):
         self.product_repository = product_repository 
-    def execute(self, keyword: str) -> List[Product]:
-        """Search products by keyword"""
+        self.search_index = search_index
+        self.fuzzy_index = fuzzy_index
+        self.result_cache = result_cache
+        self.max_results = max_results
+    def _rank(self, keyword: str) -> Optional[List[str]]:
+        """Ranked product IDs from the in-memory indexes; None when the index is unavailable"""
+        ranked_ids = self.search_index.search(keyword, self.max_results)
+        if not ranked_ids and self.search_index.is_empty():
+            return None
+        if self.fuzzy_index is not None and (not ranked_ids or self.search_index.unmatched_terms(keyword)):
+            # Some words are typos ("ulta", "galaxi"): closest names first, then partial matches
+            fuzzy_ids = self.fuzzy_index.search(keyword, self.max_results)
+            seen = set(fuzzy_ids)
+            ranked_ids = (fuzzy_ids + [pid for pid in ranked_ids if pid not in seen])[:self.max_results]
+        return ranked_ids
+    def execute(self, keyword: str) -> List[ProductSummary]:
+        """Search products by keyword (ranked by the in-memory index when available)"""
         if not keyword or len(keyword) < 2:
             return []
-        return self.product_repository.search(keyword)
+        if self.search_index is None:
+            return self.product_repository.search(keyword)
+        if self.result_cache is not None:
+            ranked_ids = self.result_cache.get_or_compute(
+                keyword, lambda: self._rank(keyword), self.max_results
+            )
+        else:
+            ranked_ids = self._rank(keyword)
+        if ranked_ids is None:
+            # Index could not be built (e.g. DB down at build time): use SQL search
+            return self.product_repository.search(keyword)
+        products = {str(p.id): p for p in self.product_repository.get_by_ids(ranked_ids)}
+        return [products[pid] for pid in ranked_ids if pid in products]
+class SuggestProductsUseCase:
+    """Use case for search-as-you-type suggestions (served from memory, no SQL)"""
+    MAX_LIMIT = 20
+    def __init__(self, suggestion_index: ISuggestionIndex):
+        self.suggestion_index = suggestion_index
+    def execute(self, prefix: str, limit: int = 8) -> List[Suggestion]:
+        """Get the top `limit` suggestions for a prefix"""
+        prefix = (prefix or '').strip()
+        if not prefix:
+            return []
+        return self.suggestion_index.suggest(prefix[:100], max(1, min(limit, self.MAX_LIMIT)))
+class RecommendProductsUseCase:
+    """Use case for the sales chatbot's product picks (served from memory, no SQL)"""
+    NEEDS = ('game', 'camera', 'work', 'budget')
+    SERIES = ('S', 'Z', 'A')
+    MAX_LIMIT = 10
+    def __init__(self, recommendation_index: IRecommendationIndex):
+        self.recommendation_index = recommendation_index
+    def execute(self, min_price: Optional[float] = None, max_price: Optional[float] = None,
+                need: Optional[str] = None, series: Optional[str] = None,
+                query: str = '', limit: int = 3) -> List[Recommendation]:
+        """Recommend products; unknown needs/series are ignored rather than rejected"""
+        if min_price is not None and max_price is not None and min_price > max_price:
+            min_price, max_price = max_price, min_price
+        need = need if need in self.NEEDS else None
+        series = series.upper() if series and series.upper() in self.SERIES else None
+        return self.recommendation_index.recommend(
+            min_price, max_price, need, series, (query or '')[:200], max(1, min(limit, self.MAX_LIMIT))
+        )
 class CreateProductUseCase:
     """Use case for creating product (admin)""" 
-    def __init__(self, product_repository: IProductRepository):
+    def __init__(self, product_repository: IProductRepository,
+                 product_indexes: Optional[List[IProductIndex]] = None,
+                 unit_of_work: Optional[IUnitOfWork] = None):
         self.product_repository = product_repository 
+        self.product_indexes = product_indexes or []
+        self.unit_of_work = unit_of_work
     def execute(self, product: Product) -> tuple[bool, str, Optional[int]]:
         """
         Create new product
@@ -55,6 +260,8 @@ class CreateProductUseCase:
         # Create product
         product_id = self.product_repository.create(product)
         if product_id:
+            run_after_commit(self.unit_of_work,
+                             lambda: _reindex_product(self.product_repository, self.product_indexes, product_id))
             return True, "Tạo sản phẩm thành công", product_id       
 
         error_detail = ""
@@ -66,8 +273,12 @@ class CreateProductUseCase:
         return False, "Đã xảy ra lỗi khi tạo sản phẩm", None
 class UpdateProductUseCase:
     """Use case for updating product (admin)"""  
-    def __init__(self, product_repository: IProductRepository):
+    def __init__(self, product_repository: IProductRepository,
+                 product_indexes: Optional[List[IProductIndex]] = None,
+                 unit_of_work: Optional[IUnitOfWork] = None):
         self.product_repository = product_repository 
+        self.product_indexes = product_indexes or []
+        self.unit_of_work = unit_of_work
     def execute(self, product: Product) -> tuple[bool, str]:
         """
         Update product
@@ -82,12 +293,19 @@ class UpdateProductUseCase:
             return False, "Giá sản phẩm phải lớn hơn 0"    
         success = self.product_repository.update(product)
         if success:
+            product_id = product.id
+            run_after_commit(self.unit_of_work,
+                             lambda: _reindex_product(self.product_repository, self.product_indexes, product_id))
             return True, "Cập nhật sản phẩm thành công"       
         return False, "Đã xảy ra lỗi khi cập nhật"
 class DeleteProductUseCase:
     """Use case for deleting product (admin)"""    
-    def __init__(self, product_repository: IProductRepository):
+    def __init__(self, product_repository: IProductRepository,
+                 product_indexes: Optional[List[IProductIndex]] = None,
+                 unit_of_work: Optional[IUnitOfWork] = None):
         self.product_repository = product_repository    
+        self.product_indexes = product_indexes or []
+        self.unit_of_work = unit_of_work
     def execute(self, product_id: int) -> tuple[bool, str]:
         """
         Delete product
@@ -95,6 +313,7 @@ class DeleteProductUseCase:
         """
         success = self.product_repository.delete(product_id)
         if success:
+            run_after_commit(self.unit_of_work, lambda: self._remove(product_id))
             return True, "Xóa sản phẩm thành công"       
 
         error_detail = ""
@@ -107,4 +326,98 @@ class DeleteProductUseCase:
 
         if error_detail:
             return False, f"Đã xảy ra lỗi khi xóa: {error_detail}"
-        return False, "Đã xảy ra lỗi khi xóa"
\ No newline at end of file
+        return False, "Đã xảy ra lỗi khi xóa"
+    def _remove(self, product_id) -> None:
+        """Drop the deleted product from every index"""
+        for index in self.product_indexes:
+            index.remove_product(product_id)
+class BulkUpdateProductsUseCase:
+    """Use case for bulk actions on selected products (admin grid)"""
+    ACTIONS = ('delete', 'set_stock', 'set_bestseller')
+    MAX_SELECTION = 200
+    def __init__(self, product_repository: IProductRepository,
+                 product_indexes: Optional[List[IProductIndex]] = None,
+                 unit_of_work: Optional[IUnitOfWork] = None):
+        self.product_repository = product_repository
+        self.product_indexes = product_indexes or []
+        self.unit_of_work = unit_of_work
+    def execute(self, action: str, product_ids: List, value=None) -> tuple[bool, str, dict]:
+        """
+        Apply one action to every selected product with a single statement
+        Returns: (success, message, result) where result lists affected IDs
+        """
+        if action not in self.ACTIONS:
+            return False, "Thao tác không hợp lệ", {}
+        try:
+            ids = list(dict.fromkeys(str(int(pid)) for pid in product_ids or []))
+        except (TypeError, ValueError):
+            return False, "Danh sách sản phẩm không hợp lệ", {}
+        if not ids:
+            return False, "Chưa chọn sản phẩm nào", {}
+        if len(ids) > self.MAX_SELECTION:
+            return False, f"Chỉ có thể thao tác tối đa {self.MAX_SELECTION} sản phẩm mỗi lần", {}
+        if action == 'delete':
+            return self._delete(ids)
+        if action == 'set_stock':
+            try:
+                quantity = int(value)
+            except (TypeError, ValueError):
+                return False, "Số lượng không hợp lệ", {}
+            if quantity < 0:
+                return False, "Số lượng không được âm", {}
+            if self.product_repository.set_stock_many(ids, quantity) is None:
+                return False, self._error_message("Đã xảy ra lỗi khi cập nhật tồn kho"), {}
+            self._reindex(ids)
+            return True, f"Đã cập nhật tồn kho cho {len(ids)} sản phẩm", {'updated': ids}
+        best_seller = value in (True, 1, '1', 'true', 'on')
+        if self.product_repository.set_bestseller_many(ids, best_seller) is None:
+            return False, self._error_message("Đã xảy ra lỗi khi cập nhật"), {}
+        self._reindex(ids)
+        label = "Đã đánh dấu bán chạy" if best_seller else "Đã bỏ đánh dấu bán chạy"
+        return True, f"{label} cho {len(ids)} sản phẩm", {'updated': ids}
+    def _error_message(self, message: str) -> str:
+        """Append the repository's last database error, when it reports one"""
+        error_detail = ""
+        if hasattr(self.product_repository, "get_last_error"):
+            error_detail = self.product_repository.get_last_error()
+        return f"{message}: {error_detail}" if error_detail else message
+    def _delete(self, ids: List[str]) -> tuple[bool, str, dict]:
+        """Delete the selection; products that appear in orders are kept"""
+        deleted = self.product_repository.delete_many(ids)
+        if deleted:
+            run_after_commit(self.unit_of_work, lambda: self._remove(deleted))
+        removed = set(deleted)
+        kept = [pid for pid in ids if pid not in removed]
+        if not deleted:
+            error_detail = ""
+            if hasattr(self.product_repository, "get_last_error"):
+                error_detail = self.product_repository.get_last_error()
+            if error_detail:
+                return False, f"Đã xảy ra lỗi khi xóa: {error_detail}", {}
+            return False, "Không thể xóa các sản phẩm đã tồn tại trong đơn hàng", {'kept': kept}
+        message = f"Đã xóa {len(deleted)} sản phẩm"
+        if kept:
+            message += f", giữ lại {len(kept)} sản phẩm đã tồn tại trong đơn hàng"
+        return True, message, {'deleted': deleted, 'kept': kept}
+    def _reindex(self, ids: List[str]) -> None:
+        """Refresh the in-memory indexes for the changed products once the change is committed"""
+        def reindex():
+            if not self.product_indexes:
+                return
+            # One query for the selection; [] also means a DB error, left to the periodic rebuild
+            products = {str(p.id): p for p in self.product_repository.get_search_documents(ids)}
+            if not products:
+                return
+            for product_id in ids:
+                product = products.get(product_id)
+                for index in self.product_indexes:
+                    if product:
+                        index.index_product(product)
+                    else:
+                        index.remove_product(product_id)
+        run_after_commit(self.unit_of_work, reindex)
+    def _remove(self, ids: List[str]) -> None:
+        """Drop deleted products from every index"""
+        for product_id in ids:
+            for index in self.product_indexes:
+                index.remove_product(product_id)
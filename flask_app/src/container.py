@@ -1,11 +1,28 @@
 """Dependency Injection Container"""
-from config import MYSQL_CONFIG
+from config import (
+    MYSQL_CONFIG, MYSQL_POOL_CONFIG, PRODUCT_CACHE_CONFIG, CATEGORY_CACHE_TTL,
+    SEARCH_INDEX_REBUILD_INTERVAL, SEARCH_CACHE_CONFIG, SALES_RANKING_WINDOW_DAYS,
+    COPURCHASE_CONFIG, ASSOCIATION_CACHE_TTL, FEATURED_PRODUCTS_LIMIT, HOMEPAGE_CACHE_TTL
+)
 from .infrastructure.database import (
+    MySQLConnectionPool,
+    RequestUnitOfWork,
     MySQLUserRepository,
     MySQLProductRepository,
     MySQLCategoryRepository,
-    MySQLOrderRepository
+    MySQLOrderRepository,
+    MySQLAssociationRepository,
+    MigrationRunner,
+    QueryPlanChecker
+)
+from .infrastructure.cache import (
+    CachedProductRepository, CachedCategoryRepository, CachedAssociationRepository, SearchResultCache, HomePageCache
+)
+from .infrastructure.search import (
+    InvertedProductIndex, PrefixSuggestionIndex, TrigramProductIndex, FacetIndex,
+    RecommendationIndex, SimilarProductsIndex, SalesRanking, CatalogRefresher
 )
+from .infrastructure.jobs import CoPurchaseJob
 from .application.use_cases import (
     # User
     RegisterUserUseCase,
@@ -14,12 +31,20 @@ from .application.use_cases import (
     UpdateUserProfileUseCase,
     # Product
     GetAllProductsUseCase,
+    FilterProductsUseCase,
+    GetFeaturedProductsUseCase,
     GetProductByIdUseCase,
+    GetProductsByIdsUseCase,
+    GetSimilarProductsUseCase,
+    GetBoughtTogetherUseCase,
     GetProductsByCategoryUseCase,
     SearchProductsUseCase,
+    SuggestProductsUseCase,
+    RecommendProductsUseCase,
     CreateProductUseCase,
     UpdateProductUseCase,
     DeleteProductUseCase,
+    BulkUpdateProductsUseCase,
     # Order
     CreateOrderUseCase,
     GetUserOrdersUseCase,
@@ -29,7 +54,9 @@ from .application.use_cases import (
     CancelOrderUseCase,
     # Category
     GetAllCategoriesUseCase,
-    GetCategoryByIdUseCase
+    GetCategoryByIdUseCase,
+    # Home
+    GetHomePageUseCase
 )
 from .presentation.controllers import (
     UserController,
@@ -41,20 +68,67 @@ from .presentation.controllers import (
 class DIContainer:
     """Dependency Injection Container for managing dependencies"""
     
-    def __init__(self, db_config: dict):
+    def __init__(self, db_config: dict, pool_config: dict = None):
         self.db_config = db_config
         
+        # Shared connection pool (Infrastructure Layer)
+        self.connection_pool = MySQLConnectionPool(db_config, **(pool_config or {}))
+        # One connection + transaction per request, shared by all repositories
+        self.unit_of_work = RequestUnitOfWork(self.connection_pool)
+        
         # Repositories (Infrastructure Layer)
-        self.user_repository = MySQLUserRepository(db_config)
-        self.product_repository = MySQLProductRepository(db_config)
-        self.category_repository = MySQLCategoryRepository(db_config)
-        self.order_repository = MySQLOrderRepository(db_config)
+        self.user_repository = MySQLUserRepository(self.unit_of_work)
+        # Catalog reads go through an in-process LRU/TTL cache
+        self.product_repository = CachedProductRepository(
+            MySQLProductRepository(self.unit_of_work), unit_of_work=self.unit_of_work, **PRODUCT_CACHE_CONFIG
+        )
+        self.category_repository = CachedCategoryRepository(
+            MySQLCategoryRepository(self.unit_of_work), ttl=CATEGORY_CACHE_TTL, unit_of_work=self.unit_of_work
+        )
+        self.order_repository = MySQLOrderRepository(self.unit_of_work)
+        # "Bought together" lookups, written by the copurchase batch job
+        self.association_repository = CachedAssociationRepository(
+            MySQLAssociationRepository(self.unit_of_work), ttl=ASSOCIATION_CACHE_TTL
+        )
+        self.copurchase_job = CoPurchaseJob(self.association_repository, **COPURCHASE_CONFIG)
+        # Versioned schema and index changes (flask migrate)
+        self.migration_runner = MigrationRunner(self.unit_of_work)
+        # EXPLAIN-based check of every repository query (flask query-plans)
+        self.query_plan_checker = QueryPlanChecker(self.unit_of_work)
+        
+        # In-memory catalog indexes, kept current by the product write use cases
+        self.product_search_index = InvertedProductIndex()
+        self.suggestion_index = PrefixSuggestionIndex()
+        self.fuzzy_search_index = TrigramProductIndex()
+        # Bestseller order from recent sales, moved by the order use cases
+        self.sales_ranking = SalesRanking(self.order_repository, window_days=SALES_RANKING_WINDOW_DAYS)
+        self.facet_index = FacetIndex(sales_ranking=self.sales_ranking)
+        self.recommendation_index = RecommendationIndex()
+        self.similar_products_index = SimilarProductsIndex()
+        self.search_result_cache = SearchResultCache(**SEARCH_CACHE_CONFIG)
+        # Composed homepage; product writes and featured sell-outs drop it
+        self.homepage_cache = HomePageCache(ttl=HOMEPAGE_CACHE_TTL)
+        self.catalog_indexes = [
+            self.product_search_index, self.suggestion_index, self.fuzzy_search_index,
+            self.facet_index, self.recommendation_index, self.similar_products_index,
+            self.sales_ranking
+        ]
+        # One catalog read feeds every index, rebuilt in the background (started by app.py)
+        self.catalog_refresher = CatalogRefresher(
+            self.product_repository,
+            self.catalog_indexes,
+            rebuild_interval=SEARCH_INDEX_REBUILD_INTERVAL,
+            caches=[self.search_result_cache]
+        )
+        # Write use cases notify these; the refresher forwards to every catalog index
+        self.product_indexes = [self.catalog_refresher, self.search_result_cache, self.homepage_cache]
         
         # Use Cases (Application Layer)
         self._init_user_use_cases()
         self._init_product_use_cases()
         self._init_order_use_cases()
         self._init_category_use_cases()
+        self._init_home_use_cases()
         
         # Controllers (Presentation Layer)
         self._init_controllers()
@@ -68,27 +142,63 @@ class DIContainer:
     
     def _init_product_use_cases(self):
         """Initialize product use cases"""
-        self.get_all_products_use_case = GetAllProductsUseCase(self.product_repository)
+        self.get_all_products_use_case = GetAllProductsUseCase(self.product_repository, self.facet_index)
+        self.filter_products_use_case = FilterProductsUseCase(self.product_repository, self.facet_index)
+        self.get_featured_products_use_case = GetFeaturedProductsUseCase(
+            self.product_repository, self.sales_ranking
+        )
         self.get_product_by_id_use_case = GetProductByIdUseCase(self.product_repository)
-        self.get_products_by_category_use_case = GetProductsByCategoryUseCase(self.product_repository)
-        self.search_products_use_case = SearchProductsUseCase(self.product_repository)
-        self.create_product_use_case = CreateProductUseCase(self.product_repository)
-        self.update_product_use_case = UpdateProductUseCase(self.product_repository)
-        self.delete_product_use_case = DeleteProductUseCase(self.product_repository)
+        self.get_products_by_ids_use_case = GetProductsByIdsUseCase(self.product_repository)
+        self.get_similar_products_use_case = GetSimilarProductsUseCase(
+            self.product_repository, self.similar_products_index
+        )
+        self.get_bought_together_use_case = GetBoughtTogetherUseCase(
+            self.association_repository, self.product_repository
+        )
+        self.get_products_by_category_use_case = GetProductsByCategoryUseCase(
+            self.product_repository, self.facet_index
+        )
+        self.search_products_use_case = SearchProductsUseCase(
+            self.product_repository, self.product_search_index, self.fuzzy_search_index,
+            self.search_result_cache
+        )
+        self.suggest_products_use_case = SuggestProductsUseCase(self.suggestion_index)
+        self.recommend_products_use_case = RecommendProductsUseCase(self.recommendation_index)
+        # Product writes refresh the shared indexes only after the request commits
+        self.create_product_use_case = CreateProductUseCase(
+            self.product_repository, self.product_indexes, self.unit_of_work
+        )
+        self.update_product_use_case = UpdateProductUseCase(
+            self.product_repository, self.product_indexes, self.unit_of_work
+        )
+        self.delete_product_use_case = DeleteProductUseCase(
+            self.product_repository, self.product_indexes, self.unit_of_work
+        )
+        self.bulk_update_products_use_case = BulkUpdateProductsUseCase(
+            self.product_repository, self.product_indexes, self.unit_of_work
+        )
     
     def _init_order_use_cases(self):
         """Initialize order use cases"""
         self.create_order_use_case = CreateOrderUseCase(
             self.order_repository, 
-            self.product_repository
+            self.product_repository,
+            self.product_indexes,
+            self.sales_ranking,
+            self.unit_of_work
         )
         self.get_user_orders_use_case = GetUserOrdersUseCase(self.order_repository)
         self.get_order_by_id_use_case = GetOrderByIdUseCase(self.order_repository)
         self.get_all_orders_use_case = GetAllOrdersUseCase(self.order_repository)
-        self.update_order_status_use_case = UpdateOrderStatusUseCase(self.order_repository)
+        self.update_order_status_use_case = UpdateOrderStatusUseCase(
+            self.order_repository, self.sales_ranking, self.unit_of_work
+        )
         self.cancel_order_use_case = CancelOrderUseCase(
             self.order_repository,
-            self.product_repository
+            self.product_repository,
+            self.product_indexes,
+            self.sales_ranking,
+            self.unit_of_work
         )
     
     def _init_category_use_cases(self):
@@ -96,6 +206,15 @@ class DIContainer:
         self.get_all_categories_use_case = GetAllCategoriesUseCase(self.category_repository)
         self.get_category_by_id_use_case = GetCategoryByIdUseCase(self.category_repository)
     
+    def _init_home_use_cases(self):
+        """Initialize home page use cases"""
+        self.get_home_page_use_case = GetHomePageUseCase(
+            self.get_featured_products_use_case,
+            self.get_all_categories_use_case,
+            self.homepage_cache,
+            featured_limit=FEATURED_PRODUCTS_LIMIT
+        )
+    
     def _init_controllers(self):
         """Initialize controllers"""
         self.user_controller = UserController(
@@ -112,7 +231,13 @@ class DIContainer:
             self.create_product_use_case,
             self.update_product_use_case,
             self.delete_product_use_case,
-            self.get_all_categories_use_case
+            self.get_all_categories_use_case,
+            self.suggest_products_use_case,
+            self.filter_products_use_case,
+            self.recommend_products_use_case,
+            self.get_similar_products_use_case,
+            self.get_bought_together_use_case,
+            self.bulk_update_products_use_case
         )
         
         self.order_controller = OrderController(
@@ -120,9 +245,11 @@ class DIContainer:
             self.get_user_orders_use_case,
             self.get_order_by_id_use_case,
             self.get_all_orders_use_case,
-            self.update_order_status_use_case
+            self.update_order_status_use_case,
+            self.get_products_by_ids_use_case,
+            self.get_bought_together_use_case
         )
 
 
 # Global container instance
-container = DIContainer(MYSQL_CONFIG)
+container = DIContainer(MYSQL_CONFIG, MYSQL_POOL_CONFIG)
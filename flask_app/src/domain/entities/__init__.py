@@ -1,6 +1,16 @@
 from .user import User
 from .product import Product
+from .product_summary import ProductSummary
 from .category import Category
 from .order import Order, OrderItem, OrderStatus
+from .order_summary import OrderSummary
+from .pagination import Page, ProductSort, OrderSort, encode_cursor, decode_cursor
+from .suggestion import Suggestion
+from .recommendation import Recommendation
+from .product_filter import PriceBand, PRICE_BANDS, get_price_band, ProductFilter
+from .order_filter import OrderFilter
 
-__all__ = ['User', 'Product', 'Category', 'Order', 'OrderItem', 'OrderStatus']
+__all__ = ['User', 'Product', 'ProductSummary', 'Category', 'Order', 'OrderItem', 'OrderStatus',
+           'OrderSummary', 'Page', 'ProductSort', 'OrderSort', 'encode_cursor', 'decode_cursor',
+           'Suggestion', 'Recommendation', 'PriceBand', 'PRICE_BANDS', 'get_price_band', 'ProductFilter',
+           'OrderFilter']
@@ -0,0 +1,31 @@
+"""Order Filter - Admin order list filters"""
+from dataclasses import dataclass
+from datetime import date
+from typing import Optional
+
+
+@dataclass(frozen=True)
+class OrderFilter:
+    """Active order filters; None/empty means the filter is not applied"""
+
+    status: Optional[str] = None
+    date_from: Optional[date] = None
+    date_to: Optional[date] = None     # inclusive
+    keyword: str = ""                  # order id, customer phone or customer name
+
+    def is_empty(self) -> bool:
+        """Whether no filter is applied"""
+        return not (self.status or self.date_from or self.date_to or self.keyword)
+
+    def to_query_args(self) -> dict:
+        """URL query arguments that reproduce this filter"""
+        args = {}
+        if self.status:
+            args['status'] = self.status
+        if self.date_from:
+            args['date_from'] = self.date_from.isoformat()
+        if self.date_to:
+            args['date_to'] = self.date_to.isoformat()
+        if self.keyword:
+            args['q'] = self.keyword
+        return args
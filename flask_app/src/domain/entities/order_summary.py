@@ -0,0 +1,37 @@
+"""Order Summary Entity - Denormalized read model for order history"""
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional
+from .order import OrderStatus
+
+
+@dataclass(slots=True)
+class OrderSummary:
+    """One order history row: no shipping details or item lines"""
+    
+    id: str = ""
+    user_id: str = ""
+    created_at: Optional[datetime] = None
+    status: OrderStatus = OrderStatus.PENDING
+    total_amount: float = 0.0
+    item_count: int = 0
+    first_image: str = ""
+    first_product_name: str = ""
+    
+    def sort_key(self) -> list:
+        """Keyset position in a user's history (newest first, id breaks ties)"""
+        created_at = self.created_at.isoformat(sep=' ') if self.created_at else None
+        return [created_at, self.id]
+    
+    def to_dict(self) -> dict:
+        """Convert entity to dictionary"""
+        return {
+            'id': self.id,
+            'user_id': self.user_id,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'status': self.status.value,
+            'total_amount': self.total_amount,
+            'item_count': self.item_count,
+            'first_image': self.first_image,
+            'first_product_name': self.first_product_name
+        }
@@ -0,0 +1,114 @@
+"""Pagination - Keyset (cursor) paging value objects"""
+import base64
+import json
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Any, List, Optional
+
+
+class ProductSort(Enum):
+    """Sort options for product listings"""
+    NEWEST = "newest"
+    PRICE_ASC = "price_asc"
+    PRICE_DESC = "price_desc"
+    BESTSELLER = "bestseller"
+
+    @classmethod
+    def from_string(cls, sort: str) -> 'ProductSort':
+        """Create ProductSort from string"""
+        try:
+            return cls((sort or '').lower())
+        except ValueError:
+            return cls.NEWEST
+
+    def key_of(self, product, units_sold: int = 0) -> list:
+        """
+        Sort key of a product; the id is always last so keys are unique.
+        Bestseller keys start with units sold in the sales window, which only
+        the in-memory ranking knows; SQL listings pass 0 for every product.
+        """
+        if self in (ProductSort.PRICE_ASC, ProductSort.PRICE_DESC):
+            return [product.price, product.id]
+        if self == ProductSort.BESTSELLER:
+            return [units_sold, int(product.bestSeller or 0), product.id]
+        return [product.id]
+
+    def get_display_name(self) -> str:
+        """Get Vietnamese display name"""
+        name_map = {
+            ProductSort.NEWEST: "Mới nhất",
+            ProductSort.PRICE_ASC: "Giá tăng dần",
+            ProductSort.PRICE_DESC: "Giá giảm dần",
+            ProductSort.BESTSELLER: "Bán chạy"
+        }
+        return name_map.get(self, "Mới nhất")
+
+
+class OrderSort(Enum):
+    """Sort options for the admin order list"""
+    NEWEST = "newest"
+    OLDEST = "oldest"
+    TOTAL_DESC = "total_desc"
+    TOTAL_ASC = "total_asc"
+
+    @classmethod
+    def from_string(cls, sort: str) -> 'OrderSort':
+        """Create OrderSort from string"""
+        try:
+            return cls((sort or '').lower())
+        except ValueError:
+            return cls.NEWEST
+
+    def key_of(self, order) -> list:
+        """Sort key of an order; the id is always last so keys are unique"""
+        if self in (OrderSort.TOTAL_DESC, OrderSort.TOTAL_ASC):
+            return [order.total_amount, order.id]
+        return [order.created_at, order.id]
+
+    def get_display_name(self) -> str:
+        """Get Vietnamese display name"""
+        name_map = {
+            OrderSort.NEWEST: "Mới nhất",
+            OrderSort.OLDEST: "Cũ nhất",
+            OrderSort.TOTAL_DESC: "Tổng tiền giảm dần",
+            OrderSort.TOTAL_ASC: "Tổng tiền tăng dần"
+        }
+        return name_map.get(self, "Mới nhất")
+
+
+def encode_cursor(key: List[Any]) -> str:
+    """Encode the last seen sort key as an opaque URL-safe cursor"""
+    raw = json.dumps(key, separators=(',', ':'), default=str).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor: Optional[str]) -> Optional[list]:
+    """Decode a cursor produced by encode_cursor; invalid cursors mean 'first page'"""
+    if not cursor:
+        return None
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        key = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        return key if isinstance(key, list) else None
+    except (ValueError, TypeError):
+        return None
+
+
+@dataclass
+class Page:
+    """One page of a keyset-paginated listing"""
+
+    items: List[Any] = field(default_factory=list)
+    next_cursor: Optional[str] = None
+    page_size: int = 0
+
+    @property
+    def has_more(self) -> bool:
+        """Whether another page follows this one"""
+        return self.next_cursor is not None
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __len__(self) -> int:
+        return len(self.items)
@@ -0,0 +1,79 @@
+"""Product Filter - Facet selection for product listings"""
+from dataclasses import dataclass
+from typing import Optional
+
+
+@dataclass(frozen=True)
+class PriceBand:
+    """A named price range used as a facet: min_price <= price < max_price"""
+
+    key: str
+    label: str
+    min_price: float
+    max_price: Optional[float] = None
+
+    def contains(self, price: float) -> bool:
+        """Check if a price falls inside the band"""
+        return price >= self.min_price and (self.max_price is None or price < self.max_price)
+
+
+PRICE_BANDS = (
+    PriceBand('duoi-5tr', 'Dưới 5 triệu', 0, 5_000_000),
+    PriceBand('5-10tr', '5 - 10 triệu', 5_000_000, 10_000_000),
+    PriceBand('10-20tr', '10 - 20 triệu', 10_000_000, 20_000_000),
+    PriceBand('20-30tr', '20 - 30 triệu', 20_000_000, 30_000_000),
+    PriceBand('tren-30tr', 'Trên 30 triệu', 30_000_000, None),
+)
+
+
+def get_price_band(key: str) -> Optional[PriceBand]:
+    """Look up a price band by its key"""
+    return next((band for band in PRICE_BANDS if band.key == key), None)
+
+
+@dataclass(frozen=True)
+class ProductFilter:
+    """Active facet filters; None/False means the facet is not applied"""
+
+    category_id: Optional[int] = None
+    price_band: Optional[str] = None
+    min_price: Optional[float] = None
+    max_price: Optional[float] = None
+    in_stock: bool = False
+    bestseller: bool = False
+    name_query: Optional[str] = None  # substring of the product name (admin grid search)
+
+    def is_empty(self) -> bool:
+        """Whether no filter is applied"""
+        return (self.category_id is None and not self.price_band and self.min_price is None
+                and self.max_price is None and not self.in_stock and not self.bestseller
+                and not self.name_query)
+
+    def price_range(self) -> tuple[Optional[float], Optional[float]]:
+        """Effective [min, max) price range from the band and explicit bounds"""
+        low, high = self.min_price, self.max_price
+        band = get_price_band(self.price_band) if self.price_band else None
+        if band:
+            low = band.min_price if low is None else max(low, band.min_price)
+            if band.max_price is not None:
+                high = band.max_price if high is None else min(high, band.max_price)
+        return low, high
+
+    def to_query_args(self) -> dict:
+        """URL query arguments that reproduce this filter"""
+        args = {}
+        if self.category_id is not None:
+            args['category'] = self.category_id
+        if self.price_band:
+            args['price'] = self.price_band
+        if self.min_price is not None:
+            args['min_price'] = int(self.min_price)
+        if self.max_price is not None:
+            args['max_price'] = int(self.max_price)
+        if self.in_stock:
+            args['in_stock'] = 1
+        if self.bestseller:
+            args['bestseller'] = 1
+        if self.name_query:
+            args['q'] = self.name_query
+        return args
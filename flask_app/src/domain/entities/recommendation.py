@@ -0,0 +1,27 @@
+"""Recommendation Entity - Chatbot product pick"""
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+
+@dataclass(slots=True)
+class Recommendation:
+    """A product suggested by the sales chatbot, with the facts it reasons about"""
+    
+    id: Optional[str] = None
+    name: str = ""
+    price: float = 0.0
+    series: str = "O"  # 'S' | 'Z' | 'A' | 'O' (other)
+    tags: List[str] = field(default_factory=list)
+    in_stock: bool = True
+    score: float = 0.0
+    
+    def to_dict(self) -> dict:
+        """Convert to dictionary"""
+        return {
+            'id': self.id,
+            'name': self.name,
+            'price': self.price,
+            'series': self.series,
+            'tags': list(self.tags),
+            'in_stock': self.in_stock
+        }
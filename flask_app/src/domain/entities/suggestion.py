@@ -0,0 +1,15 @@
+"""Suggestion Entity - Search-as-you-type result"""
+from dataclasses import dataclass
+
+
+@dataclass(slots=True)
+class Suggestion:
+    """One autocomplete entry: a product or a category to jump to"""
+    
+    text: str
+    kind: str  # 'product' | 'category'
+    target_id: str  # product or category ID, as a string like every catalog ID
+    
+    def to_dict(self) -> dict:
+        """Convert to dictionary"""
+        return {'text': self.text, 'type': self.kind, 'id': self.target_id}
@@ -1,13 +1,37 @@
 from .interfaces import (
+    IUnitOfWork,
     IUserRepository,
     IProductRepository,
+    IProductIndex,
+    IProductSearchIndex,
+    IFuzzyProductIndex,
+    ISuggestionIndex,
+    IFacetIndex,
+    IRecommendationIndex,
+    ISimilarProductsIndex,
+    ISalesRanking,
+    ISearchResultCache,
+    IHomePageCache,
     ICategoryRepository,
-    IOrderRepository
+    IOrderRepository,
+    IAssociationRepository
 )
 
 __all__ = [
+    'IUnitOfWork',
     'IUserRepository',
     'IProductRepository',
+    'IProductIndex',
+    'IProductSearchIndex',
+    'IFuzzyProductIndex',
+    'ISuggestionIndex',
+    'IFacetIndex',
+    'IRecommendationIndex',
+    'ISimilarProductsIndex',
+    'ISalesRanking',
+    'ISearchResultCache',
+    'IHomePageCache',
     'ICategoryRepository',
-    'IOrderRepository'
+    'IOrderRepository',
+    'IAssociationRepository'
 ]
@@ -1,7 +1,35 @@
 """Repository Interfaces - Port definitions for data access"""
 from abc import ABC, abstractmethod
-from typing import List, Optional
-from ..entities import User, Product, Category, Order, OrderItem
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+from ..entities import (
+    User, Product, ProductSummary, Category, Order, OrderItem, ProductSort, ProductFilter, Suggestion,
+    Recommendation, OrderSummary, OrderFilter, OrderSort
+)
+
+
+class IUnitOfWork(ABC):
+    """Interface for the transaction shared by the repositories of one request"""
+    
+    @abstractmethod
+    def commit(self) -> None:
+        """Commit the writes made so far (raises if the commit fails)"""
+        pass
+    
+    @abstractmethod
+    def rollback(self) -> None:
+        """Undo the writes made so far and refuse to commit the rest"""
+        pass
+    
+    @abstractmethod
+    def after_commit(self, callback: Callable[[], None]) -> None:
+        """Run callback once the current writes are committed; dropped if they roll back"""
+        pass
+    
+    @abstractmethod
+    def has_pending_commit(self) -> bool:
+        """Whether writes were made that other readers cannot see yet"""
+        pass
 
 
 class IUserRepository(ABC):
@@ -52,18 +80,38 @@ class IProductRepository(ABC):
         pass
     
     @abstractmethod
-    def get_all(self) -> List[Product]:
-        """Get all products"""
+    def get_by_ids(self, product_ids: List[str]) -> List[ProductSummary]:
+        """Get several products by ID in one query (listing projection)"""
+        pass
+    
+    @abstractmethod
+    def get_all(self) -> List[ProductSummary]:
+        """Get all products (listing projection)"""
+        pass
+    
+    @abstractmethod
+    def get_by_category(self, category_id: int) -> List[ProductSummary]:
+        """Get products by category (listing projection)"""
+        pass
+    
+    @abstractmethod
+    def get_page(self, sort: ProductSort, after: Optional[list], page_size: int,
+                 category_id: Optional[int] = None, name_query: Optional[str] = None) -> List[ProductSummary]:
+        """
+        Keyset page of products ordered by `sort`, starting after the
+        sort key `after` (None = first page); returns at most page_size rows.
+        name_query keeps only products whose name contains it (admin grid).
+        """
         pass
     
     @abstractmethod
-    def get_by_category(self, category_id: int) -> List[Product]:
-        """Get products by category"""
+    def search(self, keyword: str) -> List[ProductSummary]:
+        """Search products by keyword (listing projection)"""
         pass
     
     @abstractmethod
-    def search(self, keyword: str) -> List[Product]:
-        """Search products by keyword"""
+    def get_search_documents(self, product_ids: Optional[List[str]] = None) -> List[Product]:
+        """All products (or only product_ids) with the columns needed to build the in-memory catalog indexes"""
         pass
     
     @abstractmethod
@@ -80,6 +128,177 @@ class IProductRepository(ABC):
     def update_stock(self, product_id: int, quantity: int) -> bool:
         """Update product stock quantity"""
         pass
+    
+    @abstractmethod
+    def adjust_stock(self, deltas: Dict[str, int]) -> bool:
+        """Add a signed delta to the stock of several products in one statement"""
+        pass
+    
+    @abstractmethod
+    def delete_many(self, product_ids: List[str]) -> List[str]:
+        """
+        Delete several products in one statement, skipping those referenced
+        by orders. Returns: IDs actually deleted
+        """
+        pass
+    
+    @abstractmethod
+    def set_stock_many(self, product_ids: List[str], quantity: int) -> Optional[int]:
+        """Set the same stock quantity on several products; returns rows changed, None on error"""
+        pass
+    
+    @abstractmethod
+    def set_bestseller_many(self, product_ids: List[str], best_seller: bool) -> Optional[int]:
+        """Set or clear the bestseller flag on several products; returns rows changed, None on error"""
+        pass
+
+
+class IProductIndex(ABC):
+    """Interface for in-memory structures derived from the catalog, kept current on product writes"""
+    
+    @abstractmethod
+    def index_product(self, product: Product) -> None:
+        """Add or replace one product in the index"""
+        pass
+    
+    @abstractmethod
+    def remove_product(self, product_id: int) -> None:
+        """Remove one product from the index"""
+        pass
+    
+    def stock_changed(self, deltas: Dict[str, int]) -> None:
+        """Stock moved by orders/cancellations; only stock-aware indexes override this"""
+        pass
+
+
+class IProductSearchIndex(IProductIndex):
+    """Interface for in-memory product search"""
+    
+    @abstractmethod
+    def search(self, query: str, limit: int = 50) -> List[str]:
+        """Ranked product IDs matching the query (best first)"""
+        pass
+    
+    @abstractmethod
+    def unmatched_terms(self, query: str) -> List[str]:
+        """Query terms that match nothing in the index (candidates for fuzzy matching)"""
+        pass
+    
+    @abstractmethod
+    def is_empty(self) -> bool:
+        """Whether the index holds no documents"""
+        pass
+
+
+class IFuzzyProductIndex(IProductIndex):
+    """Interface for typo-tolerant product name matching"""
+    
+    @abstractmethod
+    def search(self, query: str, limit: int = 50) -> List[str]:
+        """Product IDs whose name approximately matches the query (closest first)"""
+        pass
+
+
+class ISuggestionIndex(IProductIndex):
+    """Interface for search-as-you-type suggestions"""
+    
+    @abstractmethod
+    def suggest(self, prefix: str, limit: int = 8) -> List[Suggestion]:
+        """Best products/categories whose name (or a word in it) starts with prefix"""
+        pass
+
+
+class IFacetIndex(IProductIndex):
+    """Interface for in-memory faceted filtering"""
+    
+    @abstractmethod
+    def query(self, filters: ProductFilter, sort: ProductSort, after: Optional[list],
+              limit: int) -> tuple[List[tuple[str, list]], dict]:
+        """Filtered keyset page as (product_id, sort_key) pairs, plus facet counts"""
+        pass
+    
+    @abstractmethod
+    def is_empty(self) -> bool:
+        """Whether the index holds no products"""
+        pass
+
+
+class IRecommendationIndex(IProductIndex):
+    """Interface for chatbot product recommendations"""
+    
+    @abstractmethod
+    def recommend(self, min_price: Optional[float] = None, max_price: Optional[float] = None,
+                  need: Optional[str] = None, series: Optional[str] = None,
+                  query: str = '', limit: int = 3) -> List[Recommendation]:
+        """Best products for a budget window, need and series, or matching a model query"""
+        pass
+
+
+class ISimilarProductsIndex(IProductIndex):
+    """Interface for precomputed "similar products" neighbours"""
+    
+    @abstractmethod
+    def similar_to(self, product_id: int, limit: int = 4) -> List[str]:
+        """IDs of the products most similar to product_id (best first)"""
+        pass
+
+
+class ISalesRanking(IProductIndex):
+    """Interface for the sales-velocity bestseller ranking"""
+    
+    @abstractmethod
+    def record_sales(self, deltas: Dict[str, int], ordered_at: Optional[datetime] = None) -> None:
+        """Add units sold (negative for a cancellation) for an order placed at ordered_at"""
+        pass
+    
+    @abstractmethod
+    def top(self, limit: int) -> List[str]:
+        """IDs of the best-selling products, best first"""
+        pass
+    
+    @abstractmethod
+    def units_sold(self) -> Dict[str, int]:
+        """Units sold in the window per product ID (products without sales are absent)"""
+        pass
+    
+    @abstractmethod
+    def version(self) -> int:
+        """Counter that changes whenever the ranking may have changed (for caching derived orders)"""
+        pass
+    
+    @abstractmethod
+    def changes_since(self, version: int) -> Optional[Dict[str, int]]:
+        """Current units sold of the products changed after version; None if only a full rebuild can tell"""
+        pass
+
+
+class ISearchResultCache(IProductIndex):
+    """Interface for caching ranked search results; product writes invalidate it"""
+    
+    @abstractmethod
+    def get_or_compute(self, query: str, compute: Callable[[], Optional[List[str]]],
+                       limit: int = 0) -> Optional[List[str]]:
+        """Cached ranked product IDs for query, calling compute() on a miss"""
+        pass
+    
+    @abstractmethod
+    def invalidate(self) -> None:
+        """Make every cached result stale"""
+        pass
+
+
+class IHomePageCache(IProductIndex):
+    """Interface for caching the composed homepage; product writes invalidate it"""
+    
+    @abstractmethod
+    def get_or_build(self, build: Callable[[], Any]) -> Any:
+        """Cached homepage view model, calling build() when it is missing or expired"""
+        pass
+    
+    @abstractmethod
+    def invalidate(self) -> None:
+        """Drop the cached view model"""
+        pass
 
 
 class ICategoryRepository(ABC):
@@ -119,22 +338,115 @@ class IOrderRepository(ABC):
         """Create new order with items"""
         pass
     
+    @abstractmethod
+    def place_order(self, order: Order) -> tuple[Optional[str], Optional[str]]:
+        """
+        Insert order + items and decrement stock in a single transaction
+        Returns: (order_id, out_of_stock_product_id)
+        """
+        pass
+    
     @abstractmethod
     def get_by_id(self, order_id: str) -> Optional[Order]:
         """Get order by ID with items"""
         pass
     
     @abstractmethod
-    def get_by_user(self, user_id: int) -> List[Order]:
-        """Get all orders by user"""
+    def get_by_user(self, user_id: int, include_items: bool = False) -> List[Order]:
+        """Get all orders by user; include_items loads all items in one batched query"""
+        pass
+    
+    @abstractmethod
+    def get_summaries_page(self, user_id: str, after: Optional[list],
+                           limit: int) -> List[OrderSummary]:
+        """
+        Keyset page of a user's order summaries, newest first, starting after
+        sort key `after` ([order_date, order_id]). The projection is required
+        (migration 004), like the order writes that maintain it.
+        """
+        pass
+    
+    @abstractmethod
+    def rebuild_summaries(self) -> int:
+        """Create the order summary projection if needed and (re)fill it from orders"""
         pass
     
     @abstractmethod
-    def get_all(self) -> List[Order]:
-        """Get all orders"""
+    def get_all(self, include_items: bool = False) -> List[Order]:
+        """Get all orders; include_items loads all items in one batched query"""
+        pass
+    
+    @abstractmethod
+    def get_page(self, filters: OrderFilter, sort: OrderSort, after: Optional[list], limit: int,
+                 include_items: bool = False) -> List[Order]:
+        """Keyset page of filtered orders ordered by `sort`, starting after sort key `after`"""
+        pass
+    
+    @abstractmethod
+    def count_by_status(self, filters: OrderFilter) -> Dict[str, int]:
+        """Order count per status for every filter except the status one (one aggregate query)"""
         pass
     
     @abstractmethod
     def update_status(self, order_id: str, status: str) -> bool:
         """Update order status"""
         pass
+    
+    @abstractmethod
+    def get_units_sold(self, since: datetime) -> Dict[str, int]:
+        """Units sold per product in non-cancelled orders placed since `since`"""
+        pass
+
+
+class IAssociationRepository(ABC):
+    """Interface for co-purchase ("bought together") data"""
+    
+    @abstractmethod
+    def get_related(self, product_id: int) -> List[str]:
+        """Product IDs most often bought with product_id (best first)"""
+        pass
+    
+    @abstractmethod
+    def get_related_many(self, product_ids: List[str]) -> Dict[str, List[str]]:
+        """get_related for several products in one lookup, keyed by str(product_id)"""
+        pass
+    
+    @abstractmethod
+    def stream_baskets(self, after: Optional[Tuple], batch_size: int) -> Iterator[List[Tuple]]:
+        """Batches of (order_date, order_id, [product_ids]) for orders after the watermark"""
+        pass
+    
+    @abstractmethod
+    def apply_batch(self, pair_counts: Dict[Tuple[str, str], int], watermark: Tuple) -> bool:
+        """Add co-occurrence counts and advance the watermark in one transaction"""
+        pass
+    
+    @abstractmethod
+    def get_pair_counts(self, product_ids: List[str]) -> List[Tuple[str, str, int]]:
+        """All (product_id, related_id, count) rows for the given products"""
+        pass
+    
+    @abstractmethod
+    def get_support(self, product_ids: List[str]) -> Dict[str, int]:
+        """Number of orders containing each product"""
+        pass
+    
+    @abstractmethod
+    def save_associations(self, associations: Dict[str, List[str]]) -> bool:
+        """Replace the top-k lookup rows of the given products"""
+        pass
+    
+    @abstractmethod
+    def get_watermark(self) -> Optional[Tuple]:
+        """(order_date, order_id) of the last processed order, or None"""
+        pass
+    
+    @abstractmethod
+    def ensure_schema(self) -> bool:
+        """Create the co-purchase tables if they do not exist"""
+        pass
+    
+    @abstractmethod
+    def reset(self) -> bool:
+        """Drop all counts, lookups and the watermark (full re-mine)"""
+        pass
@@ -0,0 +1,15 @@
+from .lru_cache import LRUTTLCache
+from .cached_product_repository import CachedProductRepository
+from .cached_category_repository import CachedCategoryRepository
+from .search_result_cache import SearchResultCache
+from .homepage_cache import HomePageCache
+from .cached_association_repository import CachedAssociationRepository
+
+__all__ = [
+    'LRUTTLCache',
+    'CachedProductRepository',
+    'CachedCategoryRepository',
+    'SearchResultCache',
+    'HomePageCache',
+    'CachedAssociationRepository'
+]
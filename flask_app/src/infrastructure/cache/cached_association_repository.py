@@ -0,0 +1,81 @@
+"""Cached Association Repository - Bought-together lookups kept in memory"""
+from typing import Dict, Iterator, List, Optional, Tuple
+from ...domain.repositories import IAssociationRepository
+from .lru_cache import LRUTTLCache
+
+
+class CachedAssociationRepository(IAssociationRepository):
+    """
+    Wraps an IAssociationRepository and caches the per-product lookup rows
+    read by the cart and product pages. The lookups are rewritten only by
+    the batch job (a separate process), so entries simply expire after ttl;
+    every other method passes straight through.
+    """
+
+    def __init__(self, inner: IAssociationRepository, max_entries: int = 4096, ttl: float = 600):
+        self.inner = inner
+        self.cache = LRUTTLCache(max_entries=max_entries, ttl=ttl)
+
+    def get_stats(self) -> dict:
+        """Hit/miss counters"""
+        return self.cache.get_stats()
+
+    def get_related(self, product_id: int) -> List[str]:
+        """Product IDs most often bought with product_id (best first)"""
+        return self.get_related_many([product_id]).get(str(product_id), [])
+
+    def get_related_many(self, product_ids: List[str]) -> Dict[str, List[str]]:
+        """Serve cached rows and fetch the misses with one query"""
+        related, missing = {}, []
+        for key in dict.fromkeys(str(pid) for pid in product_ids):
+            cached = self.cache.get(('related', key))
+            if cached is None:
+                missing.append(key)
+            else:
+                related[key] = cached
+        if missing:
+            fetched = self.inner.get_related_many(missing)
+            for key in missing:
+                # Products without a row are cached as empty too
+                related[key] = fetched.get(key, [])
+                self.cache.set(('related', key), related[key])
+        return {key: list(ids) for key, ids in related.items() if ids}
+
+    def stream_baskets(self, after: Optional[Tuple], batch_size: int) -> Iterator[List[Tuple]]:
+        """Not cached: batch job only"""
+        return self.inner.stream_baskets(after, batch_size)
+
+    def apply_batch(self, pair_counts: Dict[Tuple[str, str], int], watermark: Tuple) -> bool:
+        """Not cached: batch job only"""
+        return self.inner.apply_batch(pair_counts, watermark)
+
+    def get_pair_counts(self, product_ids: List[str]) -> List[Tuple[str, str, int]]:
+        """Not cached: batch job only"""
+        return self.inner.get_pair_counts(product_ids)
+
+    def get_support(self, product_ids: List[str]) -> Dict[str, int]:
+        """Not cached: batch job only"""
+        return self.inner.get_support(product_ids)
+
+    def save_associations(self, associations: Dict[str, List[str]]) -> bool:
+        """Save and drop the cached rows it replaces"""
+        success = self.inner.save_associations(associations)
+        if success:
+            for key in associations:
+                self.cache.delete(('related', str(key)))
+        return success
+
+    def get_watermark(self) -> Optional[Tuple]:
+        """Not cached: batch job only"""
+        return self.inner.get_watermark()
+
+    def ensure_schema(self) -> bool:
+        """Not cached: batch job only"""
+        return self.inner.ensure_schema()
+
+    def reset(self) -> bool:
+        """Reset and drop every cached row"""
+        success = self.inner.reset()
+        if success:
+            self.cache.clear()
+        return success
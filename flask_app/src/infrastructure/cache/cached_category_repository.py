@@ -0,0 +1,90 @@
+"""Cached Category Repository - Category list kept in memory"""
+import threading
+from typing import List, Optional
+from ...domain.entities import Category
+from ...domain.repositories import ICategoryRepository, IUnitOfWork
+from .lru_cache import LRUTTLCache
+
+
+class CachedCategoryRepository(ICategoryRepository):
+    """
+    Wraps an ICategoryRepository and keeps the full category list in memory.
+
+    The list is loaded once (warm() at startup, or on first use), served
+    from memory afterwards and dropped whenever create/update/delete
+    succeeds. The TTL is only a safety net for edits made directly in MySQL.
+
+    As in CachedProductRepository, a write drops the list right away and
+    again once the unit of work commits, and a list read by a request with
+    uncommitted writes (or before a drop) is not cached.
+    """
+
+    _ALL_KEY = ('all',)
+
+    def __init__(self, inner: ICategoryRepository, ttl: float = 3600,
+                 unit_of_work: Optional[IUnitOfWork] = None):
+        self.inner = inner
+        self.cache = LRUTTLCache(max_entries=1, ttl=ttl)
+        self.unit_of_work = unit_of_work
+        self._generation = 0
+        self._generation_lock = threading.Lock()
+
+    def warm(self) -> None:
+        """Load the category list ahead of the first request"""
+        self.get_all()
+
+    def invalidate(self) -> None:
+        """Drop the cached list and invalidate reads still in flight"""
+        with self._generation_lock:
+            self._generation += 1
+        self.cache.delete(self._ALL_KEY)
+
+    def _invalidate_on_commit(self) -> None:
+        """Drop now, and again once the write is committed (readers may re-cache the old list until then)"""
+        self.invalidate()
+        if self.unit_of_work is not None:
+            self.unit_of_work.after_commit(self.invalidate)
+
+    def get_stats(self) -> dict:
+        """Hit/miss counters"""
+        return self.cache.get_stats()
+
+    def get_all(self) -> List[Category]:
+        """Get all categories"""
+        categories = self.cache.get(self._ALL_KEY)
+        if categories is None:
+            generation = self._generation
+            categories = self.inner.get_all()
+            pending = self.unit_of_work is not None and self.unit_of_work.has_pending_commit()
+            if categories and not pending and generation == self._generation:
+                # Empty means "no categories" or a DB error; don't pin either
+                self.cache.set(self._ALL_KEY, categories)
+        return list(categories)
+
+    def get_by_id(self, category_id: int) -> Optional[Category]:
+        """Get category by ID (from the cached list when available)"""
+        for category in self.get_all():
+            if str(category.id) == str(category_id):
+                return category
+        return self.inner.get_by_id(category_id)
+
+    def create(self, category: Category) -> Optional[int]:
+        """Create new category"""
+        category_id = self.inner.create(category)
+        if category_id:
+            self._invalidate_on_commit()
+        return category_id
+
+    def update(self, category: Category) -> bool:
+        """Update category"""
+        success = self.inner.update(category)
+        if success:
+            self._invalidate_on_commit()
+        return success
+
+    def delete(self, category_id: int) -> bool:
+        """Delete category"""
+        success = self.inner.delete(category_id)
+        if success:
+            self._invalidate_on_commit()
+        return success
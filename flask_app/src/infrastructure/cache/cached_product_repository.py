@@ -0,0 +1,231 @@
+"""Cached Product Repository - Read-through cache decorator for IProductRepository"""
+import copy
+import threading
+from typing import Dict, Iterable, List, Optional
+from ...domain.entities import Product, ProductSummary, ProductSort
+from ...domain.repositories import IProductRepository, IUnitOfWork
+from .lru_cache import LRUTTLCache
+
+# Tags used for precise invalidation
+_CATALOG_TAG = 'catalog'        # unfiltered lists: get_all and unfiltered pages
+_SEARCH_TAG = 'search'          # keyword results (any product text change may alter them)
+
+
+def _product_tag(product_id) -> str:
+    return f'product:{product_id}'
+
+
+def _category_tag(category_id) -> str:
+    return f'category:{category_id}'
+
+
+class CachedProductRepository(IProductRepository):
+    """
+    Wraps another IProductRepository with a bounded LRU + TTL cache.
+
+    Reads (get_by_id, get_by_ids, get_all, get_by_category, get_page, search)
+    are served from memory when possible. Each cached list is tagged with the
+    ids of the products it contains, so a stock change or delete only evicts
+    the entries that actually show that product.
+
+    Writes evict right away and again once the unit of work commits: other
+    requests can still read the old row until then. A generation counter
+    keeps a read that started before an eviction from caching what it read,
+    and reads made while this request has uncommitted writes are not cached
+    at all, so a rollback never leaves its rows behind.
+    """
+
+    def __init__(self, inner: IProductRepository, max_entries: int = 2048, ttl: float = 300,
+                 unit_of_work: Optional[IUnitOfWork] = None):
+        self.inner = inner
+        self.cache = LRUTTLCache(max_entries=max_entries, ttl=ttl)
+        self.unit_of_work = unit_of_work
+        self._generation = 0
+        self._generation_lock = threading.Lock()
+
+    def _store(self, generation: int, key, value, tags: Iterable[str]) -> None:
+        """Cache a value read at `generation`, unless an eviction happened since or the read saw uncommitted writes"""
+        if self.unit_of_work is not None and self.unit_of_work.has_pending_commit():
+            return
+        if generation != self._generation:
+            return
+        self.cache.set(key, value, tags)
+
+    def _cache_list(self, generation: int, key, products: List[ProductSummary], extra_tags: Iterable[str]) -> None:
+        """Cache a non-empty list result tagged with every product it contains"""
+        if not products:
+            # Do not pin empty results: the inner repository returns [] on errors too
+            return
+        tags = {_product_tag(product.id) for product in products}
+        tags.update(extra_tags)
+        self._store(generation, key, products, tags)
+
+    def _evict(self, tags: Iterable[str]) -> None:
+        """Drop every entry carrying one of the tags and invalidate reads still in flight"""
+        with self._generation_lock:
+            self._generation += 1
+        for tag in tags:
+            self.cache.invalidate_tag(tag)
+
+    def _evict_on_commit(self, tags: Iterable[str]) -> None:
+        """Evict now, and again once the write is committed (readers may re-cache the old row until then)"""
+        tags = list(tags)
+        self._evict(tags)
+        if self.unit_of_work is not None:
+            self.unit_of_work.after_commit(lambda: self._evict(tags))
+
+    def invalidate(self, product_ids: Iterable) -> None:
+        """Evict cached entries for products changed outside this repository (e.g. orders)"""
+        self._evict_on_commit(_product_tag(product_id) for product_id in product_ids)
+
+    def get_stats(self) -> dict:
+        """Hit/miss/eviction counters"""
+        return self.cache.get_stats()
+
+    def get_last_error(self) -> str:
+        """Get last database error message from the wrapped repository"""
+        if hasattr(self.inner, "get_last_error"):
+            return self.inner.get_last_error()
+        return ""
+
+    # Reads
+
+    def get_by_id(self, product_id: int) -> Optional[Product]:
+        """Get product by ID (a copy: callers such as the edit form mutate it)"""
+        key = ('id', str(product_id))
+        product = self.cache.get(key)
+        if product is None:
+            generation = self._generation
+            product = self.inner.get_by_id(product_id)
+            if product:
+                self._store(generation, key, copy.copy(product), {_product_tag(product.id)})
+            return product
+        return copy.copy(product)
+
+    def get_by_ids(self, product_ids: List[str]) -> List[ProductSummary]:
+        """Get several products; only the IDs missing from cache reach the database"""
+        found, missing = [], []
+        for product_id in dict.fromkeys(str(pid) for pid in product_ids):
+            product = self.cache.get(('summary', product_id))
+            if product is None:
+                missing.append(product_id)
+            else:
+                found.append(product)
+
+        if missing:
+            generation = self._generation
+            for product in self.inner.get_by_ids(missing):
+                self._store(generation, ('summary', str(product.id)), product, {_product_tag(product.id)})
+                found.append(product)
+        return found
+
+    def get_all(self) -> List[ProductSummary]:
+        """Get all products"""
+        key = ('all',)
+        products = self.cache.get(key)
+        if products is None:
+            generation = self._generation
+            products = self.inner.get_all()
+            self._cache_list(generation, key, products, {_CATALOG_TAG})
+        return list(products)
+
+    def get_by_category(self, category_id: int) -> List[ProductSummary]:
+        """Get products by category"""
+        key = ('category', str(category_id))
+        products = self.cache.get(key)
+        if products is None:
+            generation = self._generation
+            products = self.inner.get_by_category(category_id)
+            self._cache_list(generation, key, products, {_category_tag(category_id)})
+        return list(products)
+
+    def get_page(self, sort: ProductSort, after: Optional[list], page_size: int,
+                 category_id: Optional[int] = None, name_query: Optional[str] = None) -> List[ProductSummary]:
+        """Keyset page of products (admin name searches are not cached)"""
+        if name_query:
+            return self.inner.get_page(sort, after, page_size, category_id, name_query)
+        key = ('page', sort.value, tuple(after or ()), page_size,
+               str(category_id) if category_id is not None else None)
+        products = self.cache.get(key)
+        if products is None:
+            generation = self._generation
+            products = self.inner.get_page(sort, after, page_size, category_id)
+            scope_tag = _category_tag(category_id) if category_id is not None else _CATALOG_TAG
+            self._cache_list(generation, key, products, {scope_tag})
+        return list(products)
+
+    def search(self, keyword: str) -> List[ProductSummary]:
+        """Search products by keyword"""
+        key = ('search', keyword)
+        products = self.cache.get(key)
+        if products is None:
+            generation = self._generation
+            products = self.inner.search(keyword)
+            self._cache_list(generation, key, products, {_SEARCH_TAG})
+        return list(products)
+
+    def get_search_documents(self, product_ids: Optional[List[str]] = None) -> List[Product]:
+        """Not cached: only read when a search index is (re)built or reindexes changed products"""
+        return self.inner.get_search_documents(product_ids)
+
+    # Writes (delegate, then invalidate exactly what they affect, now and after commit)
+
+    def create(self, product: Product) -> Optional[int]:
+        """Create new product"""
+        product_id = self.inner.create(product)
+        if product_id:
+            self._evict_on_commit([_CATALOG_TAG, _category_tag(product.category_id), _SEARCH_TAG])
+        return product_id
+
+    def update(self, product: Product) -> bool:
+        """Update product"""
+        success = self.inner.update(product)
+        if success:
+            # Old category lists hold the product tag; the new category may gain it
+            self._evict_on_commit([
+                _product_tag(product.id), _CATALOG_TAG, _category_tag(product.category_id), _SEARCH_TAG
+            ])
+        return success
+
+    def delete(self, product_id: int) -> bool:
+        """Delete product"""
+        success = self.inner.delete(product_id)
+        if success:
+            self.invalidate([product_id])
+        return success
+
+    def update_stock(self, product_id: int, quantity: int) -> bool:
+        """Update product stock quantity"""
+        success = self.inner.update_stock(product_id, quantity)
+        if success:
+            self.invalidate([product_id])
+        return success
+
+    def adjust_stock(self, deltas: Dict[str, int]) -> bool:
+        """Add a signed delta to the stock of several products"""
+        success = self.inner.adjust_stock(deltas)
+        if success:
+            self.invalidate(deltas.keys())
+        return success
+
+    def delete_many(self, product_ids: List[str]) -> List[str]:
+        """Delete several products"""
+        deleted = self.inner.delete_many(product_ids)
+        if deleted:
+            self.invalidate(deleted)
+        return deleted
+
+    def set_stock_many(self, product_ids: List[str], quantity: int) -> Optional[int]:
+        """Set the same stock quantity on several products"""
+        updated = self.inner.set_stock_many(product_ids, quantity)
+        if updated:
+            self.invalidate(product_ids)
+        return updated
+
+    def set_bestseller_many(self, product_ids: List[str], best_seller: bool) -> Optional[int]:
+        """Set or clear the bestseller flag on several products"""
+        updated = self.inner.set_bestseller_many(product_ids, best_seller)
+        if updated:
+            # The bestseller sort order of every cached page may change
+            self._evict_on_commit([_product_tag(product_id) for product_id in product_ids] + [_CATALOG_TAG])
+        return updated
@@ -0,0 +1,92 @@
+"""Homepage Cache - One shared homepage view model with a TTL and product-write invalidation"""
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+from ...domain.entities import Product
+from ...domain.repositories import IHomePageCache
+
+
+class HomePageCache(IHomePageCache):
+    """
+    Holds the composed homepage for ttl seconds.
+
+    - Concurrent misses build it once; the other callers wait for that build
+    - Product edits and deletes drop it right away
+    - Orders only drop it when a featured product sells out or comes back in
+      stock, i.e. when the page would show a different availability. Other
+      stock moves (and the sales order of the featured list) are left to the
+      ttl, so a busy checkout does not rebuild the homepage on every order
+    """
+
+    def __init__(self, ttl: float = 60):
+        self.ttl = ttl
+        self._cached: Optional[Any] = None
+        self._built_at = 0.0
+        self._featured_stock: Dict[str, int] = {}
+        self._build_lock = threading.Lock()
+        self._lock = threading.Lock()
+        self.builds = 0
+        self.invalidations = 0
+
+    def _fresh(self) -> Optional[Any]:
+        cached = self._cached
+        if cached is not None and time.monotonic() - self._built_at < self.ttl:
+            return cached
+        return None
+
+    def get_or_build(self, build: Callable[[], Any]) -> Any:
+        """Cached view model; build() runs on miss and its featured_products are watched for availability"""
+        cached = self._fresh()
+        if cached is not None:
+            return cached
+
+        with self._build_lock:
+            # Another thread may have rebuilt it while we waited
+            cached = self._fresh()
+            if cached is not None:
+                return cached
+            view_model = build()
+            featured = getattr(view_model, 'featured_products', None) or []
+            with self._lock:
+                self._featured_stock = {str(p.id): int(p.stock_quantity or 0) for p in featured}
+                self._cached, self._built_at = view_model, time.monotonic()
+                self.builds += 1
+            return view_model
+
+    def invalidate(self) -> None:
+        """Drop the cached view model"""
+        with self._lock:
+            self._cached = None
+            self._featured_stock = {}
+            self.invalidations += 1
+
+    def index_product(self, product: Product) -> None:
+        """A product was created or edited (it may enter the featured list or change its card)"""
+        self.invalidate()
+
+    def remove_product(self, product_id) -> None:
+        """A product was deleted"""
+        self.invalidate()
+
+    def stock_changed(self, deltas: Dict[str, int]) -> None:
+        """Drop the page only if a featured product flips between in stock and sold out"""
+        with self._lock:
+            flipped = False
+            for product_id, delta in deltas.items():
+                product_id = str(product_id)
+                stock = self._featured_stock.get(product_id)
+                if stock is None:
+                    continue
+                self._featured_stock[product_id] = stock + delta
+                flipped = flipped or (stock > 0) != (stock + delta > 0)
+        if flipped:
+            self.invalidate()
+
+    def get_stats(self) -> dict:
+        """Build and invalidation counters"""
+        return {
+            'cached': self._fresh() is not None,
+            'builds': self.builds,
+            'invalidations': self.invalidations,
+            'ttl': self.ttl
+        }
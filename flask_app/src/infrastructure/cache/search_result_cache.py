@@ -0,0 +1,88 @@
+"""Search Result Cache - Normalized-query cache with single-flight and version invalidation"""
+import threading
+from typing import Callable, Dict, List, Optional
+from ...domain.entities import Product
+from ...domain.repositories import ISearchResultCache
+from ..search.text import normalize_query
+from .lru_cache import LRUTTLCache
+
+
+class _Flight:
+    """One in-progress computation that other callers can wait on"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Optional[List[str]] = None
+
+
+class SearchResultCache(ISearchResultCache):
+    """
+    Caches ranked product IDs per normalized query.
+
+    - "  Điện Thoại " and "dien thoai" share one entry (trim, lowercase,
+      diacritic folding)
+    - Concurrent misses for the same query run the search once; the other
+      callers wait for that result (single-flight)
+    - Any product write bumps a version that is part of every key, so all
+      older results become unreachable at once and age out of the LRU
+    - Only IDs are cached: callers hydrate them through the product
+      repository, so prices and stock stay current
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl: float = 300):
+        self.cache = LRUTTLCache(max_entries=max_entries, ttl=ttl)
+        self._version = 0
+        self._flights: Dict[tuple, _Flight] = {}
+        self._lock = threading.Lock()
+        self.coalesced = 0
+
+    def get_or_compute(self, query: str, compute: Callable[[], Optional[List[str]]],
+                       limit: int = 0) -> Optional[List[str]]:
+        """Cached ranked IDs for query; compute() runs on miss (None results are not cached)"""
+        key = (self._version, normalize_query(query), limit)
+        result = self.cache.get(key)
+        if result is not None:
+            return result
+
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            flight.done.wait()
+            return flight.result
+
+        try:
+            flight.result = compute()
+            if flight.result is not None:
+                self.cache.set(key, flight.result)
+            return flight.result
+        finally:
+            with self._lock:
+                self._flights.pop(key, None)
+            flight.done.set()
+
+    def invalidate(self) -> None:
+        """Make every cached result stale"""
+        with self._lock:
+            self._version += 1
+        self.cache.clear()
+
+    def index_product(self, product: Product) -> None:
+        """A product was created or updated"""
+        self.invalidate()
+
+    def remove_product(self, product_id) -> None:
+        """A product was deleted"""
+        self.invalidate()
+
+    def get_stats(self) -> dict:
+        """Hit-rate counters plus single-flight and version info"""
+        stats = self.cache.get_stats()
+        stats['coalesced'] = self.coalesced
+        stats['version'] = self._version
+        return stats
@@ -1,11 +1,34 @@
+from .connection_pool import MySQLConnectionPool, PooledConnection, PoolExhaustedError
+from .unit_of_work import RequestUnitOfWork, UnitOfWorkConnection, UnitOfWorkError
+from .bulk_writer import bulk_insert, bulk_update_case, execute_in_chunks
+from .keyset import keyset_clause
 from .mysql_user_repository import MySQLUserRepository
 from .mysql_product_repository import MySQLProductRepository
 from .mysql_category_repository import MySQLCategoryRepository
 from .mysql_order_repository import MySQLOrderRepository
+from .mysql_association_repository import MySQLAssociationRepository
+from .migrations import MigrationRunner, MigrationError, MIGRATIONS
+from .query_plans import QueryPlanChecker, QueryPlanReport
 
 __all__ = [
+    'MySQLConnectionPool',
+    'PooledConnection',
+    'PoolExhaustedError',
+    'RequestUnitOfWork',
+    'UnitOfWorkConnection',
+    'UnitOfWorkError',
+    'bulk_insert',
+    'bulk_update_case',
+    'execute_in_chunks',
+    'keyset_clause',
     'MySQLUserRepository',
     'MySQLProductRepository',
     'MySQLCategoryRepository',
-    'MySQLOrderRepository'
+    'MySQLOrderRepository',
+    'MySQLAssociationRepository',
+    'MigrationRunner',
+    'MigrationError',
+    'MIGRATIONS',
+    'QueryPlanChecker',
+    'QueryPlanReport'
 ]
@@ -0,0 +1,137 @@
+"""Bulk Write Helpers - Multi-row statements chunked by max_allowed_packet"""
+from typing import Dict, Iterable, List, Sequence
+
+# Leave headroom for escaping and protocol overhead
+_PACKET_USAGE = 0.8
+_FALLBACK_MAX_PACKET = 4 * 1024 * 1024
+_MAX_ROWS_PER_CHUNK = 1000
+
+_max_packet = None
+
+
+def get_max_allowed_packet(cursor) -> int:
+    """Read @@max_allowed_packet once (the app talks to a single server) and cache it"""
+    global _max_packet
+    if _max_packet is None:
+        try:
+            cursor.execute("SELECT @@max_allowed_packet AS max_packet")
+            row = cursor.fetchone()
+            _max_packet = int(row['max_packet'] if isinstance(row, dict) else row[0])
+        except Exception:
+            _max_packet = _FALLBACK_MAX_PACKET
+    return _max_packet
+
+
+def _estimate_size(values: Iterable) -> int:
+    """Rough wire size of a row of parameters after escaping/quoting"""
+    size = 0
+    for value in values:
+        if value is None:
+            size += 5
+        elif isinstance(value, (bytes, bytearray)):
+            size += 2 * len(value) + 3
+        else:
+            size += len(str(value).encode('utf-8')) + 4
+    return size
+
+
+def _chunk_rows(rows: Sequence[Sequence], base_size: int, max_packet: int,
+                per_row_overhead: int) -> List[List[Sequence]]:
+    """Split rows so each statement stays under the packet budget"""
+    budget = int(max_packet * _PACKET_USAGE) - base_size
+    chunks, current, current_size = [], [], 0
+    for row in rows:
+        row_size = _estimate_size(row) + per_row_overhead
+        if current and (current_size + row_size > budget or len(current) >= _MAX_ROWS_PER_CHUNK):
+            chunks.append(current)
+            current, current_size = [], 0
+        current.append(row)
+        current_size += row_size
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def bulk_insert(cursor, table: str, columns: Sequence[str], rows: Sequence[Sequence],
+                max_packet: int = None, suffix: str = '') -> int:
+    """
+    INSERT many rows with multi-row VALUES statements.
+    suffix is appended to every statement (e.g. "ON DUPLICATE KEY UPDATE ...").
+    Returns: number of inserted rows
+    """
+    if not rows:
+        return 0
+
+    max_packet = max_packet or get_max_allowed_packet(cursor)
+    column_sql = ", ".join(columns)
+    row_sql = "(" + ", ".join(["%s"] * len(columns)) + ")"
+    base_sql = f"INSERT INTO {table} ({column_sql}) VALUES "
+
+    inserted = 0
+    for chunk in _chunk_rows(rows, len(base_sql) + len(suffix), max_packet, len(row_sql) + 2):
+        query = base_sql + ", ".join([row_sql] * len(chunk))
+        if suffix:
+            query += " " + suffix
+        cursor.execute(query, tuple(value for row in chunk for value in row))
+        inserted += cursor.rowcount
+    return inserted
+
+
+def bulk_update_case(cursor, table: str, key_column: str, set_column: str,
+                     values: Dict, relative: bool = False, require_non_negative: bool = False,
+                     max_packet: int = None) -> int:
+    """
+    Set one column for many rows with a single UPDATE ... CASE statement per chunk.
+
+    - relative: add the value to the current column instead of overwriting it
+    - require_non_negative: only touch rows where the result stays >= 0
+      (e.g. stock decrements); compare the returned count with len(values)
+
+    Returns: number of updated rows
+    """
+    if not values:
+        return 0
+
+    max_packet = max_packet or get_max_allowed_packet(cursor)
+    items = [(key, value) for key, value in values.items()]
+
+    updated = 0
+    for chunk in _chunk_rows(items, 200, max_packet, len(" WHEN %s THEN %s") * 2 + 4):
+        case_sql = "CASE " + key_column + " " + " ".join(["WHEN %s THEN %s"] * len(chunk)) + " END"
+        case_params = [v for pair in chunk for v in pair]
+        keys = [key for key, _ in chunk]
+        placeholders = ", ".join(["%s"] * len(keys))
+
+        new_value_sql = f"{set_column} + ({case_sql})" if relative else f"({case_sql})"
+        query = f"UPDATE {table} SET {set_column} = {new_value_sql} WHERE {key_column} IN ({placeholders})"
+        params = case_params + keys
+        if require_non_negative:
+            query += f" AND {new_value_sql} >= 0"
+            params += case_params
+
+        cursor.execute(query, tuple(params))
+        updated += cursor.rowcount
+    return updated
+
+
+def execute_in_chunks(cursor, query_template: str, keys: Sequence, params: Sequence = (),
+                      max_packet: int = None) -> int:
+    """
+    Run a statement whose `{in_clause}` placeholder expands to an IN list,
+    chunked by packet size. Leading params are bound before the keys.
+    Example: "UPDATE orders SET status = %s WHERE id IN ({in_clause})"
+    Returns: total affected rows
+    """
+    if not keys:
+        return 0
+
+    max_packet = max_packet or get_max_allowed_packet(cursor)
+    base_size = len(query_template) + _estimate_size(params)
+
+    affected = 0
+    for chunk in _chunk_rows([(key,) for key in keys], base_size, max_packet, 4):
+        chunk_keys = [row[0] for row in chunk]
+        query = query_template.format(in_clause=", ".join(["%s"] * len(chunk_keys)))
+        cursor.execute(query, tuple(params) + tuple(chunk_keys))
+        affected += cursor.rowcount
+    return affected
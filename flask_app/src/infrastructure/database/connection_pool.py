@@ -0,0 +1,195 @@
+"""MySQL Connection Pool - Shared connections for all repositories"""
+import threading
+import time
+from collections import deque
+import mysql.connector
+
+
+class PoolExhaustedError(Exception):
+    """Raised when no pooled connection becomes free before the checkout timeout"""
+    pass
+
+
+class PooledConnection:
+    """Proxy around a raw MySQL connection; close() returns it to the pool"""
+
+    def __init__(self, pool: 'MySQLConnectionPool', raw_connection, created_at: float):
+        self._pool = pool
+        self._raw = raw_connection
+        self.created_at = created_at
+
+    @property
+    def raw(self):
+        """Underlying mysql.connector connection"""
+        return self._raw
+
+    def close(self) -> None:
+        """Give the connection back to the pool instead of closing the socket"""
+        if self._raw is not None:
+            raw, self._raw = self._raw, None
+            self._pool._release(raw, self.created_at)
+
+    def __getattr__(self, name):
+        if self._raw is None:
+            raise mysql.connector.errors.OperationalError("Connection already returned to pool")
+        return getattr(self._raw, name)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+
+class MySQLConnectionPool:
+    """
+    Thread-safe pool of MySQL connections.
+
+    - pool_size: maximum number of open connections
+    - max_lifetime: seconds after which a connection is closed and replaced
+    - health_check_after: idle seconds after which a checkout pings the server
+    - checkout_timeout: seconds to wait for a free connection before failing
+    """
+
+    def __init__(self, db_config: dict, pool_size: int = 10, max_lifetime: int = 1800,
+                 health_check_after: int = 30, checkout_timeout: float = 10.0):
+        self.db_config = db_config
+        self.pool_size = pool_size
+        self.max_lifetime = max_lifetime
+        self.health_check_after = health_check_after
+        self.checkout_timeout = checkout_timeout
+
+        self._idle = deque()  # (raw_connection, created_at, returned_at)
+        self._in_use = 0
+        self._lock = threading.Condition()
+
+        # Stats
+        self._connections_created = 0
+        self._connections_recycled = 0
+        self._checkouts = 0
+        self._waits = 0
+        self._total_wait_time = 0.0
+        self._max_wait_time = 0.0
+
+    def _connect(self):
+        """Open a new physical connection (TCP + auth handshake)"""
+        raw = mysql.connector.connect(**self.db_config)
+        with self._lock:
+            self._connections_created += 1
+        return raw
+
+    def _discard(self, raw) -> None:
+        """Close a physical connection, ignoring errors"""
+        try:
+            raw.close()
+        except Exception:
+            pass
+
+    def _is_expired(self, created_at: float, now: float) -> bool:
+        return self.max_lifetime > 0 and now - created_at >= self.max_lifetime
+
+    def _is_healthy(self, raw, returned_at: float, now: float) -> bool:
+        """Ping connections that sat idle long enough to have been dropped by the server"""
+        if now - returned_at < self.health_check_after:
+            return True
+        try:
+            raw.ping(reconnect=False)
+            return True
+        except Exception:
+            return False
+
+    def get_connection(self) -> PooledConnection:
+        """Check out a connection, waiting up to checkout_timeout if the pool is full"""
+        started = time.monotonic()
+        waited = False
+        with self._lock:
+            while not self._idle and self._in_use >= self.pool_size:
+                waited = True
+                remaining = self.checkout_timeout - (time.monotonic() - started)
+                if remaining <= 0:
+                    raise PoolExhaustedError(
+                        f"No free MySQL connection after {self.checkout_timeout}s "
+                        f"(pool_size={self.pool_size})"
+                    )
+                self._lock.wait(remaining)
+
+            candidate = self._idle.pop() if self._idle else None
+            self._in_use += 1
+            self._checkouts += 1
+            wait_time = time.monotonic() - started
+            if waited:
+                self._waits += 1
+                self._total_wait_time += wait_time
+                self._max_wait_time = max(self._max_wait_time, wait_time)
+
+        try:
+            now = time.monotonic()
+            if candidate is not None:
+                raw, created_at, returned_at = candidate
+                if self._is_expired(created_at, now):
+                    self._discard(raw)
+                    with self._lock:
+                        self._connections_recycled += 1
+                elif self._is_healthy(raw, returned_at, now):
+                    return PooledConnection(self, raw, created_at)
+                else:
+                    self._discard(raw)
+                    with self._lock:
+                        self._connections_recycled += 1
+
+            return PooledConnection(self, self._connect(), time.monotonic())
+        except Exception:
+            with self._lock:
+                self._in_use -= 1
+                self._lock.notify()
+            raise
+
+    def _release(self, raw, created_at: float) -> None:
+        """Return a connection to the idle set, resetting any leftover state"""
+        now = time.monotonic()
+        reusable = not self._is_expired(created_at, now)
+        if reusable:
+            try:
+                if raw.unread_result:
+                    raw.consume_results()
+                if raw.in_transaction:
+                    raw.rollback()
+                if not raw.autocommit and self.db_config.get('autocommit', False):
+                    raw.autocommit = True
+            except Exception:
+                reusable = False
+
+        if not reusable:
+            self._discard(raw)
+
+        with self._lock:
+            self._in_use -= 1
+            if reusable:
+                self._idle.append((raw, created_at, now))
+            else:
+                self._connections_recycled += 1
+            self._lock.notify()
+
+    def close_all(self) -> None:
+        """Close all idle connections (in-use ones are closed when released)"""
+        with self._lock:
+            idle, self._idle = list(self._idle), deque()
+        for raw, _, _ in idle:
+            self._discard(raw)
+
+    def get_stats(self) -> dict:
+        """Snapshot of pool usage counters"""
+        with self._lock:
+            return {
+                'pool_size': self.pool_size,
+                'in_use': self._in_use,
+                'idle': len(self._idle),
+                'connections_created': self._connections_created,
+                'connections_recycled': self._connections_recycled,
+                'checkouts': self._checkouts,
+                'waits': self._waits,
+                'total_wait_time': self._total_wait_time,
+                'avg_wait_time': self._total_wait_time / self._waits if self._waits else 0.0,
+                'max_wait_time': self._max_wait_time
+            }
@@ -0,0 +1,13 @@
+"""Keyset Pagination Helpers - WHERE predicates for cursor-based paging"""
+from typing import List
+
+
+def keyset_clause(columns: List[str], direction: str, after: list) -> tuple[str, list]:
+    """Build `(a > x OR (a = x AND b > y))` style predicate for a keyset cursor"""
+    op = '<' if direction == 'DESC' else '>'
+    clauses, params = [], []
+    for i, column in enumerate(columns):
+        parts = [f"{columns[j]} = %s" for j in range(i)] + [f"{column} {op} %s"]
+        clauses.append("(" + " AND ".join(parts) + ")")
+        params.extend(after[:i] + [after[i]])
+    return "(" + " OR ".join(clauses) + ")", params
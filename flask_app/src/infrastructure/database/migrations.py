@@ -0,0 +1,262 @@
+"""Schema Migrations - Versioned, idempotent schema and index changes for MySQL"""
+from dataclasses import dataclass
+from typing import Callable, List, Tuple, Union
+from .unit_of_work import RequestUnitOfWork
+from .mysql_order_repository import SUMMARY_SCHEMA, SUMMARY_BACKFILL
+from .mysql_association_repository import SCHEMA as COPURCHASE_SCHEMA
+
+
+class MigrationError(Exception):
+    """Raised when a migration step fails; earlier versions stay applied"""
+    pass
+
+
+@dataclass(frozen=True)
+class AddColumn:
+    """ALTER TABLE ... ADD COLUMN, skipped when the column exists"""
+    table: str
+    column: str
+    definition: str
+
+
+@dataclass(frozen=True)
+class AddIndex:
+    """
+    CREATE INDEX, skipped when an index of that name exists or an existing
+    index already starts with the same columns (e.g. one created by a FK)
+    """
+    table: str
+    name: str
+    columns: Tuple[str, ...]
+
+
+Step = Union[str, AddColumn, AddIndex]
+
+
+@dataclass(frozen=True)
+class Migration:
+    """One schema version: steps run in order, each safe to re-run"""
+    version: int
+    name: str
+    steps: Tuple[Step, ...]
+
+
+BASE_SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS categories (
+        id INT AUTO_INCREMENT PRIMARY KEY,
+        tenDM VARCHAR(100) NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS products (
+        id VARCHAR(50) NOT NULL PRIMARY KEY,
+        tenSP VARCHAR(255) NOT NULL,
+        mota TEXT NULL,
+        gia DECIMAL(15, 2) NOT NULL DEFAULT 0,
+        categoryID INT NULL,
+        image VARCHAR(500) NULL,
+        namSX INT NULL,
+        thongso TEXT NULL,
+        bestSeller TINYINT(1) NOT NULL DEFAULT 0,
+        stock_quantity INT NOT NULL DEFAULT 0,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        CONSTRAINT fk_products_category FOREIGN KEY (categoryID) REFERENCES categories (id)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS users (
+        id VARCHAR(50) NOT NULL PRIMARY KEY,
+        email VARCHAR(255) NOT NULL,
+        password VARCHAR(255) NOT NULL,
+        full_name VARCHAR(255) NULL,
+        phone VARCHAR(20) NULL,
+        address TEXT NULL,
+        role VARCHAR(20) NOT NULL DEFAULT 'user',
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS orders (
+        id VARCHAR(50) NOT NULL PRIMARY KEY,
+        user_id VARCHAR(50) NOT NULL,
+        shipping_name VARCHAR(255) NOT NULL,
+        shipping_phone VARCHAR(20) NOT NULL,
+        shipping_address TEXT NOT NULL,
+        payment_method VARCHAR(50) NOT NULL,
+        total_amount DECIMAL(15, 2) NOT NULL DEFAULT 0,
+        status VARCHAR(20) NOT NULL DEFAULT 'pending',
+        order_date DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS order_items (
+        id INT AUTO_INCREMENT PRIMARY KEY,
+        order_id VARCHAR(50) NOT NULL,
+        product_id VARCHAR(50) NOT NULL,
+        product_name VARCHAR(255) NOT NULL,
+        product_price DECIMAL(15, 2) NOT NULL,
+        quantity INT NOT NULL,
+        subtotal DECIMAL(15, 2) NOT NULL,
+        CONSTRAINT fk_order_items_order FOREIGN KEY (order_id) REFERENCES orders (id) ON DELETE CASCADE,
+        CONSTRAINT fk_order_items_product FOREIGN KEY (product_id) REFERENCES products (id)
+    )
+    """,
+)
+
+# Digits-only test built from REPLACE: regular expression functions are not
+# accepted in generated column expressions on every MySQL version we run
+_NON_DIGITS = 'id'
+for _digit in '0123456789':
+    _NON_DIGITS = f"REPLACE({_NON_DIGITS}, '{_digit}', '')"
+PRODUCT_SORT_ID = (
+    f"CASE WHEN id <> '' AND CHAR_LENGTH(id) <= 18 AND {_NON_DIGITS} = '' "
+    f"THEN CAST(id AS UNSIGNED) ELSE 0 END"
+)
+
+MIGRATIONS = (
+    # Baseline: a no-op on databases created before migrations existed
+    Migration(1, 'base_schema', BASE_SCHEMA),
+    # products.id is a varchar, so ORDER BY id sorts '9' after '10'; sort_id is
+    # its numeric value (0 for non-numeric ids) and the listing tie-breaker
+    Migration(2, 'product_sort_key', (
+        AddColumn('products', 'sort_id', f"BIGINT UNSIGNED AS ({PRODUCT_SORT_ID}) STORED NOT NULL"),
+        AddIndex('products', 'idx_products_sort', ('sort_id',)),
+        AddIndex('products', 'idx_products_category_sort', ('categoryID', 'sort_id')),
+        AddIndex('products', 'idx_products_price_sort', ('gia', 'sort_id')),
+        AddIndex('products', 'idx_products_bestseller_sort', ('bestSeller', 'sort_id')),
+    )),
+    Migration(3, 'order_and_user_indexes', (
+        AddIndex('users', 'idx_users_email', ('email',)),
+        # Admin order list: one index per sort, status tab first where filtered
+        AddIndex('orders', 'idx_orders_date', ('order_date', 'id')),
+        AddIndex('orders', 'idx_orders_status_date', ('status', 'order_date', 'id')),
+        AddIndex('orders', 'idx_orders_total', ('total_amount', 'id')),
+        AddIndex('orders', 'idx_orders_user_date', ('user_id', 'order_date', 'id')),
+        AddIndex('orders', 'idx_orders_phone', ('shipping_phone',)),
+        # Covering for order baskets and units sold: never touches the item rows
+        AddIndex('order_items', 'idx_order_items_order_product', ('order_id', 'product_id', 'quantity')),
+        AddIndex('order_items', 'idx_order_items_product', ('product_id',)),
+    )),
+    Migration(4, 'order_summaries', (SUMMARY_SCHEMA, SUMMARY_BACKFILL)),
+    Migration(5, 'copurchase', COPURCHASE_SCHEMA),
+)
+
+_VERSION_TABLE = """
+    CREATE TABLE IF NOT EXISTS schema_migrations (
+        version INT NOT NULL PRIMARY KEY,
+        name VARCHAR(100) NOT NULL,
+        applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+"""
+
+
+class MigrationRunner:
+    """
+    Applies MIGRATIONS in version order and records each one in
+    schema_migrations. MySQL commits DDL implicitly, so a version is not
+    atomic; every step checks the current schema first instead, and a run
+    interrupted halfway simply redoes the unfinished version.
+
+    Run outside a request (flask migrate) so nothing is deferred by the
+    request unit of work.
+    """
+
+    def __init__(self, unit_of_work: RequestUnitOfWork, migrations: Tuple[Migration, ...] = MIGRATIONS):
+        self.unit_of_work = unit_of_work
+        self.migrations = tuple(sorted(migrations, key=lambda migration: migration.version))
+
+    def _get_connection(self):
+        """Get a database connection"""
+        return self.unit_of_work.get_connection()
+
+    def applied_versions(self) -> List[int]:
+        """Versions already recorded in schema_migrations"""
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(_VERSION_TABLE)
+            cursor.execute("SELECT version FROM schema_migrations ORDER BY version")
+            versions = [int(row[0]) for row in cursor.fetchall()]
+            cursor.close()
+        return versions
+
+    def pending(self) -> List[Migration]:
+        """Migrations not applied yet, oldest first"""
+        applied = set(self.applied_versions())
+        return [migration for migration in self.migrations if migration.version not in applied]
+
+    def migrate(self, target: int = None, log: Callable[[str], None] = print) -> List[int]:
+        """
+        Apply pending migrations up to `target` (all if None)
+        Returns: versions applied by this run
+        Raises: MigrationError naming the failed version and step
+        """
+        applied = []
+        for migration in self.pending():
+            if target is not None and migration.version > target:
+                break
+            log(f"Applying {migration.version:03d}_{migration.name}")
+            with self._get_connection() as conn:
+                cursor = conn.cursor()
+                for number, step in enumerate(migration.steps, 1):
+                    try:
+                        description = self._apply(cursor, step)
+                    except Exception as e:
+                        cursor.close()
+                        raise MigrationError(
+                            f"{migration.version:03d}_{migration.name} step {number}: {e}"
+                        ) from e
+                    if description:
+                        log(f"  {description}")
+                cursor.execute(
+                    "INSERT INTO schema_migrations (version, name) VALUES (%s, %s)",
+                    (migration.version, migration.name)
+                )
+                conn.commit()
+                cursor.close()
+            applied.append(migration.version)
+        return applied
+
+    # Steps
+
+    def _apply(self, cursor, step: Step) -> str:
+        """Run one step; returns what it did, or '' when there was nothing to do"""
+        if isinstance(step, AddColumn):
+            if self._column_exists(cursor, step.table, step.column):
+                return ''
+            cursor.execute(f"ALTER TABLE {step.table} ADD COLUMN {step.column} {step.definition}")
+            return f"added column {step.table}.{step.column}"
+        if isinstance(step, AddIndex):
+            if self._index_exists(cursor, step.table, step.name, step.columns):
+                return ''
+            cursor.execute(f"CREATE INDEX {step.name} ON {step.table} ({', '.join(step.columns)})")
+            return f"created index {step.name} on {step.table} ({', '.join(step.columns)})"
+        cursor.execute(step)
+        return ''
+
+    def _column_exists(self, cursor, table: str, column: str) -> bool:
+        """Whether the column is already defined"""
+        cursor.execute(
+            """
+            SELECT COUNT(*) FROM information_schema.columns
+            WHERE table_schema = DATABASE() AND table_name = %s AND column_name = %s
+            """,
+            (table, column)
+        )
+        return cursor.fetchone()[0] > 0
+
+    def _index_exists(self, cursor, table: str, name: str, columns: Tuple[str, ...]) -> bool:
+        """Whether an index of this name, or one already covering these leading columns, exists"""
+        cursor.execute(
+            """
+            SELECT index_name, column_name FROM information_schema.statistics
+            WHERE table_schema = DATABASE() AND table_name = %s
+            ORDER BY index_name, seq_in_index
+            """,
+            (table,)
+        )
+        indexes = {}
+        for index_name, column_name in cursor.fetchall():
+            indexes.setdefault(str(index_name), []).append(str(column_name).lower())
+        wanted = [column.lower() for column in columns]
+        return name in indexes or any(existing[:len(wanted)] == wanted for existing in indexes.values())
@@ -0,0 +1,288 @@
+"""MySQL Association Repository - Co-purchase counts and bought-together lookups"""
+from typing import Dict, Iterator, List, Optional, Tuple
+from ...domain.repositories import IAssociationRepository
+from .unit_of_work import RequestUnitOfWork
+from .bulk_writer import bulk_insert
+
+JOB_NAME = 'copurchase'
+
+SCHEMA = (
+    # Symmetric pair counts; the (p, p) diagonal holds how many orders contain p
+    """
+    CREATE TABLE IF NOT EXISTS product_copurchase (
+        product_id VARCHAR(50) NOT NULL,
+        related_id VARCHAR(50) NOT NULL,
+        pair_count INT NOT NULL DEFAULT 0,
+        PRIMARY KEY (product_id, related_id)
+    )
+    """,
+    # Precomputed top-k per product, read by primary key
+    """
+    CREATE TABLE IF NOT EXISTS product_associations (
+        product_id VARCHAR(50) NOT NULL PRIMARY KEY,
+        related_ids VARCHAR(1000) NOT NULL DEFAULT '',
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS batch_job_state (
+        job_name VARCHAR(50) NOT NULL PRIMARY KEY,
+        last_order_date DATETIME NULL,
+        last_order_id VARCHAR(50) NULL,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+    )
+    """
+)
+
+
+class MySQLAssociationRepository(IAssociationRepository):
+    """MySQL implementation of the co-purchase repository"""
+
+    # Orders younger than this are left for the next run, so an order committed
+    # late with an older timestamp than the watermark is not skipped
+    SETTLE_SECONDS = 60
+
+    def __init__(self, unit_of_work: RequestUnitOfWork):
+        self.unit_of_work = unit_of_work
+
+    def _get_connection(self):
+        """Get the request-scoped database connection"""
+        return self.unit_of_work.get_connection()
+
+    def get_related(self, product_id: int) -> List[str]:
+        """Product IDs most often bought with product_id (best first)"""
+        return self.get_related_many([product_id]).get(str(product_id), [])
+
+    def get_related_many(self, product_ids: List[str]) -> Dict[str, List[str]]:
+        """Lookup rows of several products in one query"""
+        keys = list(dict.fromkeys(str(pid) for pid in product_ids))
+        if not keys:
+            return {}
+        try:
+            with self._get_connection() as conn:
+                cursor = conn.cursor()
+                placeholders = ", ".join(["%s"] * len(keys))
+                cursor.execute(
+                    f"SELECT product_id, related_ids FROM product_associations "
+                    f"WHERE product_id IN ({placeholders})",
+                    tuple(keys)
+                )
+                rows = cursor.fetchall()
+                cursor.close()
+            return {str(row[0]): [rid for rid in row[1].split(',') if rid] for row in rows}
+        except Exception as e:
+            self.unit_of_work.rollback()
+            print(f"Error getting associations: {e}")
+            return {}
+
+    def stream_baskets(self, after: Optional[Tuple], batch_size: int) -> Iterator[List[Tuple]]:
+        """
+        Batches of (order_date, order_id, [product_ids]) in (order_date, id)
+        order, skipping cancelled orders. One short query pair per batch, so
+        no connection or cursor is held between batches.
+        """
+        while True:
+            try:
+                with self._get_connection() as conn:
+                    cursor = conn.cursor()
+                    query = """
+                        SELECT id, order_date FROM orders
+                        WHERE status <> 'cancelled'
+                          AND order_date < NOW() - INTERVAL %s SECOND
+                    """
+                    params = [self.SETTLE_SECONDS]
+                    if after:
+                        query += " AND (order_date > %s OR (order_date = %s AND id > %s))"
+                        params += [after[0], after[0], after[1]]
+                    query += " ORDER BY order_date, id LIMIT %s"
+                    params.append(batch_size)
+                    cursor.execute(query, tuple(params))
+                    orders = cursor.fetchall()
+
+                    items: Dict[str, List[str]] = {}
+                    if orders:
+                        order_ids = [str(row[0]) for row in orders]
+                        placeholders = ", ".join(["%s"] * len(order_ids))
+                        cursor.execute(
+                            f"SELECT order_id, product_id FROM order_items "
+                            f"WHERE order_id IN ({placeholders})",
+                            tuple(order_ids)
+                        )
+                        for order_id, product_id in cursor.fetchall():
+                            items.setdefault(str(order_id), []).append(str(product_id))
+                    cursor.close()
+            except Exception as e:
+                self.unit_of_work.rollback()
+                print(f"Error streaming order baskets: {e}")
+                return
+
+            if not orders:
+                return
+            yield [(row[1], str(row[0]), items.get(str(row[0]), [])) for row in orders]
+            if len(orders) < batch_size:
+                return
+            after = (orders[-1][1], str(orders[-1][0]))
+
+    def apply_batch(self, pair_counts: Dict[Tuple[str, str], int], watermark: Tuple) -> bool:
+        """Add co-occurrence counts and advance the watermark in one transaction"""
+        try:
+            with self._get_connection() as conn:
+                try:
+                    if not conn.in_transaction:
+                        conn.start_transaction()
+                    cursor = conn.cursor()
+                    bulk_insert(
+                        cursor, 'product_copurchase', ('product_id', 'related_id', 'pair_count'),
+                        [(a, b, count) for (a, b), count in pair_counts.items()],
+                        suffix="ON DUPLICATE KEY UPDATE pair_count = pair_count + VALUES(pair_count)"
+                    )
+                    cursor.execute(
+                        """
+                        INSERT INTO batch_job_state (job_name, last_order_date, last_order_id)
+                        VALUES (%s, %s, %s)
+                        ON DUPLICATE KEY UPDATE last_order_date = VALUES(last_order_date),
+                                                last_order_id = VALUES(last_order_id)
+                        """,
+                        (JOB_NAME, watermark[0], watermark[1])
+                    )
+                    conn.commit()
+                    cursor.close()
+                except Exception:
+                    conn.rollback()
+                    raise
+            return True
+        except Exception as e:
+            self.unit_of_work.rollback()
+            print(f"Error applying co-purchase batch: {e}")
+            return False
+
+    def get_pair_counts(self, product_ids: List[str]) -> List[Tuple[str, str, int]]:
+        """All (product_id, related_id, count) rows for the given products, diagonal included"""
+        if not product_ids:
+            return []
+        try:
+            with self._get_connection() as conn:
+                cursor = conn.cursor()
+                rows = []
+                keys = list(product_ids)
+                # Chunk the IN list; a full re-mine can touch the whole catalog
+                for start in range(0, len(keys), 1000):
+                    chunk = keys[start:start + 1000]
+                    placeholders = ", ".join(["%s"] * len(chunk))
+                    cursor.execute(
+                        f"SELECT product_id, related_id, pair_count FROM product_copurchase "
+                        f"WHERE product_id IN ({placeholders})",
+                        tuple(chunk)
+                    )
+                    rows.extend((str(a), str(b), int(count)) for a, b, count in cursor.fetchall())
+                cursor.close()
+            return rows
+        except Exception as e:
+            self.unit_of_work.rollback()
+            print(f"Error getting co-purchase counts: {e}")
+            return []
+
+    def get_support(self, product_ids: List[str]) -> Dict[str, int]:
+        """Number of orders containing each product (the diagonal rows)"""
+        if not product_ids:
+            return {}
+        try:
+            with self._get_connection() as conn:
+                cursor = conn.cursor()
+                support = {}
+                keys = list(product_ids)
+                for start in range(0, len(keys), 1000):
+                    chunk = keys[start:start + 1000]
+                    placeholders = ", ".join(["%s"] * len(chunk))
+                    cursor.execute(
+                        f"SELECT product_id, pair_count FROM product_copurchase "
+                        f"WHERE product_id = related_id AND product_id IN ({placeholders})",
+                        tuple(chunk)
+                    )
+                    support.update((str(pid), int(count)) for pid, count in cursor.fetchall())
+                cursor.close()
+            return support
+        except Exception as e:
+            self.unit_of_work.rollback()
+            print(f"Error getting product support: {e}")
+            return {}
+
+    def save_associations(self, associations: Dict[str, List[str]]) -> bool:
+        """Upsert the top-k lookup rows of the given products"""
+        if not associations:
+            return True
+        try:
+            with self._get_connection() as conn:
+                try:
+                    cursor = conn.cursor()
+                    bulk_insert(
+                        cursor, 'product_associations', ('product_id', 'related_ids'),
+                        [(pid, ','.join(related)) for pid, related in associations.items()],
+                        suffix="ON DUPLICATE KEY UPDATE related_ids = VALUES(related_ids)"
+                    )
+                    conn.commit()
+                    cursor.close()
+                except Exception:
+                    conn.rollback()
+                    raise
+            return True
+        except Exception as e:
+            self.unit_of_work.rollback()
+            print(f"Error saving associations: {e}")
+            return False
+
+    def get_watermark(self) -> Optional[Tuple]:
+        """(order_date, order_id) of the last processed order, or None"""
+        try:
+            with self._get_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute(
+                    "SELECT last_order_date, last_order_id FROM batch_job_state WHERE job_name = %s",
+                    (JOB_NAME,)
+                )
+                row = cursor.fetchone()
+                cursor.close()
+            if not row or row[0] is None:
+                return None
+            return row[0], str(row[1])
+        except Exception as e:
+            self.unit_of_work.rollback()
+            print(f"Error getting job watermark: {e}")
+            return None
+
+    def ensure_schema(self) -> bool:
+        """Create the co-purchase tables if they do not exist"""
+        try:
+            with self._get_connection() as conn:
+                cursor = conn.cursor()
+                for statement in SCHEMA:
+                    cursor.execute(statement)
+                conn.commit()
+                cursor.close()
+            return True
+        except Exception as e:
+            self.unit_of_work.rollback()
+            print(f"Error creating co-purchase tables: {e}")
+            return False
+
+    def reset(self) -> bool:
+        """Drop all counts, lookups and the watermark (full re-mine)"""
+        try:
+            with self._get_connection() as conn:
+                try:
+                    if not conn.in_transaction:
+                        conn.start_transaction()
+                    cursor = conn.cursor()
+                    cursor.execute("DELETE FROM product_copurchase")
+                    cursor.execute("DELETE FROM product_associations")
+                    cursor.execute("DELETE FROM batch_job_state WHERE job_name = %s", (JOB_NAME,))
+                    conn.commit()
+                    cursor.close()
+                except Exception:
+                    conn.rollback()
+                    raise
+            return True
+        except Exception as e:
+            self.unit_of_work.rollback()
+            print(f"Error resetting co-purchase data: {e}")
+            return False
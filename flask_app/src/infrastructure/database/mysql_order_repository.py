@@ -1,188 +1,521 @@
 """MySQL Order Repository Implementation"""
-import mysql.connector
-from typing import List, Optional
-from ...domain.entities import Order, OrderItem, OrderStatus
+import re
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+from ...domain.entities import Order, OrderItem, OrderStatus, OrderSummary, OrderFilter, OrderSort
 from ...domain.repositories import IOrderRepository
+from .unit_of_work import RequestUnitOfWork
+from .bulk_writer import bulk_insert, bulk_update_case
+from .keyset import keyset_clause
+
+# Admin search keyword shapes: order ids are exactly what CreateOrderUseCase generates
+# (ORD + %Y%m%d%H%M%S + 4 upper-case hex digits, e.g. ORD20240101123000AB12), phones are digits
+ORDER_ID_PATTERN = re.compile(r'ORD\d{14}[0-9A-F]{4}', re.IGNORECASE)
+PHONE_PATTERN = re.compile(r'\+?[0-9]+')
+
+# Order history projection: one narrow row per order, read by (user_id, order_date, order_id)
+SUMMARY_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS order_summaries (
+        order_id VARCHAR(50) NOT NULL PRIMARY KEY,
+        user_id VARCHAR(50) NOT NULL,
+        order_date DATETIME NOT NULL,
+        status VARCHAR(20) NOT NULL,
+        total_amount DECIMAL(15, 2) NOT NULL DEFAULT 0,
+        item_count INT NOT NULL DEFAULT 0,
+        first_image VARCHAR(255) NOT NULL DEFAULT '',
+        first_product_name VARCHAR(255) NOT NULL DEFAULT '',
+        INDEX idx_order_summaries_user_date (user_id, order_date, order_id)
+    )
+"""
+
+# (Re)fill the projection from orders; also run by schema migration 004
+SUMMARY_BACKFILL = """
+    INSERT INTO order_summaries (order_id, user_id, order_date, status, total_amount,
+                                 item_count, first_image, first_product_name)
+    SELECT o.id, o.user_id, o.order_date, o.status, o.total_amount,
+           COALESCE(items.item_count, 0),
+           COALESCE((SELECT p.image FROM order_items fi
+                     JOIN products p ON p.id = fi.product_id
+                     WHERE fi.order_id = o.id ORDER BY fi.id LIMIT 1), ''),
+           COALESCE((SELECT fi.product_name FROM order_items fi
+                     WHERE fi.order_id = o.id ORDER BY fi.id LIMIT 1), '')
+    FROM orders o
+    LEFT JOIN (
+        SELECT order_id, SUM(quantity) AS item_count
+        FROM order_items GROUP BY order_id
+    ) items ON items.order_id = o.id
+    ON DUPLICATE KEY UPDATE
+        user_id = VALUES(user_id), order_date = VALUES(order_date),
+        status = VALUES(status), total_amount = VALUES(total_amount),
+        item_count = VALUES(item_count), first_image = VALUES(first_image),
+        first_product_name = VALUES(first_product_name)
+"""
 
 
 class MySQLOrderRepository(IOrderRepository):
     """MySQL implementation of Order repository"""
-    
-    def __init__(self, db_config: dict):
-        self.db_config = db_config
-    
+
+    # Order IDs per items query when stitching items onto a list of orders
+    _ITEMS_CHUNK = 1000
+
+    # Keyset ordering per sort option: (column, direction); o.id breaks ties
+    _SORT_COLUMNS = {
+        OrderSort.NEWEST: ('o.order_date', 'DESC'),
+        OrderSort.OLDEST: ('o.order_date', 'ASC'),
+        OrderSort.TOTAL_DESC: ('o.total_amount', 'DESC'),
+        OrderSort.TOTAL_ASC: ('o.total_amount', 'ASC')
+    }
+
+    def __init__(self, unit_of_work: RequestUnitOfWork):
+        self.unit_of_work = unit_of_work
+
     def _get_connection(self):
-        """Create database connection"""
-        return mysql.connector.connect(**self.db_config)
-    
+        """Get the request-scoped database connection"""
+        return self.unit_of_work.get_connection()
+
+    def _insert_items(self, cursor, order: Order) -> None:
+        """Insert all order items with multi-row INSERT statements"""
+        bulk_insert(
+            cursor, 'order_items',
+            ('order_id', 'product_id', 'product_name', 'product_price', 'quantity', 'subtotal'),
+            [
+                (order.id, item.product_id, item.product_name,
+                 item.product_price, item.quantity, item.subtotal)
+                for item in order.items
+            ]
+        )
+
+    def _write_summary(self, cursor, query: str, params: tuple) -> None:
+        """
+        Apply a change to the order_summaries projection in the same
+        transaction as the order write; an error propagates so the caller
+        rolls both back and the projection never drifts from orders
+        """
+        cursor.execute(query, params)
+
+    def _insert_summary(self, cursor, order: Order) -> None:
+        """Write the order history row; date and status come from the orders row just inserted"""
+        first_item = order.items[0] if order.items else None
+        self._write_summary(
+            cursor,
+            """
+            INSERT INTO order_summaries (order_id, user_id, order_date, status, total_amount,
+                                         item_count, first_image, first_product_name)
+            SELECT o.id, o.user_id, o.order_date, o.status, o.total_amount, %s,
+                   COALESCE((SELECT p.image FROM products p WHERE p.id = %s), ''), %s
+            FROM orders o WHERE o.id = %s
+            """,
+            (
+                sum(item.quantity for item in order.items),
+                first_item.product_id if first_item else None,
+                first_item.product_name if first_item else '',
+                order.id
+            )
+        )
+
+    def _map_summary(self, row: dict) -> OrderSummary:
+        """Build an OrderSummary from an order_summaries row"""
+        return OrderSummary(
+            id=row['order_id'],
+            user_id=row['user_id'],
+            created_at=row['order_date'],
+            status=OrderStatus.from_string(row['status']),
+            total_amount=float(row['total_amount']),
+            item_count=int(row['item_count']),
+            first_image=row.get('first_image') or '',
+            first_product_name=row.get('first_product_name') or ''
+        )
+
     def create(self, order: Order) -> Optional[str]:
         """Create new order with items"""
-        conn = None
         try:
-            conn = self._get_connection()
-            cursor = conn.cursor()
-            
-            # Insert order
-            order_query = """
-                INSERT INTO orders (id, user_id, shipping_name, shipping_phone, 
-                                   shipping_address, payment_method, total_amount, status)
-                VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
-            """
-            cursor.execute(order_query, (
-                order.id, order.user_id, order.customer_name, order.customer_phone,
-                order.customer_address, order.payment_method, order.total_amount,
-                order.status.value
-            ))
-            
-            # Insert order items
-            item_query = """
-                INSERT INTO order_items (order_id, product_id, product_name, 
-                                        product_price, quantity, subtotal)
-                VALUES (%s, %s, %s, %s, %s, %s)
-            """
-            for item in order.items:
-                cursor.execute(item_query, (
-                    order.id, item.product_id, item.product_name,
-                    item.product_price, item.quantity, item.subtotal
-                ))
-            
-            conn.commit()
-            cursor.close()
-            conn.close()
-            
+            with self._get_connection() as conn:
+                try:
+                    cursor = conn.cursor()
+
+                    # Insert order
+                    order_query = """
+                        INSERT INTO orders (id, user_id, shipping_name, shipping_phone,
+                                           shipping_address, payment_method, total_amount, status)
+                        VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+                    """
+                    cursor.execute(order_query, (
+                        order.id, order.user_id, order.customer_name, order.customer_phone,
+                        order.customer_address, order.payment_method, order.total_amount,
+                        order.status.value
+                    ))
+
+                    # Insert order items (multi-row VALUES)
+                    self._insert_items(cursor, order)
+                    self._insert_summary(cursor, order)
+
+                    conn.commit()
+                    cursor.close()
+                except Exception:
+                    conn.rollback()
+                    raise
+
             return order.id
         except Exception as e:
-            if conn:
-                conn.rollback()
-                conn.close()
+            self.unit_of_work.rollback()
             print(f"Error creating order: {e}")
             return None
-    
+
+    def place_order(self, order: Order) -> tuple[Optional[str], Optional[str]]:
+        """
+        Insert order + items and decrement stock in a single transaction.
+        Stock only goes down where stock_quantity >= quantity; if any line
+        falls short the order is rolled back to a savepoint taken before it,
+        leaving the rest of the request's transaction usable. Inside a request
+        the order is committed with the request by the unit of work.
+        Returns: (order_id, out_of_stock_product_id)
+        """
+        quantities = {}
+        for item in order.items:
+            key = str(item.product_id)
+            quantities[key] = quantities.get(key, 0) + item.quantity
+        product_ids = list(quantities)
+
+        try:
+            with self._get_connection() as conn:
+                try:
+                    if not conn.in_transaction:
+                        conn.start_transaction()
+                    cursor = conn.cursor()
+                    cursor.execute("SAVEPOINT place_order")
+
+                    order_query = """
+                        INSERT INTO orders (id, user_id, shipping_name, shipping_phone,
+                                           shipping_address, payment_method, total_amount, status)
+                        VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+                    """
+                    cursor.execute(order_query, (
+                        order.id, order.user_id, order.customer_name, order.customer_phone,
+                        order.customer_address, order.payment_method, order.total_amount,
+                        order.status.value
+                    ))
+
+                    self._insert_items(cursor, order)
+                    self._insert_summary(cursor, order)
+
+                    # Conditional decrement: rows without enough stock are not touched
+                    updated = bulk_update_case(
+                        cursor, 'products', 'id', 'stock_quantity',
+                        {pid: -quantities[pid] for pid in product_ids},
+                        relative=True, require_non_negative=True
+                    )
+
+                    if updated != len(product_ids):
+                        # Undo only this order: a full rollback would mark the request's unit rollback-only
+                        cursor.execute("ROLLBACK TO SAVEPOINT place_order")
+                        placeholders = ", ".join(["%s"] * len(product_ids))
+                        cursor.execute(
+                            f"SELECT id, stock_quantity FROM products WHERE id IN ({placeholders})",
+                            tuple(product_ids)
+                        )
+                        stocks = {str(row[0]): row[1] for row in cursor.fetchall()}
+                        cursor.close()
+                        out_of_stock_id = next(
+                            (pid for pid in product_ids if (stocks.get(pid) or 0) < quantities[pid]),
+                            product_ids[0]
+                        )
+                        return None, out_of_stock_id
+
+                    conn.commit()
+                    cursor.close()
+                except Exception:
+                    conn.rollback()
+                    raise
+
+            return order.id, None
+        except Exception as e:
+            self.unit_of_work.rollback()
+            print(f"Error placing order: {e}")
+            return None, None
+
+    def _map_order(self, row: dict) -> Order:
+        """Build an Order (without items) from an orders row"""
+        return Order(
+            id=row['id'],
+            user_id=row['user_id'],
+            customer_name=row.get('shipping_name', ''),
+            customer_phone=row.get('shipping_phone', ''),
+            customer_address=row.get('shipping_address', ''),
+            payment_method=row.get('payment_method', ''),
+            total_amount=float(row['total_amount']),
+            status=OrderStatus.from_string(row['status']),
+            created_at=row.get('order_date')
+        )
+
+    def _attach_items(self, cursor, orders: List[Order]) -> None:
+        """Load the items of all `orders` with one IN query per chunk and stitch them on"""
+        if not orders:
+            return
+        by_id = {order.id: order for order in orders}
+        order_ids = list(by_id)
+        for start in range(0, len(order_ids), self._ITEMS_CHUNK):
+            chunk = order_ids[start:start + self._ITEMS_CHUNK]
+            placeholders = ", ".join(["%s"] * len(chunk))
+            cursor.execute(
+                f"SELECT * FROM order_items WHERE order_id IN ({placeholders}) ORDER BY order_id, id",
+                tuple(chunk)
+            )
+            for item_row in cursor.fetchall():
+                by_id[item_row['order_id']].items.append(OrderItem(**item_row))
+
     def get_by_id(self, order_id: str) -> Optional[Order]:
         """Get order by ID with items"""
         try:
-            conn = self._get_connection()
-            cursor = conn.cursor(dictionary=True)
-            
-            # Get order
-            order_query = "SELECT * FROM orders WHERE id = %s"
-            cursor.execute(order_query, (order_id,))
-            order_row = cursor.fetchone()
-            
-            if not order_row:
+            with self._get_connection() as conn:
+                cursor = conn.cursor(dictionary=True)
+
+                cursor.execute("SELECT * FROM orders WHERE id = %s", (order_id,))
+                order_row = cursor.fetchone()
+
+                if not order_row:
+                    cursor.close()
+                    return None
+
+                order = self._map_order(order_row)
+                self._attach_items(cursor, [order])
+
                 cursor.close()
-                conn.close()
-                return None
-            
-            # Get order items
-            items_query = "SELECT * FROM order_items WHERE order_id = %s"
-            cursor.execute(items_query, (order_id,))
-            items_rows = cursor.fetchall()
-            
-            cursor.close()
-            conn.close()
-            
-            # Create Order entity
-            order = Order(
-                id=order_row['id'],
-                user_id=order_row['user_id'],
-                customer_name=order_row.get('shipping_name', ''),
-                customer_phone=order_row.get('shipping_phone', ''),
-                customer_address=order_row.get('shipping_address', ''),
-                payment_method=order_row.get('payment_method', ''),
-                total_amount=float(order_row['total_amount']),
-                status=OrderStatus.from_string(order_row['status']),
-                created_at=order_row.get('order_date')
-            )
-            
-            # Add items
-            for item_row in items_rows:
-                item = OrderItem(**item_row)
-                order.items.append(item)
-            
+
             return order
         except Exception as e:
+            self.unit_of_work.rollback()
             print(f"Error getting order: {e}")
             return None
-    
-    def get_by_user(self, user_id: str) -> List[Order]:
-        """Get all orders by user"""
+
+    def get_by_user(self, user_id: str, include_items: bool = False) -> List[Order]:
+        """Get all orders by user; include_items loads every line with one extra query"""
         try:
-            conn = self._get_connection()
-            cursor = conn.cursor(dictionary=True)
-            query = "SELECT * FROM orders WHERE user_id = %s ORDER BY order_date DESC"
-            cursor.execute(query, (user_id,))
-            rows = cursor.fetchall()
-            cursor.close()
-            conn.close()
-            orders = []
-            for row in rows:
-                order = Order(
-                    id=row['id'],
-                    user_id=row['user_id'],
-                    customer_name=row.get('shipping_name', ''),
-                    customer_phone=row.get('shipping_phone', ''),
-                    customer_address=row.get('shipping_address', ''),
-                    payment_method=row.get('payment_method', ''),
-                    total_amount=float(row['total_amount']),
-                    status=OrderStatus.from_string(row['status']),
-                    created_at=row.get('order_date')
-                )
-                orders.append(order)
+            with self._get_connection() as conn:
+                cursor = conn.cursor(dictionary=True)
+                query = "SELECT * FROM orders WHERE user_id = %s ORDER BY order_date DESC"
+                cursor.execute(query, (user_id,))
+                orders = [self._map_order(row) for row in cursor.fetchall()]
+                if include_items:
+                    self._attach_items(cursor, orders)
+                cursor.close()
             return orders
         except Exception as e:
+            self.unit_of_work.rollback()
             print(f"Error getting user orders: {e}")
             return []
-    
-    def get_all(self) -> List[Order]:
-        """Get all orders"""
+
+    def get_all(self, include_items: bool = False) -> List[Order]:
+        """Get all orders; include_items loads every line with one extra query"""
         try:
-            conn = self._get_connection()
-            cursor = conn.cursor(dictionary=True)
-            
-            query = "SELECT * FROM orders ORDER BY order_date DESC"
-            cursor.execute(query)
-            rows = cursor.fetchall()
-            
-            cursor.close()
-            conn.close()
-            
-            orders = []
-            for row in rows:
-                order = Order(
-                    id=row['id'],
-                    user_id=row['user_id'],
-                    customer_name=row.get('shipping_name', ''),
-                    customer_phone=row.get('shipping_phone', ''),
-                    customer_address=row.get('shipping_address', ''),
-                    payment_method=row.get('payment_method', ''),
-                    total_amount=float(row['total_amount']),
-                    status=OrderStatus.from_string(row['status']),
-                    created_at=row.get('order_date')
-                )
-                orders.append(order)
-            
+            with self._get_connection() as conn:
+                cursor = conn.cursor(dictionary=True)
+
+                query = "SELECT * FROM orders ORDER BY order_date DESC"
+                cursor.execute(query)
+                orders = [self._map_order(row) for row in cursor.fetchall()]
+                if include_items:
+                    self._attach_items(cursor, orders)
+
+                cursor.close()
+
             return orders
         except Exception as e:
+            self.unit_of_work.rollback()
             print(f"Error getting all orders: {e}")
             return []
-    
+
     def update_status(self, order_id: str, status: str) -> bool:
         """Update order status"""
         try:
-            conn = self._get_connection()
-            cursor = conn.cursor()
-            
-            query = "UPDATE orders SET status = %s WHERE id = %s"
-            cursor.execute(query, (status, order_id))
-            
-            conn.commit()
-            success = cursor.rowcount > 0
-            
-            cursor.close()
-            conn.close()
-            
+            with self._get_connection() as conn:
+                try:
+                    cursor = conn.cursor()
+
+                    query = "UPDATE orders SET status = %s WHERE id = %s"
+                    cursor.execute(query, (status, order_id))
+                    success = cursor.rowcount > 0
+                    self._write_summary(
+                        cursor, "UPDATE order_summaries SET status = %s WHERE order_id = %s", (status, order_id)
+                    )
+
+                    conn.commit()
+
+                    cursor.close()
+                except Exception:
+                    conn.rollback()
+                    raise
+
             return success
         except Exception as e:
+            self.unit_of_work.rollback()
             print(f"Error updating order status: {e}")
             return False
+
+    def get_units_sold(self, since: datetime) -> Dict[str, int]:
+        """Units sold per product in non-cancelled orders placed since `since`"""
+        try:
+            with self._get_connection() as conn:
+                cursor = conn.cursor()
+
+                query = """
+                    SELECT oi.product_id, SUM(oi.quantity)
+                    FROM orders o
+                    JOIN order_items oi ON oi.order_id = o.id
+                    WHERE o.order_date >= %s AND o.status <> %s
+                    GROUP BY oi.product_id
+                """
+                cursor.execute(query, (since, OrderStatus.CANCELLED.value))
+                rows = cursor.fetchall()
+
+                cursor.close()
+
+            return {str(product_id): int(units or 0) for product_id, units in rows}
+        except Exception as e:
+            self.unit_of_work.rollback()
+            print(f"Error getting units sold: {e}")
+            return {}
+
+    def get_summaries_page(self, user_id: str, after: Optional[list],
+                           limit: int) -> List[OrderSummary]:
+        """Keyset page of a user's order history from the summary projection"""
+        conditions, params = ["user_id = %s"], [user_id]
+        if after and len(after) == 2 and after[0]:
+            conditions.append("(order_date < %s OR (order_date = %s AND order_id < %s))")
+            params.extend([after[0], after[0], after[1]])
+
+        try:
+            with self._get_connection() as conn:
+                cursor = conn.cursor(dictionary=True)
+
+                query = f"""
+                    SELECT order_id, user_id, order_date, status, total_amount,
+                           item_count, first_image, first_product_name
+                    FROM order_summaries
+                    WHERE {" AND ".join(conditions)}
+                    ORDER BY order_date DESC, order_id DESC
+                    LIMIT %s
+                """
+                cursor.execute(query, tuple(params + [limit]))
+                rows = cursor.fetchall()
+
+                cursor.close()
+
+            return [self._map_summary(row) for row in rows]
+        except Exception as e:
+            self.unit_of_work.rollback()
+            print(f"Error getting order summaries: {e}")
+            return []
+
+    def rebuild_summaries(self) -> int:
+        """Create the order summary projection if needed and (re)fill it from orders"""
+        try:
+            with self._get_connection() as conn:
+                cursor = conn.cursor()
+
+                cursor.execute(SUMMARY_SCHEMA)
+                cursor.execute(SUMMARY_BACKFILL)
+                # Drop rows of orders deleted directly in MySQL
+                cursor.execute("""
+                    DELETE s FROM order_summaries s
+                    LEFT JOIN orders o ON o.id = s.order_id
+                    WHERE o.id IS NULL
+                """)
+                cursor.execute("SELECT COUNT(*) FROM order_summaries")
+                count = cursor.fetchone()[0]
+
+                conn.commit()
+                cursor.close()
+
+            return int(count)
+        except Exception as e:
+            self.unit_of_work.rollback()
+            print(f"Error rebuilding order summaries: {e}")
+            return 0
+
+    def _filter_conditions(self, filters: OrderFilter, include_status: bool = True) -> tuple[list, list]:
+        """WHERE conditions and params for an order filter"""
+        conditions, params = [], []
+        if include_status and filters.status:
+            conditions.append("o.status = %s")
+            params.append(filters.status)
+        if filters.date_from:
+            conditions.append("o.order_date >= %s")
+            params.append(filters.date_from)
+        if filters.date_to:
+            conditions.append("o.order_date < %s")
+            params.append(filters.date_to + timedelta(days=1))
+        keyword = (filters.keyword or '').strip()
+        if keyword:
+            # One predicate per keyword shape, so the id and phone lookups use their index
+            # instead of an OR that forces a scan
+            if ORDER_ID_PATTERN.fullmatch(keyword):
+                conditions.append("o.id = %s")
+                params.append(keyword.upper())
+            elif PHONE_PATTERN.fullmatch(keyword):
+                conditions.append("o.shipping_phone LIKE %s")
+                params.append(f"{keyword}%")
+            else:
+                # Part of the customer name: no index can serve '%...%', the date order bounds the scan
+                conditions.append("o.shipping_name LIKE %s")
+                params.append(f"%{keyword}%")
+        return conditions, params
+
+    def get_page(self, filters: OrderFilter, sort: OrderSort, after: Optional[list], limit: int,
+                 include_items: bool = False) -> List[Order]:
+        """Keyset page of filtered orders ordered by `sort`, starting after sort key `after`"""
+        sort_column, direction = self._SORT_COLUMNS.get(sort, self._SORT_COLUMNS[OrderSort.NEWEST])
+        columns = [sort_column, 'o.id']
+
+        conditions, params = self._filter_conditions(filters)
+        if after and len(after) == len(columns) and after[0] is not None:
+            clause, clause_params = keyset_clause(columns, direction, list(after))
+            conditions.append(clause)
+            params.extend(clause_params)
+
+        where_sql = ("WHERE " + " AND ".join(conditions)) if conditions else ""
+        order_sql = ", ".join(f"{column} {direction}" for column in columns)
+
+        try:
+            with self._get_connection() as conn:
+                cursor = conn.cursor(dictionary=True)
+
+                query = f"""
+                    SELECT o.* FROM orders o
+                    {where_sql}
+                    ORDER BY {order_sql}
+                    LIMIT %s
+                """
+                cursor.execute(query, tuple(params + [limit]))
+                orders = [self._map_order(row) for row in cursor.fetchall()]
+                if include_items:
+                    self._attach_items(cursor, orders)
+
+                cursor.close()
+
+            return orders
+        except Exception as e:
+            self.unit_of_work.rollback()
+            print(f"Error getting order page: {e}")
+            return []
+
+    def count_by_status(self, filters: OrderFilter) -> Dict[str, int]:
+        """Order count per status for every filter except the status one (one aggregate query)"""
+        conditions, params = self._filter_conditions(filters, include_status=False)
+        where_sql = ("WHERE " + " AND ".join(conditions)) if conditions else ""
+        try:
+            with self._get_connection() as conn:
+                cursor = conn.cursor()
+
+                cursor.execute(
+                    f"SELECT o.status, COUNT(*) FROM orders o {where_sql} GROUP BY o.status",
+                    tuple(params)
+                )
+                rows = cursor.fetchall()
+
+                cursor.close()
+
+            return {str(status): int(count) for status, count in rows}
+        except Exception as e:
+            self.unit_of_work.rollback()
+            print(f"Error counting orders: {e}")
+            return {}
@@ -1,21 +1,39 @@
 """MySQL Product Repository Implementation"""
-import mysql.connector
-from typing import List, Optional
-from ...domain.entities import Product
+from typing import Dict, List, Optional
+from ...domain.entities import Product, ProductSummary, ProductSort
 from ...domain.repositories import IProductRepository
+from .unit_of_work import RequestUnitOfWork
+from .bulk_writer import bulk_update_case, execute_in_chunks
+from .keyset import keyset_clause
 
 
 class MySQLProductRepository(IProductRepository):
     """MySQL implementation of Product repository"""
-    
-    def __init__(self, db_config: dict):
-        self.db_config = db_config
+
+    # Keyset ordering per sort option: (column, direction). Ties are broken by
+    # p.sort_id, the numeric value of the varchar id (schema migration 002),
+    # then p.id itself for the rare non-numeric ids
+    _SORT_COLUMNS = {
+        ProductSort.NEWEST: ([], 'DESC'),
+        ProductSort.PRICE_ASC: (['p.gia'], 'ASC'),
+        ProductSort.PRICE_DESC: (['p.gia'], 'DESC'),
+        ProductSort.BESTSELLER: (['p.bestSeller'], 'DESC')
+    }
+
+    # Lean listing projection: no mota/thongso text columns
+    _LISTING_COLUMNS = (
+        "p.id, p.tenSP, p.gia, p.categoryID, p.image, p.stock_quantity, "
+        "p.bestSeller, p.namSX, c.tenDM as category_name"
+    )
+
+    def __init__(self, unit_of_work: RequestUnitOfWork):
+        self.unit_of_work = unit_of_work
         self.last_error = ""
-    
+
     def _get_connection(self):
-        """Create database connection"""
-        return mysql.connector.connect(**self.db_config)
-    
+        """Get the request-scoped database connection"""
+        return self.unit_of_work.get_connection()
+
     def _map_db_to_entity(self, row: dict) -> dict:
         """Map database column names to entity attributes"""
         return {
@@ -30,10 +48,24 @@ class MySQLProductRepository(IProductRepository):
             'bestSeller': row.get('bestSeller', 0),
             'created_at': row.get('created_at')
         }
-    
+
+    def _map_db_to_summary(self, row: dict) -> dict:
+        """Map listing projection columns to ProductSummary attributes"""
+        return {
+            'id': row.get('id'),
+            'name': row.get('tenSP'),
+            'price': float(row.get('gia', 0)),
+            'category_id': row.get('categoryID'),
+            'category_name': row.get('category_name'),
+            'image_url': row.get('image', ''),
+            'stock_quantity': row.get('stock_quantity', 100),
+            'bestSeller': row.get('bestSeller', 0),
+            'release_year': row.get('namSX')
+        }
+
     def _generate_product_id(self, cursor) -> str:
         """Generate next product ID based on max existing numeric ID"""
-        cursor.execute("SELECT MAX(CAST(id AS UNSIGNED)) FROM products")
+        cursor.execute("SELECT MAX(sort_id) FROM products")
         result = cursor.fetchone()
         max_id = result[0] if result[0] else 0
         return str(max_id + 1)
@@ -42,30 +74,30 @@ class MySQLProductRepository(IProductRepository):
         """Create new product"""
         try:
             self.last_error = ""
-            conn = self._get_connection()
-            cursor = conn.cursor()
-            
-            # Generate product ID (DB id is varchar, not auto_increment)
-            product_id = self._generate_product_id(cursor)
-            
-            query = """
-                INSERT INTO products (id, tenSP, mota, gia, categoryID, image, namSX, thongso, bestSeller, stock_quantity)
-                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-            """
-            cursor.execute(query, (
-                product_id, product.name, product.description, product.price,
-                product.category_id, product.image_url,
-                getattr(product, 'namSX', None), getattr(product, 'thongso', None),
-                getattr(product, 'bestSeller', 0), product.stock_quantity
-            ))
-            
-            conn.commit()
-            
-            cursor.close()
-            conn.close()
-            
+            with self._get_connection() as conn:
+                cursor = conn.cursor()
+
+                # Generate product ID (DB id is varchar, not auto_increment)
+                product_id = self._generate_product_id(cursor)
+
+                query = """
+                    INSERT INTO products (id, tenSP, mota, gia, categoryID, image, namSX, thongso, bestSeller, stock_quantity)
+                    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+                """
+                cursor.execute(query, (
+                    product_id, product.name, product.description, product.price,
+                    product.category_id, product.image_url,
+                    getattr(product, 'namSX', None), getattr(product, 'thongso', None),
+                    getattr(product, 'bestSeller', 0), product.stock_quantity
+                ))
+
+                conn.commit()
+
+                cursor.close()
+
             return product_id
         except Exception as e:
+            self.unit_of_work.rollback()
             self.last_error = str(e)
             print(f"Error creating product: {e}")
             return None
@@ -73,172 +105,368 @@ class MySQLProductRepository(IProductRepository):
     def get_last_error(self) -> str:
         """Get last database error message for debugging/admin feedback"""
         return self.last_error
-    
+
     def get_by_id(self, product_id: int) -> Optional[Product]:
         """Get product by ID"""
         try:
-            conn = self._get_connection()
-            cursor = conn.cursor(dictionary=True)
-            
-            query = """
-                SELECT p.*, c.tenDM as category_name
-                FROM products p
-                LEFT JOIN categories c ON p.categoryID = c.id
-                WHERE p.id = %s
-            """
-            cursor.execute(query, (product_id,))
-            row = cursor.fetchone()
-            
-            cursor.close()
-            conn.close()
-            
+            with self._get_connection() as conn:
+                cursor = conn.cursor(dictionary=True)
+
+                query = """
+                    SELECT p.*, c.tenDM as category_name
+                    FROM products p
+                    LEFT JOIN categories c ON p.categoryID = c.id
+                    WHERE p.id = %s
+                """
+                cursor.execute(query, (product_id,))
+                row = cursor.fetchone()
+
+                cursor.close()
+
             if row:
                 return Product(**self._map_db_to_entity(row))
             return None
         except Exception as e:
+            self.unit_of_work.rollback()
             print(f"Error getting product: {e}")
             return None
-    
-    def get_all(self) -> List[Product]:
+
+    def get_by_ids(self, product_ids: List[str]) -> List[ProductSummary]:
+        """Get several products by ID in one query"""
+        unique_ids = list(dict.fromkeys(str(pid) for pid in product_ids))
+        if not unique_ids:
+            return []
+
+        try:
+            with self._get_connection() as conn:
+                cursor = conn.cursor(dictionary=True)
+
+                placeholders = ", ".join(["%s"] * len(unique_ids))
+                query = f"""
+                    SELECT {self._LISTING_COLUMNS}
+                    FROM products p
+                    LEFT JOIN categories c ON p.categoryID = c.id
+                    WHERE p.id IN ({placeholders})
+                """
+                cursor.execute(query, tuple(unique_ids))
+                rows = cursor.fetchall()
+
+                cursor.close()
+
+            return [ProductSummary(**self._map_db_to_summary(row)) for row in rows]
+        except Exception as e:
+            self.unit_of_work.rollback()
+            print(f"Error getting products by ids: {e}")
+            return []
+
+    def get_all(self) -> List[ProductSummary]:
         """Get all products"""
         try:
-            conn = self._get_connection()
-            cursor = conn.cursor(dictionary=True)
-            
-            query = """
-                SELECT p.*, c.tenDM as category_name
-                FROM products p
-                LEFT JOIN categories c ON p.categoryID = c.id
-                ORDER BY p.id DESC
-            """
-            cursor.execute(query)
-            rows = cursor.fetchall()
-            
-            cursor.close()
-            conn.close()
-            
-            return [Product(**self._map_db_to_entity(row)) for row in rows]
+            with self._get_connection() as conn:
+                cursor = conn.cursor(dictionary=True)
+
+                query = f"""
+                    SELECT {self._LISTING_COLUMNS}
+                    FROM products p
+                    LEFT JOIN categories c ON p.categoryID = c.id
+                    ORDER BY p.sort_id DESC, p.id DESC
+                """
+                cursor.execute(query)
+                rows = cursor.fetchall()
+
+                cursor.close()
+
+            return [ProductSummary(**self._map_db_to_summary(row)) for row in rows]
         except Exception as e:
+            self.unit_of_work.rollback()
             print(f"Error getting products: {e}")
             return []
-    
-    def get_by_category(self, category_id: int) -> List[Product]:
+
+    def get_by_category(self, category_id: int) -> List[ProductSummary]:
         """Get products by category"""
         try:
-            conn = self._get_connection()
-            cursor = conn.cursor(dictionary=True)
-            
-            query = """
-                SELECT p.*, c.tenDM as category_name
-                FROM products p
-                LEFT JOIN categories c ON p.categoryID = c.id
-                WHERE p.categoryID = %s
-                ORDER BY p.id DESC
-            """
-            cursor.execute(query, (category_id,))
-            rows = cursor.fetchall()
-            
-            cursor.close()
-            conn.close()
-            
-            return [Product(**self._map_db_to_entity(row)) for row in rows]
+            with self._get_connection() as conn:
+                cursor = conn.cursor(dictionary=True)
+
+                query = f"""
+                    SELECT {self._LISTING_COLUMNS}
+                    FROM products p
+                    LEFT JOIN categories c ON p.categoryID = c.id
+                    WHERE p.categoryID = %s
+                    ORDER BY p.sort_id DESC, p.id DESC
+                """
+                cursor.execute(query, (category_id,))
+                rows = cursor.fetchall()
+
+                cursor.close()
+
+            return [ProductSummary(**self._map_db_to_summary(row)) for row in rows]
         except Exception as e:
+            self.unit_of_work.rollback()
             print(f"Error getting products by category: {e}")
             return []
-    
-    def search(self, keyword: str) -> List[Product]:
+
+    def get_page(self, sort: ProductSort, after: Optional[list], page_size: int,
+                 category_id: Optional[int] = None, name_query: Optional[str] = None) -> List[ProductSummary]:
+        """Keyset page of products ordered by `sort`, starting after sort key `after`"""
+        sort_columns, direction = self._SORT_COLUMNS.get(sort, self._SORT_COLUMNS[ProductSort.NEWEST])
+        columns = sort_columns + ['p.sort_id', 'p.id']
+        if sort == ProductSort.BESTSELLER and after:
+            # Bestseller keys start with units sold (ProductSort.key_of); SQL ranks every
+            # product as 0 sold, so a key with sales lies before the first row
+            units_sold, after = after[0], after[1:]
+            if units_sold:
+                after = None
+
+        conditions, params = [], []
+        if category_id is not None:
+            conditions.append("p.categoryID = %s")
+            params.append(category_id)
+        if name_query:
+            conditions.append("p.tenSP LIKE %s")
+            params.append(f"%{name_query}%")
+        if after and len(after) == len(columns) - 1:
+            # The cursor ends with the product id, compared as both sort_id and id
+            clause, clause_params = keyset_clause(columns, direction, list(after) + [after[-1]])
+            conditions.append(clause)
+            params.extend(clause_params)
+
+        where_sql = ("WHERE " + " AND ".join(conditions)) if conditions else ""
+        order_sql = ", ".join(f"{column} {direction}" for column in columns)
+
+        try:
+            with self._get_connection() as conn:
+                cursor = conn.cursor(dictionary=True)
+
+                query = f"""
+                    SELECT {self._LISTING_COLUMNS}
+                    FROM products p
+                    LEFT JOIN categories c ON p.categoryID = c.id
+                    {where_sql}
+                    ORDER BY {order_sql}
+                    LIMIT %s
+                """
+                cursor.execute(query, tuple(params + [page_size]))
+                rows = cursor.fetchall()
+
+                cursor.close()
+
+            return [ProductSummary(**self._map_db_to_summary(row)) for row in rows]
+        except Exception as e:
+            self.unit_of_work.rollback()
+            print(f"Error getting product page: {e}")
+            return []
+
+    def search(self, keyword: str) -> List[ProductSummary]:
         """Search products by keyword"""
         try:
-            conn = self._get_connection()
-            cursor = conn.cursor(dictionary=True)
-            
-            query = """
-                SELECT p.*, c.tenDM as category_name
-                FROM products p
-                LEFT JOIN categories c ON p.categoryID = c.id
-                WHERE p.tenSP LIKE %s OR p.mota LIKE %s
-                ORDER BY p.id DESC
-            """
-            search_term = f"%{keyword}%"
-            cursor.execute(query, (search_term, search_term))
-            rows = cursor.fetchall()
-            
-            cursor.close()
-            conn.close()
-            
-            return [Product(**self._map_db_to_entity(row)) for row in rows]
+            with self._get_connection() as conn:
+                cursor = conn.cursor(dictionary=True)
+
+                query = f"""
+                    SELECT {self._LISTING_COLUMNS}
+                    FROM products p
+                    LEFT JOIN categories c ON p.categoryID = c.id
+                    WHERE p.tenSP LIKE %s OR p.mota LIKE %s
+                    ORDER BY p.sort_id DESC, p.id DESC
+                """
+                search_term = f"%{keyword}%"
+                cursor.execute(query, (search_term, search_term))
+                rows = cursor.fetchall()
+
+                cursor.close()
+
+            return [ProductSummary(**self._map_db_to_summary(row)) for row in rows]
         except Exception as e:
+            self.unit_of_work.rollback()
             print(f"Error searching products: {e}")
             return []
-    
+
+    def get_search_documents(self, product_ids: Optional[List[str]] = None) -> List[Product]:
+        """All products (or only product_ids) with the columns needed to build the in-memory catalog indexes"""
+        where_sql, params = "", ()
+        if product_ids is not None:
+            params = tuple(dict.fromkeys(str(pid) for pid in product_ids))
+            if not params:
+                return []
+            where_sql = f"WHERE p.id IN ({', '.join(['%s'] * len(params))})"
+        try:
+            with self._get_connection() as conn:
+                cursor = conn.cursor(dictionary=True)
+
+                query = f"""
+                    SELECT p.id, p.tenSP, p.mota, p.gia, p.categoryID, p.bestSeller,
+                           p.stock_quantity, c.tenDM as category_name
+                    FROM products p
+                    LEFT JOIN categories c ON p.categoryID = c.id
+                    {where_sql}
+                """
+                cursor.execute(query, params)
+                rows = cursor.fetchall()
+
+                cursor.close()
+
+            return [Product(**self._map_db_to_entity(row)) for row in rows]
+        except Exception as e:
+            self.unit_of_work.rollback()
+            print(f"Error getting search documents: {e}")
+            return []
+
     def update(self, product: Product) -> bool:
         """Update product"""
         try:
-            conn = self._get_connection()
-            cursor = conn.cursor()
-            
-            query = """
-                UPDATE products
-                SET tenSP = %s, mota = %s, gia = %s, categoryID = %s, image = %s,
-                    namSX = %s, thongso = %s, bestSeller = %s
-                WHERE id = %s
-            """
-            cursor.execute(query, (
-                product.name, product.description, product.price, product.category_id,
-                product.image_url, getattr(product, 'namSX', None),
-                getattr(product, 'thongso', None), getattr(product, 'bestSeller', 0),
-                product.id
-            ))
-            
-            conn.commit()
-            success = cursor.rowcount > 0
-            
-            cursor.close()
-            conn.close()
-            
+            with self._get_connection() as conn:
+                cursor = conn.cursor()
+
+                query = """
+                    UPDATE products
+                    SET tenSP = %s, mota = %s, gia = %s, categoryID = %s, image = %s,
+                        namSX = %s, thongso = %s, bestSeller = %s
+                    WHERE id = %s
+                """
+                cursor.execute(query, (
+                    product.name, product.description, product.price, product.category_id,
+                    product.image_url, getattr(product, 'namSX', None),
+                    getattr(product, 'thongso', None), getattr(product, 'bestSeller', 0),
+                    product.id
+                ))
+
+                conn.commit()
+                success = cursor.rowcount > 0
+
+                cursor.close()
+
             return success
         except Exception as e:
+            self.unit_of_work.rollback()
             print(f"Error updating product: {e}")
             return False
-    
+
     def delete(self, product_id: int) -> bool:
         """Delete product"""
         try:
             self.last_error = ""
-            conn = self._get_connection()
-            cursor = conn.cursor()
-            
-            query = "DELETE FROM products WHERE id = %s"
-            cursor.execute(query, (product_id,))
-            
-            conn.commit()
-            success = cursor.rowcount > 0
-            
-            cursor.close()
-            conn.close()
-            
+            with self._get_connection() as conn:
+                cursor = conn.cursor()
+
+                query = "DELETE FROM products WHERE id = %s"
+                cursor.execute(query, (product_id,))
+
+                conn.commit()
+                success = cursor.rowcount > 0
+
+                cursor.close()
+
             return success
         except Exception as e:
+            self.unit_of_work.rollback()
             self.last_error = str(e)
             print(f"Error deleting product: {e}")
             return False
-    
+
     def update_stock(self, product_id: int, quantity: int) -> bool:
         """Update product stock quantity"""
         try:
-            conn = self._get_connection()
-            cursor = conn.cursor()
-            
-            query = "UPDATE products SET stock_quantity = %s WHERE id = %s"
-            cursor.execute(query, (quantity, product_id))
-            
-            conn.commit()
-            success = cursor.rowcount > 0
-            
-            cursor.close()
-            conn.close()
-            
+            with self._get_connection() as conn:
+                cursor = conn.cursor()
+
+                query = "UPDATE products SET stock_quantity = %s WHERE id = %s"
+                cursor.execute(query, (quantity, product_id))
+
+                conn.commit()
+                success = cursor.rowcount > 0
+
+                cursor.close()
+
             return success
         except Exception as e:
+            self.unit_of_work.rollback()
             print(f"Error updating stock: {e}")
             return False
+
+    def adjust_stock(self, deltas: Dict[str, int]) -> bool:
+        """Add a signed delta to the stock of several products in one statement"""
+        try:
+            with self._get_connection() as conn:
+                cursor = conn.cursor()
+
+                bulk_update_case(
+                    cursor, 'products', 'id', 'stock_quantity',
+                    {str(pid): delta for pid, delta in deltas.items()}, relative=True
+                )
+
+                conn.commit()
+                cursor.close()
+
+            return True
+        except Exception as e:
+            self.unit_of_work.rollback()
+            print(f"Error adjusting stock: {e}")
+            return False
+
+    def delete_many(self, product_ids: List[str]) -> List[str]:
+        """Delete several products in one statement, skipping those referenced by orders"""
+        keys = list(dict.fromkeys(str(pid) for pid in product_ids))
+        if not keys:
+            return []
+        try:
+            self.last_error = ""
+            with self._get_connection() as conn:
+                cursor = conn.cursor()
+
+                # Ordered products stay (order_items keeps its FK); one DELETE for the rest
+                execute_in_chunks(
+                    cursor,
+                    "DELETE FROM products WHERE id IN ({in_clause}) AND NOT EXISTS "
+                    "(SELECT 1 FROM order_items oi WHERE oi.product_id = products.id)",
+                    keys
+                )
+                placeholders = ", ".join(["%s"] * len(keys))
+                cursor.execute(f"SELECT id FROM products WHERE id IN ({placeholders})", tuple(keys))
+                remaining = {str(row[0]) for row in cursor.fetchall()}
+
+                conn.commit()
+                cursor.close()
+
+            return [pid for pid in keys if pid not in remaining]
+        except Exception as e:
+            self.unit_of_work.rollback()
+            self.last_error = str(e)
+            print(f"Error deleting products: {e}")
+            return []
+
+    def set_stock_many(self, product_ids: List[str], quantity: int) -> Optional[int]:
+        """Set the same stock quantity on several products in one statement"""
+        return self._set_column_many(product_ids, 'stock_quantity', int(quantity))
+
+    def set_bestseller_many(self, product_ids: List[str], best_seller: bool) -> Optional[int]:
+        """Set or clear the bestseller flag on several products in one statement"""
+        return self._set_column_many(product_ids, 'bestSeller', 1 if best_seller else 0)
+
+    def _set_column_many(self, product_ids: List[str], column: str, value) -> Optional[int]:
+        """
+        UPDATE products SET column = value WHERE id IN (...)
+        Returns: rows changed (0 when every row already had the value), None on error (see get_last_error)
+        """
+        keys = list(dict.fromkeys(str(pid) for pid in product_ids))
+        if not keys:
+            return 0
+        try:
+            self.last_error = ""
+            with self._get_connection() as conn:
+                cursor = conn.cursor()
+
+                updated = execute_in_chunks(
+                    cursor, f"UPDATE products SET {column} = %s WHERE id IN ({{in_clause}})",
+                    keys, (value,)
+                )
+
+                conn.commit()
+                cursor.close()
+
+            return updated
+        except Exception as e:
+            self.unit_of_work.rollback()
+            self.last_error = str(e)
+            print(f"Error updating products: {e}")
+            return None
@@ -0,0 +1,473 @@
+"""Query Plan Checker - EXPLAIN every repository statement and flag full scans"""
+import inspect
+import random
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from itertools import islice
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from ...domain.entities import (
+    User, Product, Category, Order, OrderItem, OrderStatus, OrderFilter, ProductSort, OrderSort
+)
+from .unit_of_work import RequestUnitOfWork, UnitOfWorkConnection
+from .bulk_writer import bulk_insert
+from .mysql_user_repository import MySQLUserRepository
+from .mysql_product_repository import MySQLProductRepository
+from .mysql_category_repository import MySQLCategoryRepository
+from .mysql_order_repository import MySQLOrderRepository, SUMMARY_BACKFILL
+from .mysql_association_repository import MySQLAssociationRepository
+
+REPOSITORIES = {
+    'user': MySQLUserRepository,
+    'product': MySQLProductRepository,
+    'category': MySQLCategoryRepository,
+    'order': MySQLOrderRepository,
+    'association': MySQLAssociationRepository,
+}
+
+# Public repository methods that are not checked, with the reason
+EXCLUDED_METHODS = {
+    ('product', 'get_last_error'): 'no SQL',
+    ('order', 'rebuild_summaries'): 'maintenance: DDL and a full backfill by design',
+    ('association', 'ensure_schema'): 'maintenance: DDL',
+    ('association', 'reset'): 'maintenance: deletes every row by design',
+}
+
+
+@dataclass(frozen=True)
+class PlanCase:
+    """
+    One repository call to trace. `scans` names the tables (as EXPLAIN shows
+    them, i.e. the query alias) that the call reads in full on purpose.
+    """
+    repository: str
+    method: str
+    call: Callable[[Dict[str, Any], Dict[str, Any]], Any]
+    variant: str = ''
+    scans: Tuple[str, ...] = ()
+
+    @property
+    def label(self) -> str:
+        """repository.method[variant]"""
+        return f"{self.repository}.{self.method}" + (f"[{self.variant}]" if self.variant else '')
+
+
+def _order(samples: dict, order_id: str) -> Order:
+    """Two-line order on sample products"""
+    order = Order(id=order_id, user_id=samples['user_id'], customer_name='Plan Check',
+                  customer_phone='0900000000', customer_address='-', total_amount=2.0)
+    for product_id in samples['product_ids'][:2]:
+        order.add_item(OrderItem(product_id=product_id, product_name='-', product_price=1.0,
+                                 quantity=1, subtotal=1.0))
+    return order
+
+
+# A few rows of lookup data: reading them in full is never a regression
+LOOKUP_TABLES = ('categories', 'c')
+
+_LIST = ('p',)   # whole-catalog reads
+
+CASES = (
+    # Users
+    PlanCase('user', 'create', lambda r, s: r['user'].create(
+        User(username='plan_check', email='plan_check@example.com', password='-'))),
+    PlanCase('user', 'get_by_id', lambda r, s: r['user'].get_by_id(s['user_id'])),
+    PlanCase('user', 'get_by_username', lambda r, s: r['user'].get_by_username(s['user_id'])),
+    PlanCase('user', 'get_by_email', lambda r, s: r['user'].get_by_email(s['email'])),
+    PlanCase('user', 'update', lambda r, s: r['user'].update(
+        User(id='plan_check', email='plan_check@example.com', password='-'))),
+    PlanCase('user', 'delete', lambda r, s: r['user'].delete('plan_check')),
+    # Categories (a handful of rows, listed in full)
+    PlanCase('category', 'create', lambda r, s: r['category'].create(Category(name='Plan check'))),
+    PlanCase('category', 'get_by_id', lambda r, s: r['category'].get_by_id(s['category_id'])),
+    PlanCase('category', 'get_all', lambda r, s: r['category'].get_all()),
+    PlanCase('category', 'update', lambda r, s: r['category'].update(Category(id=0, name='-'))),
+    PlanCase('category', 'delete', lambda r, s: r['category'].delete(0)),
+    # Products
+    PlanCase('product', 'create', lambda r, s: r['product'].create(
+        Product(name='Plan check', price=1.0, category_id=s['category_id']))),
+    PlanCase('product', 'get_by_id', lambda r, s: r['product'].get_by_id(s['product_id'])),
+    PlanCase('product', 'get_by_ids', lambda r, s: r['product'].get_by_ids(s['product_ids'])),
+    PlanCase('product', 'get_all', lambda r, s: r['product'].get_all(), scans=_LIST),
+    PlanCase('product', 'get_by_category', lambda r, s: r['product'].get_by_category(s['category_id'])),
+    *[
+        PlanCase('product', 'get_page', lambda r, s, sort=sort: r['product'].get_page(sort, None, 25),
+              variant=sort.value)
+        for sort in ProductSort
+    ],
+    *[
+        PlanCase('product', 'get_page', lambda r, s, sort=sort: r['product'].get_page(
+            sort, sort.key_of(r['product'].get_page(sort, None, 25)[-1]), 25), variant=f"{sort.value}, after")
+        for sort in ProductSort
+    ],
+    PlanCase('product', 'get_page', lambda r, s: r['product'].get_page(
+        ProductSort.PRICE_ASC, None, 25, s['category_id']), variant='category'),
+    PlanCase('product', 'get_page', lambda r, s: r['product'].get_page(
+        ProductSort.NEWEST, None, 25, None, 'a'), variant='name search'),
+    PlanCase('product', 'search', lambda r, s: r['product'].search('galaxy'), scans=_LIST),
+    PlanCase('product', 'get_search_documents', lambda r, s: r['product'].get_search_documents(), scans=_LIST),
+    PlanCase('product', 'get_search_documents',
+             lambda r, s: r['product'].get_search_documents(s['product_ids']), variant='by ids'),
+    PlanCase('product', 'update', lambda r, s: r['product'].update(
+        Product(id='0', name='-', price=1.0, category_id=s['category_id']))),
+    PlanCase('product', 'delete', lambda r, s: r['product'].delete('0')),
+    PlanCase('product', 'update_stock', lambda r, s: r['product'].update_stock(s['product_id'], 10)),
+    PlanCase('product', 'adjust_stock', lambda r, s: r['product'].adjust_stock({s['product_id']: 0})),
+    PlanCase('product', 'delete_many', lambda r, s: r['product'].delete_many(['0'])),
+    PlanCase('product', 'set_stock_many', lambda r, s: r['product'].set_stock_many(s['product_ids'], 10)),
+    PlanCase('product', 'set_bestseller_many', lambda r, s: r['product'].set_bestseller_many(s['product_ids'], False)),
+    # Orders
+    PlanCase('order', 'create', lambda r, s: r['order'].create(_order(s, 'PLANCHECK1'))),
+    PlanCase('order', 'place_order', lambda r, s: r['order'].place_order(_order(s, 'PLANCHECK2'))),
+    PlanCase('order', 'get_by_id', lambda r, s: r['order'].get_by_id(s['order_id'])),
+    PlanCase('order', 'get_by_user', lambda r, s: r['order'].get_by_user(s['user_id'], include_items=True)),
+    PlanCase('order', 'get_all', lambda r, s: r['order'].get_all(), scans=('orders',)),
+    PlanCase('order', 'update_status', lambda r, s: r['order'].update_status(s['order_id'], s['status'])),
+    PlanCase('order', 'get_units_sold', lambda r, s: r['order'].get_units_sold(datetime.now() - timedelta(days=30))),
+    PlanCase('order', 'get_summaries_page', lambda r, s: r['order'].get_summaries_page(s['user_id'], None, 20)),
+    PlanCase('order', 'get_summaries_page', lambda r, s: r['order'].get_summaries_page(
+        s['user_id'], [s['order_date'], s['order_id']], 20), variant='after'),
+    *[
+        PlanCase('order', 'get_page', lambda r, s, sort=sort: r['order'].get_page(
+            OrderFilter(), sort, None, 25, include_items=True), variant=sort.value)
+        for sort in OrderSort
+    ],
+    PlanCase('order', 'get_page', lambda r, s: r['order'].get_page(
+        OrderFilter(status=s['status']), OrderSort.NEWEST, [s['order_date'], s['order_id']], 25),
+        variant='status, after'),
+    PlanCase('order', 'get_page', lambda r, s: r['order'].get_page(
+        OrderFilter(keyword=s['order_id']), OrderSort.NEWEST, None, 25), variant='keyword order id'),
+    PlanCase('order', 'get_page', lambda r, s: r['order'].get_page(
+        OrderFilter(keyword='0900'), OrderSort.NEWEST, None, 25), variant='keyword phone'),
+    # '%name%' cannot use an index; the (order_date, id) index bounds the scan to one page
+    PlanCase('order', 'get_page', lambda r, s: r['order'].get_page(
+        OrderFilter(keyword='Plan'), OrderSort.NEWEST, None, 25), variant='keyword name', scans=('o',)),
+    # Counting every order per status reads the whole (status, date) index
+    PlanCase('order', 'count_by_status', lambda r, s: r['order'].count_by_status(OrderFilter()), scans=('o',)),
+    PlanCase('order', 'count_by_status', lambda r, s: r['order'].count_by_status(
+        OrderFilter(date_from=(datetime.now() - timedelta(days=7)).date())), variant='date range'),
+    # Co-purchase
+    PlanCase('association', 'get_related', lambda r, s: r['association'].get_related(s['product_id'])),
+    PlanCase('association', 'get_related_many', lambda r, s: r['association'].get_related_many(s['product_ids'])),
+    PlanCase('association', 'stream_baskets', lambda r, s: list(islice(r['association'].stream_baskets(None, 100), 1))),
+    PlanCase('association', 'apply_batch', lambda r, s: r['association'].apply_batch(
+        {(s['product_ids'][0], s['product_ids'][1]): 1}, (s['order_date'], s['order_id']))),
+    PlanCase('association', 'get_pair_counts', lambda r, s: r['association'].get_pair_counts(s['product_ids'])),
+    PlanCase('association', 'get_support', lambda r, s: r['association'].get_support(s['product_ids'])),
+    PlanCase('association', 'save_associations', lambda r, s: r['association'].save_associations(
+        {s['product_id']: s['product_ids'][1:]})),
+    PlanCase('association', 'get_watermark', lambda r, s: r['association'].get_watermark()),
+)
+
+
+@dataclass
+class PlanRow:
+    """One row of EXPLAIN output"""
+    table: Optional[str]
+    access: Optional[str]
+    key: Optional[str]
+    rows: Optional[int]
+    extra: str
+
+
+@dataclass
+class StatementPlan:
+    """A traced statement, its plan and whatever is wrong with it"""
+    case: str
+    sql: str
+    rows: List[PlanRow] = field(default_factory=list)
+    allowed_scans: List[str] = field(default_factory=list)
+    problems: List[str] = field(default_factory=list)
+
+
+@dataclass
+class QueryPlanReport:
+    """Outcome of a checker run"""
+    statements: List[StatementPlan] = field(default_factory=list)
+    unchecked: List[str] = field(default_factory=list)   # repository methods with no case
+    errors: List[str] = field(default_factory=list)      # cases that raised
+
+    @property
+    def failures(self) -> List[StatementPlan]:
+        """Statements whose plan regressed"""
+        return [statement for statement in self.statements if statement.problems]
+
+    @property
+    def ok(self) -> bool:
+        """True when every statement is indexed (or an allowed scan) and every method is covered"""
+        return not self.failures and not self.unchecked and not self.errors
+
+
+def _explainable(sql: str) -> bool:
+    """Statements that read rows: SELECT/UPDATE/DELETE and INSERT ... SELECT"""
+    upper = f" {sql.upper()} "
+    verb = upper.split(None, 1)[0]
+    if 'INFORMATION_SCHEMA' in upper:
+        return False
+    if verb == 'SELECT':
+        return ' FROM ' in upper
+    if verb == 'INSERT':
+        return ' SELECT ' in upper
+    return verb in ('UPDATE', 'DELETE')
+
+
+class _ExplainingCursor:
+    """Cursor proxy that runs EXPLAIN on each statement before executing it"""
+
+    def __init__(self, cursor, checker: 'QueryPlanChecker', raw_connection):
+        self._cursor = cursor
+        self._checker = checker
+        self._raw = raw_connection
+
+    def execute(self, query, params=()):
+        sql = ' '.join(str(query).split())
+        if _explainable(sql):
+            self._checker._explain(self._raw, sql, params)
+        return self._cursor.execute(query, params)
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+
+class _ExplainingConnection(UnitOfWorkConnection):
+    """
+    One connection and transaction for the whole run: commits are deferred
+    like in a request and the checker rolls everything back at the end.
+    """
+
+    def __init__(self, pooled_connection, checker: 'QueryPlanChecker'):
+        super().__init__(pooled_connection)
+        self._checker = checker
+
+    def cursor(self, **kwargs):
+        # Buffered, so the EXPLAIN never meets an unread result set
+        kwargs['buffered'] = True
+        return _ExplainingCursor(self._pooled.cursor(**kwargs), self._checker, self.raw)
+
+
+class _PlanSession:
+    """Stands in for the unit of work: every repository gets the explaining connection"""
+
+    def __init__(self, connection: _ExplainingConnection):
+        self.connection = connection
+
+    def get_connection(self):
+        return self.connection
+
+    def commit(self) -> None:
+        """Nothing is committed: the whole run is rolled back"""
+        pass
+
+    def rollback(self) -> None:
+        """A failed statement is reported by its case; the run is rolled back at the end anyway"""
+        pass
+
+
+class QueryPlanChecker:
+    """
+    Runs every repository method listed in CASES against the configured
+    database, EXPLAINs each statement it issues, and reports the access
+    type, key and estimated rows per table.
+
+    A statement regresses when a table outside the case's `scans` is read
+    with type ALL, or walked as a full index (type index) without serving
+    the ORDER BY (filesort) or without a key. Public repository methods
+    that have no case fail the run too, so a new query cannot slip by
+    unchecked.
+
+    Writes happen inside one transaction that is rolled back; run it with a
+    seeded local database (seed()) so the optimizer sees realistic sizes.
+    """
+
+    def __init__(self, unit_of_work: RequestUnitOfWork, cases: Tuple[PlanCase, ...] = CASES):
+        self.unit_of_work = unit_of_work
+        self.cases = cases
+        self._current: Optional[PlanCase] = None
+        self._report: Optional[QueryPlanReport] = None
+
+    # Tracing
+
+    def _explain(self, raw_connection, sql: str, params) -> None:
+        """EXPLAIN one statement of the current case and judge its plan"""
+        case = self._current
+        statement = StatementPlan(case=case.label, sql=sql, allowed_scans=list(case.scans))
+        self._report.statements.append(statement)
+        cursor = raw_connection.cursor(dictionary=True, buffered=True)
+        try:
+            cursor.execute(f"EXPLAIN {sql}", tuple(params or ()))
+            plan = cursor.fetchall()
+        except Exception as e:
+            statement.problems.append(f"EXPLAIN failed: {e}")
+            return
+        finally:
+            cursor.close()
+
+        for row in plan:
+            plan_row = PlanRow(
+                table=row.get('table'), access=row.get('type'), key=row.get('key'),
+                rows=row.get('rows'), extra=str(row.get('Extra') or '')
+            )
+            statement.rows.append(plan_row)
+            problem = self._judge(plan_row, case)
+            if problem:
+                statement.problems.append(problem)
+
+    def _judge(self, row: PlanRow, case: PlanCase) -> str:
+        """Why a plan row is a regression, or '' when it is fine"""
+        table = row.table or ''
+        if not table or table.startswith('<') or table in case.scans or table in LOOKUP_TABLES:
+            return ''
+        if row.access == 'ALL':
+            return f"full table scan of {table} (~{row.rows} rows)"
+        if row.access == 'index' and (not row.key or 'filesort' in row.extra.lower()):
+            return f"full index scan of {table} via {row.key} (~{row.rows} rows)"
+        return ''
+
+    def _unchecked_methods(self) -> List[str]:
+        """Public repository methods that no case and no exclusion covers"""
+        covered = {(case.repository, case.method) for case in self.cases} | set(EXCLUDED_METHODS)
+        unchecked = []
+        for name, repository_class in REPOSITORIES.items():
+            for method, _ in inspect.getmembers(repository_class, inspect.isfunction):
+                if not method.startswith('_') and (name, method) not in covered:
+                    unchecked.append(f"{name}.{method}")
+        return unchecked
+
+    def samples(self, conn) -> Dict[str, Any]:
+        """Real IDs to call the repositories with (the most active user, their latest order, ...)"""
+        cursor = conn.raw.cursor(buffered=True)
+        cursor.execute("SELECT id FROM products ORDER BY sort_id DESC LIMIT 3")
+        product_ids = [str(row[0]) for row in cursor.fetchall()]
+        cursor.execute("SELECT categoryID FROM products WHERE categoryID IS NOT NULL LIMIT 1")
+        category = cursor.fetchone()
+        cursor.execute("SELECT user_id FROM orders GROUP BY user_id ORDER BY COUNT(*) DESC LIMIT 1")
+        user = cursor.fetchone()
+        user_id = str(user[0]) if user else ''
+        cursor.execute("SELECT email FROM users WHERE id = %s", (user_id,))
+        email = cursor.fetchone()
+        cursor.execute(
+            "SELECT id, order_date, status FROM orders WHERE user_id = %s ORDER BY order_date DESC LIMIT 1",
+            (user_id,)
+        )
+        order = cursor.fetchone()
+        cursor.close()
+        if len(product_ids) < 3 or not category or not order:
+            raise ValueError("database has too little data; run with --seed on an empty local database")
+        return {
+            'product_id': product_ids[0],
+            'product_ids': product_ids,
+            'category_id': int(category[0]),
+            'user_id': user_id,
+            'email': email[0] if email else '',
+            'order_id': str(order[0]),
+            'order_date': order[1],
+            'status': str(order[2]),
+        }
+
+    def run(self) -> QueryPlanReport:
+        """Trace every case in one rolled-back transaction"""
+        self._report = QueryPlanReport(unchecked=self._unchecked_methods())
+        pooled = self.unit_of_work.connection_pool.get_connection()
+        try:
+            pooled.start_transaction()
+            conn = _ExplainingConnection(pooled, self)
+            samples = self.samples(conn)
+            session = _PlanSession(conn)
+            repositories = {name: repository_class(session) for name, repository_class in REPOSITORIES.items()}
+            for case in self.cases:
+                self._current = case
+                try:
+                    case.call(repositories, samples)
+                except Exception as e:
+                    self._report.errors.append(f"{case.label}: {e}")
+        finally:
+            self._current = None
+            try:
+                pooled.rollback()
+            finally:
+                pooled.close()
+        return self._report
+
+    # Seeding
+
+    def seed(self, products: int = 3000, users: int = 1000, orders: int = 20000,
+             log: Callable[[str], None] = print) -> None:
+        """
+        Fill an empty local database with synthetic rows and refresh table
+        statistics, so plans match a production-sized catalog rather than
+        the full scans MySQL picks for tiny tables.
+        """
+        rng = random.Random(42)
+        with self.unit_of_work.connection_pool.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT COUNT(*) FROM products")
+            if cursor.fetchone()[0]:
+                cursor.close()
+                raise ValueError("products is not empty; seed only a fresh local database")
+
+            categories = [(index, f"Series {index}") for index in range(1, 5)]
+            bulk_insert(cursor, 'categories', ('id', 'tenDM'), categories,
+                        suffix="ON DUPLICATE KEY UPDATE tenDM = tenDM")
+            bulk_insert(
+                cursor, 'products',
+                ('id', 'tenSP', 'mota', 'gia', 'categoryID', 'image', 'namSX', 'bestSeller', 'stock_quantity'),
+                [
+                    (str(index), f"Galaxy {chr(65 + index % 26)}{index}", f"Model {index}",
+                     rng.randrange(2, 60) * 500000, rng.randrange(1, 5), f"p{index}.jpg",
+                     rng.randrange(2018, 2026), int(rng.random() < 0.05), rng.randrange(0, 200))
+                    for index in range(1, products + 1)
+                ]
+            )
+            log(f"Seeded {products} products")
+            bulk_insert(
+                cursor, 'users', ('id', 'email', 'password', 'role'),
+                [(f"user{index}", f"user{index}@example.com", '-', 'user') for index in range(1, users + 1)]
+            )
+            log(f"Seeded {users} users")
+
+            statuses = [status.value for status in OrderStatus]
+            now = datetime.now().replace(microsecond=0)
+            order_rows, item_rows = [], []
+            for index in range(1, orders + 1):
+                order_id = f"ORD{index:08d}"
+                lines = rng.sample(range(1, products + 1), rng.randrange(1, 5))
+                total = 0
+                for product_id in lines:
+                    quantity = rng.randrange(1, 3)
+                    item_rows.append((order_id, str(product_id), f"Galaxy {product_id}", 1000000, quantity,
+                                      1000000 * quantity))
+                    total += 1000000 * quantity
+                order_rows.append((
+                    order_id, f"user{rng.randrange(1, users + 1)}", f"Customer {index}",
+                    f"09{rng.randrange(10 ** 7, 10 ** 8)}", '-', 'cod', total, rng.choice(statuses),
+                    now - timedelta(minutes=rng.randrange(0, 365 * 24 * 60))
+                ))
+            bulk_insert(
+                cursor, 'orders',
+                ('id', 'user_id', 'shipping_name', 'shipping_phone', 'shipping_address', 'payment_method',
+                 'total_amount', 'status', 'order_date'),
+                order_rows
+            )
+            bulk_insert(
+                cursor, 'order_items',
+                ('order_id', 'product_id', 'product_name', 'product_price', 'quantity', 'subtotal'),
+                item_rows
+            )
+            log(f"Seeded {orders} orders ({len(item_rows)} items)")
+
+            cursor.execute(SUMMARY_BACKFILL)
+            pair_rows, lookup_rows = [], []
+            for product_id in range(1, products + 1):
+                related = [str((product_id + offset) % products + 1) for offset in range(1, 5)]
+                pair_rows.append((str(product_id), str(product_id), rng.randrange(5, 50)))
+                pair_rows.extend((str(product_id), other, rng.randrange(1, 5)) for other in related)
+                lookup_rows.append((str(product_id), ','.join(related)))
+            bulk_insert(cursor, 'product_copurchase', ('product_id', 'related_id', 'pair_count'), pair_rows)
+            bulk_insert(cursor, 'product_associations', ('product_id', 'related_ids'), lookup_rows)
+            log("Seeded order summaries and co-purchase tables")
+
+            for table in ('categories', 'products', 'users', 'orders', 'order_items', 'order_summaries',
+                          'product_copurchase', 'product_associations'):
+                cursor.execute(f"ANALYZE TABLE {table}")
+                cursor.fetchall()
+            conn.commit()
+            cursor.close()
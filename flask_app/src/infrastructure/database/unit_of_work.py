@@ -0,0 +1,194 @@
+"""Request Unit of Work - One connection and one transaction per Flask request"""
+from typing import Callable
+from flask import g, has_request_context
+from ...domain.repositories import IUnitOfWork
+from .connection_pool import MySQLConnectionPool, PooledConnection
+
+
+class UnitOfWorkConnection:
+    """
+    Connection handed to repositories while a request is active.
+
+    close() and commit() are deferred: the request's transaction is
+    committed once by RequestUnitOfWork (after the view, or earlier through
+    RequestUnitOfWork.commit()). rollback() undoes the work done so far and
+    marks the whole unit as rollback-only; after-commit callbacks queued so
+    far are dropped with it.
+    """
+
+    def __init__(self, pooled_connection: PooledConnection):
+        self._pooled = pooled_connection
+        self.rollback_only = False
+        self.after_commit = []
+
+    @property
+    def raw(self):
+        """Underlying mysql.connector connection"""
+        return self._pooled.raw
+
+    def close(self) -> None:
+        """Keep the connection open until the request ends"""
+        pass
+
+    def commit(self) -> None:
+        """Deferred to RequestUnitOfWork, which commits the whole request at once"""
+        pass
+
+    def rollback(self) -> None:
+        """Roll back now and make sure nothing from this request gets committed"""
+        self.rollback_only = True
+        self.after_commit.clear()
+        self._pooled.rollback()
+        self._pooled.start_transaction()
+
+    def __getattr__(self, name):
+        return getattr(self._pooled, name)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+class UnitOfWorkError(Exception):
+    """Raised when the request's transaction cannot be committed"""
+    pass
+
+
+class RequestUnitOfWork(IUnitOfWork):
+    """
+    Hands every repository the same connection for the life of a request.
+
+    The connection is checked out from the pool lazily on first use and
+    bound to Flask `g`. The transaction is committed by an after_request
+    hook, before the response is sent, so a failed commit surfaces as a 500
+    instead of a success page for lost writes; teardown only rolls back
+    what was not committed and releases the connection.
+
+    Shared in-memory state derived from the database (caches, catalog
+    indexes) is refreshed through after_commit(), so other requests never
+    see writes that are still uncommitted or later rolled back. Outside a Flask
+    request (scripts, CLI commands, background jobs, even inside an app
+    context) each call gets its own pooled connection and commits on its own,
+    exactly like using the pool directly; no after_request hook would ever
+    commit for them.
+    """
+
+    _G_KEY = '_db_unit_of_work'
+
+    def __init__(self, connection_pool: MySQLConnectionPool):
+        self.connection_pool = connection_pool
+
+    def init_app(self, app) -> None:
+        """Register the commit (after_request) and release (teardown) hooks on the Flask app"""
+        app.after_request(self._commit_response)
+        app.teardown_appcontext(self.teardown)
+
+    def get_connection(self):
+        """Get the request-scoped connection, or a pooled one outside a request"""
+        if not has_request_context():
+            return self.connection_pool.get_connection()
+
+        conn = g.get(self._G_KEY)
+        if conn is None:
+            pooled = self.connection_pool.get_connection()
+            try:
+                pooled.start_transaction()
+            except Exception:
+                pooled.close()
+                raise
+            conn = UnitOfWorkConnection(pooled)
+            setattr(g, self._G_KEY, conn)
+        return conn
+
+    def _current(self):
+        """The request's connection, or None when no request transaction is open"""
+        return g.get(self._G_KEY) if has_request_context() else None
+
+    def commit(self) -> None:
+        """
+        Commit the request's transaction now and start a new one for the rest
+        of the request (e.g. to release row locks before rendering).
+        Raises: UnitOfWorkError if an earlier statement rolled the unit back,
+        or the driver error if the commit itself fails
+        """
+        conn = self._current()
+        if conn is None:
+            return  # Outside a request each repository call commits its own connection
+        if conn.rollback_only:
+            raise UnitOfWorkError("Transaction was rolled back earlier in this request")
+        conn.raw.commit()
+        conn._pooled.start_transaction()
+        self._run_after_commit(conn)
+
+    def rollback(self) -> None:
+        """
+        Undo the request's writes and mark it rollback-only, so later
+        statements cannot be committed by the after_request hook. Repositories
+        call this when a statement on the shared connection fails. No-op
+        outside a request, where the failed call's own connection is discarded.
+        """
+        conn = self._current()
+        if conn is None:
+            return
+        try:
+            conn.rollback()  # marks rollback_only before touching the driver
+        except Exception as e:
+            print(f"Error rolling back unit of work: {e}")
+
+    def after_commit(self, callback: Callable[[], None]) -> None:
+        """
+        Run callback once the request's writes are committed; dropped if they
+        are rolled back. Runs immediately when no request transaction is open.
+        """
+        conn = self._current()
+        if conn is None:
+            callback()
+        else:
+            conn.after_commit.append(callback)
+
+    def has_pending_commit(self) -> bool:
+        """Whether the current request queued writes that other connections cannot see yet"""
+        conn = self._current()
+        return bool(conn is not None and conn.after_commit)
+
+    def _run_after_commit(self, conn: UnitOfWorkConnection) -> None:
+        """Run the callbacks queued before the commit; the data is committed, so failures are only logged"""
+        callbacks, conn.after_commit = conn.after_commit, []
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception as e:
+                print(f"Error in after-commit callback: {e}")
+
+    def _commit_response(self, response):
+        """
+        after_request hook: commit before the response leaves. Errors
+        propagate, so Flask answers 500 rather than confirming lost writes.
+        Flask also runs this hook for the 500 response of an unhandled
+        error; that transaction is rolled back instead.
+        """
+        conn = self._current()
+        if conn is None:
+            return response
+        if response.status_code >= 500 or conn.rollback_only:
+            conn.after_commit.clear()
+            conn.raw.rollback()
+        else:
+            conn.raw.commit()
+            self._run_after_commit(conn)
+        return response
+
+    def teardown(self, exception=None) -> None:
+        """Roll back whatever was not committed (errors, aborted requests) and release the connection"""
+        conn = g.pop(self._G_KEY, None)
+        if conn is None:
+            return
+
+        try:
+            conn.raw.rollback()
+        except Exception as e:
+            print(f"Error rolling back unit of work: {e}")
+        finally:
+            conn._pooled.close()
@@ -0,0 +1,7 @@
+from .copurchase_job import CoPurchaseJob, count_pairs, top_associations
+
+__all__ = [
+    'CoPurchaseJob',
+    'count_pairs',
+    'top_associations'
+]
@@ -0,0 +1,137 @@
+"""Co-purchase Job - Mines "bought together" associations from order_items"""
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from ...domain.repositories import IAssociationRepository
+
+
+def count_pairs(baskets: List[List[str]]) -> Dict[Tuple[str, str], int]:
+    """
+    Co-occurrence counts of one batch of baskets.
+
+    Product IDs are coded to dense ints once; every basket contributes its
+    upper-triangle pairs (np.triu_indices) and the pairs of the whole batch
+    are counted with a single np.unique. Both directions and the (p, p)
+    diagonal (orders containing p) are returned, matching the table layout.
+    """
+    baskets = [sorted(set(basket)) for basket in baskets if basket]
+    if not baskets:
+        return {}
+    vocabulary, codes = np.unique(np.array([pid for basket in baskets for pid in basket]),
+                                  return_inverse=True)
+    sizes = np.fromiter((len(b) for b in baskets), dtype=np.int64, count=len(baskets))
+    offsets = np.concatenate([[0], np.cumsum(sizes)[:-1]])
+
+    firsts, seconds = [codes], [codes]   # diagonal: one hit per basket
+    triangles = {}
+    for offset, size in zip(offsets, sizes):
+        if size < 2:
+            continue
+        if size not in triangles:
+            triangles[size] = np.triu_indices(size, 1)
+        upper, lower = triangles[size]
+        firsts.append(codes[offset + upper])
+        seconds.append(codes[offset + lower])
+    first, second = np.concatenate(firsts), np.concatenate(seconds)
+
+    # Symmetric: (a, b) and (b, a); the diagonal only once
+    off_diagonal = first != second
+    first, second = np.concatenate([first, second[off_diagonal]]), np.concatenate([second, first[off_diagonal]])
+    width = len(vocabulary)
+    pairs, counts = np.unique(first.astype(np.int64) * width + second, return_counts=True)
+    return {
+        (str(vocabulary[pair // width]), str(vocabulary[pair % width])): int(count)
+        for pair, count in zip(pairs, counts)
+    }
+
+
+def top_associations(rows: List[Tuple[str, str, int]], support: Dict[str, int],
+                     k: int, min_pair_count: int = 1) -> Dict[str, List[str]]:
+    """
+    Top-k related products per product from (product, related, count) rows.
+
+    Score is cosine similarity of the order-incidence vectors,
+    count(a, b) / sqrt(orders(a) * orders(b)), so a product in every order
+    does not crowd out genuinely paired items. Ranking is one lexsort over
+    (product, -score) and a rank-within-group cut, no per-product sorting.
+    """
+    rows = [row for row in rows if row[0] != row[1] and row[2] >= min_pair_count]
+    if not rows:
+        return {}
+    products = sorted({row[0] for row in rows})
+    product_code = {pid: code for code, pid in enumerate(products)}
+    group = np.fromiter((product_code[row[0]] for row in rows), dtype=np.int64, count=len(rows))
+    counts = np.fromiter((row[2] for row in rows), dtype=np.float64, count=len(rows))
+    support_a = np.fromiter((support.get(row[0], 0) for row in rows), dtype=np.float64, count=len(rows))
+    support_b = np.fromiter((support.get(row[1], 0) for row in rows), dtype=np.float64, count=len(rows))
+    scores = counts / np.sqrt(np.maximum(support_a * support_b, 1.0))
+
+    # Ties broken by the raw count, then by related ID for stable output
+    related = np.array([row[1] for row in rows])
+    order = np.lexsort((related, -counts, -scores, group))
+    group = group[order]
+    starts = np.flatnonzero(np.r_[True, group[1:] != group[:-1]])
+    rank = np.arange(len(group)) - np.repeat(starts, np.diff(np.r_[starts, len(group)]))
+    keep = order[rank < k]
+
+    top: Dict[str, List[str]] = {}
+    for index in keep:
+        top.setdefault(rows[index][0], []).append(rows[index][1])
+    return top
+
+
+class CoPurchaseJob:
+    """
+    Batch job behind the "Thường được mua cùng" sections.
+
+    Each run streams orders placed since the stored watermark in batches,
+    adds their pair counts to product_copurchase together with the new
+    watermark (one transaction per batch, so an interrupted run resumes
+    where it stopped), then rewrites the top-k lookup rows only for
+    products whose scores can have changed: those in the new orders and
+    everything already paired with them.
+    """
+
+    def __init__(self, association_repository: IAssociationRepository, top_k: int = 8,
+                 min_pair_count: int = 1, batch_size: int = 500):
+        self.association_repository = association_repository
+        self.top_k = top_k
+        self.min_pair_count = min_pair_count
+        self.batch_size = batch_size
+
+    def run(self, rebuild: bool = False, log=print) -> dict:
+        """Process new orders and refresh affected lookups; returns run counters"""
+        repository = self.association_repository
+        stats = {'orders': 0, 'pairs': 0, 'products': 0}
+        if not repository.ensure_schema():
+            return stats
+        if rebuild and not repository.reset():
+            return stats
+
+        watermark: Optional[Tuple] = repository.get_watermark()
+        touched = set()
+        for batch in repository.stream_baskets(watermark, self.batch_size):
+            pair_counts = count_pairs([items for _, _, items in batch])
+            last_date, last_id, _ = batch[-1]
+            if not repository.apply_batch(pair_counts, (last_date, last_id)):
+                break
+            touched.update(pid for pid, _ in pair_counts)
+            stats['orders'] += len(batch)
+            stats['pairs'] += len(pair_counts)
+            log(f"Processed {stats['orders']} orders (up to {last_date})")
+
+        if touched:
+            stats['products'] = self.refresh(touched)
+        return stats
+
+    def refresh(self, product_ids) -> int:
+        """Recompute and store the top-k lookups of the given products and their partners"""
+        repository = self.association_repository
+        partners = {related for _, related, _ in repository.get_pair_counts(sorted(product_ids))}
+        affected = sorted(set(product_ids) | partners)
+
+        rows = repository.get_pair_counts(affected)
+        support = repository.get_support(sorted({related for _, related, _ in rows} | set(affected)))
+        top = top_associations(rows, support, self.top_k, self.min_pair_count)
+        # Products whose pairs all fell under the threshold get an empty row
+        repository.save_associations({pid: top.get(pid, []) for pid in affected})
+        return len(affected)
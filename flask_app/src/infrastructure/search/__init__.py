@@ -0,0 +1,30 @@
+from .text import fold, tokenize, normalize_query
+from .catalog_index import CatalogIndex, CatalogRefresher, iter_bits, sort_id, id_order
+from .product_search_index import InvertedProductIndex
+from .suggestion_index import PrefixSuggestionIndex
+from .facet_index import FacetIndex
+from .recommendation_index import RecommendationIndex, detect_series, detect_tags
+from .similar_products_index import SimilarProductsIndex
+from .sales_ranking import SalesRanking
+from .trigram_index import TrigramProductIndex, substring_edit_distance
+
+__all__ = [
+    'fold',
+    'tokenize',
+    'normalize_query',
+    'CatalogIndex',
+    'CatalogRefresher',
+    'iter_bits',
+    'sort_id',
+    'id_order',
+    'InvertedProductIndex',
+    'PrefixSuggestionIndex',
+    'TrigramProductIndex',
+    'FacetIndex',
+    'RecommendationIndex',
+    'detect_series',
+    'detect_tags',
+    'SimilarProductsIndex',
+    'SalesRanking',
+    'substring_edit_distance'
+]
@@ -0,0 +1,179 @@
+"""Catalog Index - Shared snapshot loading and background refresh for in-memory product indexes"""
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional
+from ...domain.entities import Product
+from ...domain.repositories import IProductIndex, IProductRepository, ISearchResultCache
+
+
+def sort_id(product_id) -> int:
+    """Numeric value of a product id, 0 for non-numeric ones (same rule as the products.sort_id column)"""
+    product_id = str(product_id)
+    if product_id.isascii() and product_id.isdigit() and len(product_id) <= 18:
+        return int(product_id)
+    return 0
+
+
+def id_order(product_id) -> tuple:
+    """Listing tie-breaker of a product id, matching ORDER BY p.sort_id, p.id"""
+    return (sort_id(product_id), str(product_id))
+
+
+def iter_bits(bits: int):
+    """Positions of the set bits of a Python int used as a bitset"""
+    while bits:
+        low = bits & -bits
+        yield low.bit_length() - 1
+        bits ^= low
+
+
+class CatalogIndex(ABC):
+    """
+    Base for indexes built from a catalog snapshot, i.e. the rows of
+    IProductRepository.get_search_documents().
+
+    Subclasses implement _load(products) (full build, called with the lock
+    held) and keep themselves current through index_product/remove_product.
+    They never read the database themselves: CatalogRefresher reads the
+    catalog once and hands the same snapshot to every index.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+
+    @abstractmethod
+    def _load(self, products: List[Product]) -> None:
+        """Replace the whole index contents (lock is held)"""
+        pass
+
+    def load(self, products: List[Product]) -> None:
+        """Rebuild the whole index from a catalog snapshot"""
+        with self._lock:
+            self._load(products)
+
+
+class CatalogRefresher(IProductIndex):
+    """
+    Rebuilds every catalog index from one shared snapshot, off the request path.
+
+    start() launches a daemon thread that builds the indexes right away and
+    then every rebuild_interval seconds, as a safety net for edits made
+    directly in MySQL. Until the first build succeeds the indexes are empty
+    and the use cases fall back to SQL; a failed read keeps the current
+    contents and is retried after retry_interval seconds.
+
+    The refresher is also the IProductIndex the write use cases notify: it
+    forwards each change to every index. While a rebuild runs, changes are
+    journaled too and replayed on each index right after it swaps in the
+    snapshot, so a write made after the snapshot was read survives the
+    swap, and is applied once to an index that has already been swapped.
+    The caches are invalidated after the swap, since their results came
+    from the old contents.
+    """
+
+    def __init__(self, product_repository: IProductRepository, indexes: List[CatalogIndex],
+                 rebuild_interval: float = 600, retry_interval: float = 30,
+                 caches: Optional[List[ISearchResultCache]] = None):
+        self.product_repository = product_repository
+        self.indexes = list(indexes)
+        self.caches = list(caches or [])
+        self.rebuild_interval = rebuild_interval
+        self.retry_interval = retry_interval
+        self.built_at: Optional[float] = None
+        self.replayed = 0
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self._refresh_lock = threading.Lock()   # one rebuild at a time
+        self._write_lock = threading.RLock()    # orders changes against index swaps
+        self._journal: Optional[list] = None    # changes since the running rebuild started
+        self._stop = threading.Event()
+
+    def _apply(self, index, method: str, args: tuple) -> None:
+        """Apply one change to one index; a failing index must not block the others"""
+        try:
+            getattr(index, method)(*args)
+        except Exception as e:
+            print(f"Error applying {method} to {type(index).__name__}: {e}")
+
+    def _dispatch(self, method: str, *args) -> None:
+        """Forward a change to every index, journaling it while a rebuild runs"""
+        with self._write_lock:
+            if self._journal is not None:
+                self._journal.append((method, args))
+            for index in self.indexes:
+                self._apply(index, method, args)
+
+    def index_product(self, product: Product) -> None:
+        """A product was created or updated"""
+        self._dispatch('index_product', product)
+
+    def remove_product(self, product_id) -> None:
+        """A product was deleted"""
+        self._dispatch('remove_product', product_id)
+
+    def stock_changed(self, deltas: Dict[str, int]) -> None:
+        """Stock moved by orders/cancellations"""
+        self._dispatch('stock_changed', deltas)
+
+    def refresh(self) -> bool:
+        """Read the catalog once and load it into every index; False if nothing could be read"""
+        with self._refresh_lock:
+            with self._write_lock:
+                # Start before the read: a change committed after it is replayed
+                self._journal = []
+            try:
+                products = self.product_repository.get_search_documents()
+                if not products:
+                    # [] is also what the repository returns on a DB error: keep what we have
+                    return False
+                for index in self.indexes:
+                    with self._write_lock:
+                        try:
+                            index.load(products)
+                        except Exception as e:
+                            print(f"Error loading {type(index).__name__}: {e}")
+                            continue
+                        for method, args in self._journal:
+                            self._apply(index, method, args)
+                        self.replayed += len(self._journal)
+            finally:
+                with self._write_lock:
+                    self._journal = None
+        for cache in self.caches:
+            cache.invalidate()
+        self.built_at = time.monotonic()
+        return True
+
+    def _run(self) -> None:
+        """Thread body: build now, then rebuild periodically until stop()"""
+        while not self._stop.is_set():
+            try:
+                built = self.refresh()
+            except Exception as e:
+                print(f"Error refreshing catalog indexes: {e}")
+                built = False
+            self._stop.wait(self.rebuild_interval if built else min(self.retry_interval, self.rebuild_interval))
+
+    def start(self) -> None:
+        """Start the background thread once per process (cheap to call on every request)"""
+        if self._thread is not None:
+            return
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='catalog-refresher', daemon=True)
+                self._thread.start()
+
+    def stop(self) -> None:
+        """Ask the background thread to finish after its current build"""
+        self._stop.set()
+
+    def get_stats(self) -> dict:
+        """Refresher state"""
+        return {
+            'indexes': [type(index).__name__ for index in self.indexes],
+            'running': self._thread is not None and self._thread.is_alive(),
+            'built_seconds_ago': time.monotonic() - self.built_at if self.built_at is not None else None,
+            'rebuild_interval': self.rebuild_interval,
+            'replayed_changes': self.replayed
+        }
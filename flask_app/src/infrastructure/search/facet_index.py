@@ -0,0 +1,312 @@
+"""Facet Index - Bitmap-based filtering and facet counts over the catalog"""
+import bisect
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from ...domain.entities import Product, ProductFilter, ProductSort, PRICE_BANDS
+from ...domain.repositories import IFacetIndex, ISalesRanking
+from .catalog_index import CatalogIndex, id_order
+from .text import fold
+
+
+class FacetIndex(CatalogIndex, IFacetIndex):
+    """
+    In-memory facets over the catalog.
+
+    Every product gets a dense document number. Each facet value (category,
+    price band, in stock, bestseller) is a numpy bool array over the
+    documents, so a filter combination is a few vectorised ANDs and a facet
+    count is np.count_nonzero. Price bands are filled as products are added;
+    arbitrary price ranges compare against the price column.
+
+    Each sort keeps its documents presorted (ascending keys plus the aligned
+    doc numbers), built once per catalog change. A page is a bisect to the
+    cursor and a scan of the presorted docs through the filter mask, so
+    queries never sort. Sales only move the products they touch in the
+    bestseller order (SalesRanking.changes_since), so orders do not re-sort
+    the catalog under the lock.
+
+    Counts follow the usual drill-down rule: each facet is counted with every
+    *other* active filter applied, so picking a category still shows how many
+    products the other categories would give.
+
+    The bestseller sort uses units sold from sales_ranking when one is
+    given, with the manual flag as tie-breaker. Its keys have the same
+    shape as ProductSort.key_of, [units, flag, id], so cursors carry over to
+    the SQL fallback.
+    """
+
+    MAX_MOVES = 256  # more changed products than this and a full re-sort is cheaper
+
+    def __init__(self, sales_ranking: Optional[ISalesRanking] = None):
+        super().__init__()
+        self.sales_ranking = sales_ranking
+        self._reset()
+
+    def _reset(self, capacity: int = 64) -> None:
+        """Empty all structures (lock must be held or not yet shared)"""
+        self._size = 0
+        self._doc_product: List[str] = []
+        self._doc_name: List[str] = []                 # folded, for name_query
+        self._product_doc: Dict[str, int] = {}
+        self._stock: Dict[str, int] = {}
+        self._price = np.zeros(capacity, dtype=np.float64)
+        self._flag = np.zeros(capacity, dtype=np.int8)
+        self._live = np.zeros(capacity, dtype=bool)
+        self._in_stock = np.zeros(capacity, dtype=bool)
+        self._categories: Dict[int, np.ndarray] = {}
+        self._bands: Dict[str, np.ndarray] = {band.key: np.zeros(capacity, dtype=bool) for band in PRICE_BANDS}
+        self._orders: Dict[ProductSort, list] = {}  # sort -> [ranking version, keys, docs, doc keys]
+
+    def _grow(self) -> None:
+        """Double the capacity of every per-document array (lock must be held)"""
+        capacity = 2 * len(self._live)
+
+        def resized(values: np.ndarray) -> np.ndarray:
+            grown = np.zeros(capacity, dtype=values.dtype)
+            grown[:len(values)] = values
+            return grown
+
+        self._price, self._flag = resized(self._price), resized(self._flag)
+        self._live, self._in_stock = resized(self._live), resized(self._in_stock)
+        self._categories = {key: resized(mask) for key, mask in self._categories.items()}
+        self._bands = {key: resized(mask) for key, mask in self._bands.items()}
+
+    # Building
+
+    def _add(self, product: Product) -> None:
+        """Append a document for the product (lock must be held)"""
+        if self._size == len(self._live):
+            self._grow()
+        product_id = str(product.id)
+        doc = self._size
+        self._size += 1
+        price = float(product.price or 0)
+        stock = int(product.stock_quantity or 0)
+        self._doc_product.append(product_id)
+        self._doc_name.append(fold(product.name))
+        self._product_doc[product_id] = doc
+        self._stock[product_id] = stock
+
+        self._price[doc] = price
+        self._flag[doc] = 1 if product.bestSeller else 0
+        self._live[doc] = True
+        self._in_stock[doc] = stock > 0
+        if product.category_id:
+            mask = self._categories.get(product.category_id)
+            if mask is None:
+                mask = self._categories[product.category_id] = np.zeros(len(self._live), dtype=bool)
+            mask[doc] = True
+        for band in PRICE_BANDS:
+            if band.contains(price):
+                self._bands[band.key][doc] = True
+        self._orders = {}
+
+    def _remove(self, product_id: str) -> None:
+        """Clear the product's document everywhere (lock must be held)"""
+        doc = self._product_doc.pop(product_id, None)
+        if doc is None:
+            return
+        self._stock.pop(product_id, None)
+        self._live[doc] = False
+        self._in_stock[doc] = False
+        self._flag[doc] = 0
+        for category_id in list(self._categories):
+            self._categories[category_id][doc] = False
+            if not self._categories[category_id].any():
+                del self._categories[category_id]
+        for mask in self._bands.values():
+            mask[doc] = False
+        # The removed doc stays in the presorted orders; _live masks it out
+
+    def _load(self, products: List[Product]) -> None:
+        """Replace all bitmaps (lock is held)"""
+        self._reset(max(64, len(products)))
+        for product in products:
+            if product.id is not None:
+                self._add(product)
+
+    def index_product(self, product: Product) -> None:
+        """Add or replace one product"""
+        if product.id is None:
+            return
+        with self._lock:
+            self._remove(str(product.id))
+            self._add(product)
+
+    def remove_product(self, product_id) -> None:
+        """Drop one product"""
+        with self._lock:
+            self._remove(str(product_id))
+
+    def stock_changed(self, deltas: Dict[str, int]) -> None:
+        """Apply stock deltas from orders/cancellations to the in-stock bitmap"""
+        with self._lock:
+            for product_id, delta in deltas.items():
+                product_id = str(product_id)
+                doc = self._product_doc.get(product_id)
+                if doc is None:
+                    continue
+                stock = self._stock[product_id] = self._stock[product_id] + delta
+                self._in_stock[doc] = stock > 0
+
+    # Querying
+
+    def _filter_masks(self, filters: ProductFilter) -> Dict[str, np.ndarray]:
+        """One bitmap per active facet dimension (lock must be held)"""
+        size = self._size
+        dimensions = {}
+        if filters.category_id is not None:
+            mask = self._categories.get(filters.category_id)
+            dimensions['category'] = mask[:size] if mask is not None else np.zeros(size, dtype=bool)
+        if filters.price_band and filters.min_price is None and filters.max_price is None:
+            mask = self._bands.get(filters.price_band)
+            dimensions['price'] = mask[:size] if mask is not None else np.zeros(size, dtype=bool)
+        else:
+            low, high = filters.price_range()
+            if low is not None or high is not None:
+                prices = self._price[:size]
+                mask = np.ones(size, dtype=bool)
+                if low is not None:
+                    mask &= prices >= low
+                if high is not None:
+                    mask &= prices < high
+                dimensions['price'] = mask
+        if filters.in_stock:
+            dimensions['in_stock'] = self._in_stock[:size]
+        if filters.bestseller:
+            dimensions['bestseller'] = self._flag[:size] > 0
+        if filters.name_query:
+            # Same rule as the SQL fallback's LIKE '%...%', case- and accent-insensitive
+            needle = fold(filters.name_query)
+            dimensions['name'] = np.fromiter((needle in name for name in self._doc_name), dtype=bool, count=size)
+        return dimensions
+
+    def _combine(self, dimensions: Dict[str, np.ndarray], skip: Optional[str] = None) -> np.ndarray:
+        """AND of the live set and every dimension except `skip`"""
+        mask = self._live[:self._size].copy()
+        for name, dimension_mask in dimensions.items():
+            if name != skip:
+                mask &= dimension_mask
+        return mask
+
+    def _sort_key(self, doc: int, sort: ProductSort, units_sold: Dict[str, int]) -> tuple:
+        """Sort key of a document, matching the SQL keyset order"""
+        product_id = self._doc_product[doc]
+        tie = id_order(product_id)
+        if sort in (ProductSort.PRICE_ASC, ProductSort.PRICE_DESC):
+            return (float(self._price[doc]), tie)
+        if sort == ProductSort.BESTSELLER:
+            return (units_sold.get(product_id, 0), int(self._flag[doc]), tie)
+        return (tie,)
+
+    def _move_docs(self, order: list, units_sold: Dict[str, int]) -> None:
+        """Re-place the documents of products whose units changed in a bestseller order (lock must be held)"""
+        _, keys, docs, doc_keys = order
+        for product_id in units_sold:
+            doc = self._product_doc.get(product_id)
+            if doc is None or doc >= len(doc_keys):
+                continue
+            key = self._sort_key(doc, ProductSort.BESTSELLER, units_sold)
+            old = doc_keys[doc]
+            if key == old:
+                continue
+            index = bisect.bisect_left(keys, old)
+            while docs[index] != doc:
+                index += 1  # a removed copy of the same product may share the key
+            del keys[index]
+            docs = np.delete(docs, index)
+            index = bisect.bisect_left(keys, key)
+            keys.insert(index, key)
+            docs = np.insert(docs, index, doc)
+            doc_keys[doc] = key
+        order[2] = docs
+
+    def _order(self, sort: ProductSort) -> Tuple[List[tuple], np.ndarray, List[tuple]]:
+        """
+        Ascending sort keys, the aligned doc numbers and each doc's key for
+        `sort`; built on first use after a catalog change (lock must be held)
+        """
+        if sort == ProductSort.PRICE_DESC:
+            sort = ProductSort.PRICE_ASC  # same order, read backwards
+        if sort == ProductSort.BESTSELLER and self.sales_ranking is not None:
+            # Read the version first: a change in between is only applied twice, which is harmless
+            version = self.sales_ranking.version()
+        else:
+            version = None
+        cached = self._orders.get(sort)
+        if cached is not None and cached[0] != version:
+            changes = self.sales_ranking.changes_since(cached[0])
+            if changes is not None and len(changes) <= self.MAX_MOVES:
+                self._move_docs(cached, changes)
+                cached[0] = version
+            else:
+                cached = None
+        if cached is not None:
+            return cached[1], cached[2], cached[3]
+
+        units_sold = self.sales_ranking.units_sold() if version is not None else {}
+        doc_keys = [self._sort_key(doc, sort, units_sold) for doc in range(self._size)]
+        ordered = sorted(range(self._size), key=doc_keys.__getitem__)
+        keys = [doc_keys[doc] for doc in ordered]
+        docs = np.array(ordered, dtype=np.int64)
+        self._orders[sort] = [version, keys, docs, doc_keys]
+        return keys, docs, doc_keys
+
+    def query(self, filters: ProductFilter, sort: ProductSort, after: Optional[list],
+              limit: int) -> Tuple[List[Tuple[str, list]], dict]:
+        """
+        Filtered, sorted keyset page plus facet counts.
+        Returns: ([(product_id, sort_key), ...], facet_counts)
+        """
+        with self._lock:
+            dimensions = self._filter_masks(filters)
+            matched = self._combine(dimensions)
+            keys, docs, doc_keys = self._order(sort)
+
+            # Keys end with id_order(id); cursors end with the plain id, as in SQL.
+            # A cursor of another shape (another sort, an old link) means the first page.
+            if after and keys and len(after) != len(keys[0]):
+                after = None
+            after_key = tuple(after[:-1]) + (id_order(after[-1]),) if after else None
+            if sort != ProductSort.PRICE_ASC:
+                end = bisect.bisect_left(keys, after_key) if after_key else len(keys)
+                candidates = docs[:end][::-1]
+            else:
+                start = bisect.bisect_right(keys, after_key) if after_key else 0
+                candidates = docs[start:]
+            page = candidates[matched[candidates]][:limit]
+            rows = []
+            for doc in page.tolist():
+                product_id = self._doc_product[doc]
+                rows.append((product_id, list(doc_keys[doc][:-1]) + [product_id]))
+
+            size = self._size
+            by_category = self._combine(dimensions, 'category')
+            by_price = self._combine(dimensions, 'price')
+            counts = {
+                'total': int(np.count_nonzero(matched)),
+                'categories': {
+                    category_id: int(np.count_nonzero(mask[:size] & by_category))
+                    for category_id, mask in self._categories.items()
+                },
+                'price_bands': {
+                    key: int(np.count_nonzero(mask[:size] & by_price))
+                    for key, mask in self._bands.items()
+                },
+                'in_stock': int(np.count_nonzero(self._in_stock[:size] & self._combine(dimensions, 'in_stock'))),
+                'bestseller': int(np.count_nonzero(self._flag[:size] & self._combine(dimensions, 'bestseller')))
+            }
+        return rows, counts
+
+    def is_empty(self) -> bool:
+        """Whether the index holds no products"""
+        return not self._product_doc
+
+    def get_stats(self) -> dict:
+        """Index size counters"""
+        with self._lock:
+            return {
+                'products': len(self._product_doc),
+                'documents': self._size,
+                'categories': len(self._categories)
+            }
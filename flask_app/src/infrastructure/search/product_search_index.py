@@ -0,0 +1,187 @@
+"""Product Search Index - In-memory inverted index with BM25 ranking"""
+import bisect
+import math
+from collections import Counter
+from typing import Dict, List
+from ...domain.entities import Product
+from ...domain.repositories import IProductSearchIndex
+from .catalog_index import CatalogIndex
+from .text import tokenize
+
+
+class InvertedProductIndex(CatalogIndex, IProductSearchIndex):
+    """
+    Token-level inverted index over product name, category and description.
+
+    - Text is case- and diacritic-folded, so "dien thoai" matches "Điện thoại"
+    - Ranking is BM25 with the name weighted above the description
+    - Every query term must match (falls back to any-term when that finds
+      nothing); the last term also matches as a prefix ("galaxy s2" -> s24...)
+    - index_product/remove_product update postings in place
+    """
+
+    K1 = 1.2
+    B = 0.75
+    NAME_WEIGHT = 3
+    CATEGORY_WEIGHT = 2
+    DESCRIPTION_WEIGHT = 1
+
+    def __init__(self):
+        super().__init__()
+        self._postings: Dict[str, Dict[str, int]] = {}  # term -> {product_id: weighted tf}
+        self._doc_terms: Dict[str, Counter] = {}         # product_id -> Counter(term -> weighted tf)
+        self._doc_len: Dict[str, int] = {}
+        self._total_len = 0
+        self._vocabulary: List[str] = []                 # sorted, for prefix lookups
+
+    # Building
+
+    def _document_terms(self, product: Product) -> Counter:
+        """Weighted term frequencies for one product"""
+        terms = Counter()
+        for token in tokenize(product.name):
+            terms[token] += self.NAME_WEIGHT
+        for token in tokenize(product.category_name or ''):
+            terms[token] += self.CATEGORY_WEIGHT
+        for token in tokenize(product.description or ''):
+            terms[token] += self.DESCRIPTION_WEIGHT
+        return terms
+
+    def _add(self, product_id: str, terms: Counter) -> None:
+        """Add a document's postings (lock must be held)"""
+        self._doc_terms[product_id] = terms
+        length = sum(terms.values())
+        self._doc_len[product_id] = length
+        self._total_len += length
+        for term, tf in terms.items():
+            postings = self._postings.get(term)
+            if postings is None:
+                postings = self._postings[term] = {}
+                bisect.insort(self._vocabulary, term)
+            postings[product_id] = tf
+
+    def _remove(self, product_id: str) -> None:
+        """Remove a document's postings (lock must be held)"""
+        terms = self._doc_terms.pop(product_id, None)
+        if terms is None:
+            return
+        self._total_len -= self._doc_len.pop(product_id, 0)
+        for term in terms:
+            postings = self._postings.get(term)
+            if postings is None:
+                continue
+            postings.pop(product_id, None)
+            if not postings:
+                del self._postings[term]
+                index = bisect.bisect_left(self._vocabulary, term)
+                if index < len(self._vocabulary) and self._vocabulary[index] == term:
+                    del self._vocabulary[index]
+
+    def _load(self, products: List[Product]) -> None:
+        """Replace all postings (lock is held)"""
+        self._postings, self._doc_terms, self._doc_len = {}, {}, {}
+        self._total_len = 0
+        self._vocabulary = []
+        for product in products:
+            self._add(str(product.id), self._document_terms(product))
+
+    def index_product(self, product: Product) -> None:
+        """Add or replace one product"""
+        if product.id is None:
+            return
+        product_id = str(product.id)
+        terms = self._document_terms(product)
+        with self._lock:
+            self._remove(product_id)
+            self._add(product_id, terms)
+
+    def remove_product(self, product_id) -> None:
+        """Drop one product"""
+        with self._lock:
+            self._remove(str(product_id))
+
+    # Querying
+
+    def _expand_prefix(self, prefix: str, limit: int = 50) -> List[str]:
+        """Vocabulary terms starting with prefix (lock must be held)"""
+        start = bisect.bisect_left(self._vocabulary, prefix)
+        matches = []
+        for term in self._vocabulary[start:start + limit]:
+            if not term.startswith(prefix):
+                break
+            matches.append(term)
+        return matches
+
+    def _score_term(self, term: str, doc_count: int, avg_len: float) -> Dict[str, float]:
+        """BM25 contribution of one term for each document containing it"""
+        postings = self._postings.get(term, {})
+        df = len(postings)
+        if not df:
+            return {}
+        idf = math.log(1 + (doc_count - df + 0.5) / (df + 0.5))
+        contributions = {}
+        for product_id, tf in postings.items():
+            norm = self.K1 * (1 - self.B + self.B * self._doc_len[product_id] / avg_len)
+            contributions[product_id] = idf * tf * (self.K1 + 1) / (tf + norm)
+        return contributions
+
+    def search(self, query: str, limit: int = 50) -> List[str]:
+        """Ranked product IDs matching the query (best first)"""
+        tokens = list(dict.fromkeys(tokenize(query)))
+        if not tokens:
+            return []
+        with self._lock:
+            doc_count = len(self._doc_terms)
+            if not doc_count:
+                return []
+            avg_len = self._total_len / doc_count
+
+            # Per query token: best score among its alternatives (exact + prefix for the last one)
+            per_token = []
+            for position, token in enumerate(tokens):
+                alternatives = [token]
+                if position == len(tokens) - 1:
+                    alternatives += [term for term in self._expand_prefix(token) if term != token]
+                best: Dict[str, float] = {}
+                for term in alternatives:
+                    for product_id, score in self._score_term(term, doc_count, avg_len).items():
+                        if score > best.get(product_id, 0.0):
+                            best[product_id] = score
+                per_token.append(best)
+
+        matched_all = set(per_token[0])
+        for token_scores in per_token[1:]:
+            matched_all &= set(token_scores)
+        candidates = matched_all or set().union(*per_token)
+
+        totals = {
+            product_id: sum(token_scores.get(product_id, 0.0) for token_scores in per_token)
+            for product_id in candidates
+        }
+        ranked = sorted(totals.items(), key=lambda item: (-item[1], item[0]))
+        return [product_id for product_id, _ in ranked[:limit]]
+
+    def unmatched_terms(self, query: str) -> List[str]:
+        """Query terms with no exact match (the last term may also match as a prefix)"""
+        tokens = list(dict.fromkeys(tokenize(query)))
+        if not tokens:
+            return []
+        with self._lock:
+            unmatched = [token for token in tokens[:-1] if token not in self._postings]
+            last = tokens[-1]
+            if last not in self._postings and not self._expand_prefix(last, 1):
+                unmatched.append(last)
+        return unmatched
+
+    def is_empty(self) -> bool:
+        """Whether the index holds no documents (e.g. the last build failed)"""
+        return not self._doc_terms
+
+    def get_stats(self) -> dict:
+        """Index size counters"""
+        with self._lock:
+            return {
+                'documents': len(self._doc_terms),
+                'terms': len(self._postings),
+                'avg_doc_len': self._total_len / len(self._doc_terms) if self._doc_terms else 0.0
+            }
@@ -0,0 +1,234 @@
+"""Recommendation Index - Budget windows and need bitmaps for the sales chatbot"""
+import bisect
+import re
+from typing import Dict, List, Optional, Tuple
+from ...domain.entities import Product, Recommendation
+from ...domain.repositories import IRecommendationIndex
+from .catalog_index import CatalogIndex, iter_bits
+from .text import fold, tokenize
+
+SERIES_SCORES = {'S': 8, 'Z': 7, 'A': 5, 'O': 0}
+NEED_BONUS = {'game': 6, 'camera': 7, 'work': 7, 'budget': 8}
+
+
+def detect_series(name: str) -> str:
+    """Galaxy line of a product name: S, Z (foldables), A, or O (other)"""
+    text = fold(name)
+    if 'fold' in text or 'flip' in text or re.search(r'\bz\b', text):
+        return 'Z'
+    if re.search(r'\bs\d+', text) or 'galaxy s' in text:
+        return 'S'
+    if re.search(r'\ba\d+', text) or 'galaxy a' in text:
+        return 'A'
+    return 'O'
+
+
+def detect_tags(name: str) -> List[str]:
+    """Selling-point tags inferred from a product name"""
+    text = fold(name)
+    tags = []
+    if 'ultra' in text:
+        tags += ['camera', 'hieu nang']
+    if 'fold' in text:
+        tags += ['da nhiem', 'cao cap']
+    if 'flip' in text:
+        tags += ['thoi trang', 'nho gon']
+    if re.search(r'\ba\d+', text):
+        tags.append('gia re')
+    if re.search(r'\bs\d+', text):
+        tags += ['flagship', 'hieu nang']
+    return list(dict.fromkeys(tags))
+
+
+def _matches_need(need: str, series: str, tags: List[str]) -> bool:
+    """Whether a product suits a customer need (same rules the chatbot used client-side)"""
+    if need == 'game':
+        return 'hieu nang' in tags or series == 'S'
+    if need == 'camera':
+        return 'camera' in tags
+    if need == 'work':
+        return series == 'Z' or 'da nhiem' in tags
+    if need == 'budget':
+        return series == 'A'
+    return False
+
+
+class RecommendationIndex(CatalogIndex, IRecommendationIndex):
+    """
+    Catalog view tuned for chatbot questions.
+
+    - Budget: a sorted (price, doc) array, so a price window is two bisects
+    - Needs, series and stock: Python int bitmaps over dense doc numbers
+    - Model queries ("gia s25 ultra", "so sanh s24 va s25"): token bitmaps
+      over folded names, ignoring tokens that most products share
+    """
+
+    COMMON_TOKEN_RATIO = 0.5
+
+    def __init__(self):
+        super().__init__()
+        self._reset()
+
+    def _reset(self) -> None:
+        """Empty all structures (lock must be held or not yet shared)"""
+        self._docs: List[Recommendation] = []
+        self._product_doc: Dict[str, int] = {}
+        self._stock: Dict[str, int] = {}
+        self._live = 0
+        self._in_stock = 0
+        self._needs: Dict[str, int] = {need: 0 for need in NEED_BONUS}
+        self._series: Dict[str, int] = {series: 0 for series in SERIES_SCORES}
+        self._tokens: Dict[str, int] = {}
+        self._price_index: List[Tuple[float, int]] = []
+
+    # Building
+
+    def _add(self, product: Product) -> None:
+        """Append a document for the product (lock must be held)"""
+        product_id = str(product.id)
+        doc = len(self._docs)
+        bit = 1 << doc
+        series = detect_series(product.name)
+        tags = detect_tags(product.name)
+        stock = int(product.stock_quantity or 0)
+        self._docs.append(Recommendation(
+            id=product_id, name=product.name, price=float(product.price or 0),
+            series=series, tags=tags, in_stock=stock > 0
+        ))
+        self._product_doc[product_id] = doc
+        self._stock[product_id] = stock
+
+        self._live |= bit
+        if stock > 0:
+            self._in_stock |= bit
+        self._series[series] |= bit
+        for need in self._needs:
+            if _matches_need(need, series, tags):
+                self._needs[need] |= bit
+        for token in set(tokenize(product.name)):
+            self._tokens[token] = self._tokens.get(token, 0) | bit
+        bisect.insort(self._price_index, (self._docs[doc].price, doc))
+
+    def _remove(self, product_id: str) -> None:
+        """Clear the product's bit everywhere (lock must be held)"""
+        doc = self._product_doc.pop(product_id, None)
+        if doc is None:
+            return
+        self._stock.pop(product_id, None)
+        mask = ~(1 << doc)
+        self._live &= mask
+        self._in_stock &= mask
+        for bitmaps in (self._needs, self._series, self._tokens):
+            for key in bitmaps:
+                bitmaps[key] &= mask
+
+    def _load(self, products: List[Product]) -> None:
+        """Replace all bitmaps (lock is held)"""
+        self._reset()
+        for product in products:
+            if product.id is not None:
+                self._add(product)
+
+    def index_product(self, product: Product) -> None:
+        """Add or replace one product"""
+        if product.id is None:
+            return
+        with self._lock:
+            self._remove(str(product.id))
+            self._add(product)
+
+    def remove_product(self, product_id) -> None:
+        """Drop one product"""
+        with self._lock:
+            self._remove(str(product_id))
+
+    def stock_changed(self, deltas: Dict[str, int]) -> None:
+        """Apply stock deltas from orders/cancellations to the in-stock bitmap"""
+        with self._lock:
+            for product_id, delta in deltas.items():
+                product_id = str(product_id)
+                doc = self._product_doc.get(product_id)
+                if doc is None:
+                    continue
+                stock = self._stock[product_id] = self._stock[product_id] + delta
+                self._docs[doc].in_stock = stock > 0
+                if stock > 0:
+                    self._in_stock |= 1 << doc
+                else:
+                    self._in_stock &= ~(1 << doc)
+
+    # Querying
+
+    def _budget_bits(self, min_price: Optional[float], max_price: Optional[float]) -> int:
+        """Docs with min_price <= price <= max_price (lock must be held)"""
+        start = 0 if min_price is None else bisect.bisect_left(self._price_index, (min_price, -1))
+        end = len(self._price_index) if max_price is None else \
+            bisect.bisect_right(self._price_index, (max_price, float('inf')))
+        bits = 0
+        for _, doc in self._price_index[start:end]:
+            bits |= 1 << doc
+        return bits
+
+    def _match_query(self, query: str, candidates: int) -> Dict[int, float]:
+        """
+        Docs named in a free-text query, scored by distinctive tokens hit
+        ("s24 ultra" hits S24 Ultra twice and S24 once). Lock must be held.
+        """
+        live_count = self._live.bit_count() or 1
+        scores: Dict[int, float] = {}
+        for token in set(tokenize(query)):
+            bits = self._tokens.get(token, 0) & candidates
+            if not bits or (self._tokens[token] & self._live).bit_count() > live_count * self.COMMON_TOKEN_RATIO:
+                continue
+            for doc in iter_bits(bits):
+                scores[doc] = scores.get(doc, 0) + 1
+        return scores
+
+    def recommend(self, min_price: Optional[float] = None, max_price: Optional[float] = None,
+                  need: Optional[str] = None, series: Optional[str] = None,
+                  query: str = '', limit: int = 3) -> List[Recommendation]:
+        """Best products for a budget window, need and series, or matching a model query"""
+        with self._lock:
+            candidates = self._live
+            if min_price is not None or max_price is not None:
+                candidates &= self._budget_bits(min_price, max_price)
+            if series:
+                candidates &= self._series.get(series.upper(), 0)
+
+            if query:
+                scored = self._match_query(query, candidates)
+            else:
+                # Prefer what can actually be bought; fall back to the whole window
+                if candidates & self._in_stock:
+                    candidates &= self._in_stock
+                need_bits = self._needs.get(need, 0) if need else 0
+                scored = {
+                    doc: SERIES_SCORES[self._docs[doc].series] +
+                    (NEED_BONUS[need] if need_bits >> doc & 1 else 0)
+                    for doc in iter_bits(candidates)
+                }
+
+            if query:
+                # Same hit count: the shorter (base) model first
+                ranked = sorted(scored.items(), key=lambda item: (
+                    -item[1], len(self._docs[item[0]].name), self._docs[item[0]].price
+                ))
+            else:
+                ranked = sorted(scored.items(), key=lambda item: (-item[1], self._docs[item[0]].price))
+            picks = []
+            for doc, score in ranked[:limit]:
+                item = self._docs[doc]
+                picks.append(Recommendation(
+                    id=item.id, name=item.name, price=item.price, series=item.series,
+                    tags=list(item.tags), in_stock=item.in_stock, score=score
+                ))
+        return picks
+
+    def get_stats(self) -> dict:
+        """Index size counters"""
+        with self._lock:
+            return {
+                'products': len(self._product_doc),
+                'documents': len(self._docs),
+                'tokens': len(self._tokens)
+            }
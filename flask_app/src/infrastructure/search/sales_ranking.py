@@ -0,0 +1,169 @@
+"""Sales Ranking - Bestseller order computed from recent sales"""
+import bisect
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Set, Tuple
+from ...domain.entities import Product
+from ...domain.repositories import IOrderRepository, ISalesRanking
+from .catalog_index import CatalogIndex, id_order
+
+
+class SalesRanking(CatalogIndex, ISalesRanking):
+    """
+    Units sold per product over the last window_days, replacing the manual
+    bestSeller flag as the bestseller order (the flag only breaks ties).
+
+    Counters are loaded with one GROUP BY over order_items and then moved by
+    record_sales() as orders are placed and cancelled, so requests never
+    aggregate. The periodic rebuild re-reads the window, which drops sales
+    that aged out and corrects for status changes made elsewhere (admin
+    cancellations, edits in MySQL).
+
+    The ranked list is sorted once per rebuild and kept sorted afterwards:
+    an order only moves its own products, one bisect each. Every move is
+    also logged by version, so derived orders (the facet index's bestseller
+    listing) can follow with changes_since() instead of re-sorting.
+    """
+
+    MAX_LOG = 4096  # moves kept for changes_since(); older readers rebuild
+
+    def __init__(self, order_repository: IOrderRepository, window_days: int = 30):
+        super().__init__()
+        self.order_repository = order_repository
+        self.window_days = window_days
+        self._reset()
+
+    def _reset(self) -> None:
+        """Empty all structures (lock must be held or not yet shared)"""
+        self._products: Set[str] = set()
+        self._flags: Dict[str, int] = {}
+        self._units: Dict[str, int] = {}
+        self._ranked: List[tuple] = []                  # ascending (units, flag, id_order)
+        self._keys: Dict[str, tuple] = {}               # product id -> its entry in _ranked
+        self._version = 0
+        self._log: List[Tuple[int, str]] = []           # (version, product id) per move
+        self._log_start = 0                             # changes_since() is complete from here
+        self._pending: Optional[List[Dict[str, int]]] = None  # sales recorded while load() reads
+
+    def _window_start(self) -> datetime:
+        """Oldest order date still counted"""
+        return datetime.now() - timedelta(days=self.window_days)
+
+    def _key(self, product_id: str) -> tuple:
+        return (self._units.get(product_id, 0), self._flags.get(product_id, 0), id_order(product_id))
+
+    def _move(self, product_id: str) -> None:
+        """Re-place one product in the ranked list and log it (lock must be held)"""
+        old = self._keys.pop(product_id, None)
+        if old is not None:
+            del self._ranked[bisect.bisect_left(self._ranked, old)]
+        if product_id in self._products:
+            key = self._keys[product_id] = self._key(product_id)
+            bisect.insort(self._ranked, key)
+        self._version += 1
+        if len(self._log) >= self.MAX_LOG:
+            self._log, self._log_start = [], self._version - 1
+        self._log.append((self._version, product_id))
+
+    # Building
+
+    def _load(self, products: List[Product]) -> None:
+        """Replace the product set and re-sort with the current counters (lock is held)"""
+        self._products = {str(product.id) for product in products if product.id is not None}
+        self._flags = {str(product.id): int(product.bestSeller or 0)
+                       for product in products if product.id is not None}
+        self._keys = {product_id: self._key(product_id) for product_id in self._products}
+        self._ranked = sorted(self._keys.values())
+        self._version += 1
+        self._log, self._log_start = [], self._version
+
+    def load(self, products: List[Product]) -> None:
+        """
+        Replace the product set and reload the sales window (one GROUP BY).
+        Sales recorded while the query runs are replayed on the new counters.
+        """
+        with self._lock:
+            self._pending = []
+        try:
+            sales = self.order_repository.get_units_sold(self._window_start())
+            with self._lock:
+                self._units = {str(product_id): units for product_id, units in sales.items() if units > 0}
+                for deltas in self._pending:
+                    self._add_units(deltas, move=False)
+                self._load(products)
+        finally:
+            with self._lock:
+                self._pending = None
+
+    def index_product(self, product: Product) -> None:
+        """Add or replace one product"""
+        if product.id is None:
+            return
+        with self._lock:
+            self._products.add(str(product.id))
+            self._flags[str(product.id)] = int(product.bestSeller or 0)
+            self._move(str(product.id))
+
+    def remove_product(self, product_id) -> None:
+        """Drop one product"""
+        with self._lock:
+            product_id = str(product_id)
+            self._products.discard(product_id)
+            self._flags.pop(product_id, None)
+            self._units.pop(product_id, None)
+            self._move(product_id)
+
+    def record_sales(self, deltas: Dict[str, int], ordered_at: Optional[datetime] = None) -> None:
+        """Move the counters for an order placed at ordered_at (now if None)"""
+        if ordered_at is not None and ordered_at < self._window_start():
+            return  # Already outside the window, never counted
+        with self._lock:
+            if self._pending is not None:
+                self._pending.append(dict(deltas))
+            self._add_units(deltas)
+
+    def _add_units(self, deltas: Dict[str, int], move: bool = True) -> None:
+        """Move the counters and, unless a full sort follows, the products' places (lock must be held)"""
+        for product_id, delta in deltas.items():
+            product_id = str(product_id)
+            units = self._units.get(product_id, 0) + delta
+            if units > 0:
+                self._units[product_id] = units
+            else:
+                self._units.pop(product_id, None)
+            if move:
+                self._move(product_id)
+
+    # Querying
+
+    def top(self, limit: int) -> List[str]:
+        """IDs of the best-selling products: units sold, then the manual flag, then newest"""
+        if limit <= 0:
+            return []
+        with self._lock:
+            return [key[-1][1] for key in reversed(self._ranked[-limit:])]
+
+    def version(self) -> int:
+        """Counter moved by every change that can reorder the ranking"""
+        return self._version
+
+    def changes_since(self, version: int) -> Optional[Dict[str, int]]:
+        """Current units of the products moved after version; None if the log no longer reaches back"""
+        with self._lock:
+            if version < self._log_start or version > self._version:
+                return None
+            start = bisect.bisect_right(self._log, (version, '\U0010ffff'))
+            return {product_id: self._units.get(product_id, 0) for _, product_id in self._log[start:]}
+
+    def units_sold(self) -> Dict[str, int]:
+        """Snapshot of the window counters keyed by product ID"""
+        with self._lock:
+            return dict(self._units)
+
+    def get_stats(self) -> dict:
+        """Index size counters"""
+        with self._lock:
+            return {
+                'products': len(self._products),
+                'selling': len(self._units),
+                'window_days': self.window_days
+            }
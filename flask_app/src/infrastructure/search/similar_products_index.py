@@ -0,0 +1,187 @@
+"""Similar Products Index - Content-based neighbours from a NumPy feature matrix"""
+import zlib
+from typing import Dict, List
+import numpy as np
+from ...domain.entities import Product, PRICE_BANDS
+from ...domain.repositories import ISimilarProductsIndex
+from .catalog_index import CatalogIndex
+from .text import tokenize
+
+# Fixed feature layout so rows never need re-encoding when the catalog changes
+_CATEGORY_SLOTS = 64
+_NAME_SLOTS = 512
+_BAND_OFFSET = _CATEGORY_SLOTS
+_BESTSELLER_OFFSET = _BAND_OFFSET + len(PRICE_BANDS)
+_NAME_OFFSET = _BESTSELLER_OFFSET + 1
+_DIMENSIONS = _NAME_OFFSET + _NAME_SLOTS
+
+
+def _slot(value: str, slots: int) -> int:
+    """Stable hash bucket (crc32, unlike hash(), is the same in every process)"""
+    return zlib.crc32(value.encode('utf-8')) % slots
+
+
+class SimilarProductsIndex(CatalogIndex, ISimilarProductsIndex):
+    """
+    Top-k "similar products" per product, precomputed.
+
+    Each product is one float32 row: hashed category one-hot, price band
+    one-hot, bestseller flag and hashed name tokens, L2-normalised so a dot
+    product is cosine similarity. A full build scores every pair with one
+    matrix product and keeps the top k per row (argpartition).
+
+    index_product/remove_product touch one row, then rescore only the rows
+    whose neighbour lists could change: those that listed the product, and
+    those the product now beats.
+    """
+
+    SCORE_BATCH_ROWS = 512  # bounds the (batch x n) similarity block in memory
+    CATEGORY_WEIGHT = 1.0
+    PRICE_WEIGHT = 0.6
+    BESTSELLER_WEIGHT = 0.2
+    NAME_WEIGHT = 1.0
+
+    def __init__(self, k: int = 8):
+        super().__init__()
+        self.k = k
+        self._reset()
+
+    def _reset(self) -> None:
+        """Empty all structures (lock must be held or not yet shared)"""
+        self._matrix = np.zeros((0, _DIMENSIONS), dtype=np.float32)
+        self._alive = np.zeros(0, dtype=bool)
+        self._row_product: List[str] = []
+        self._product_row: Dict[str, int] = {}
+        self._neighbours: Dict[int, List[int]] = {}   # row -> neighbour rows, best first
+        self._floor = np.zeros(0, dtype=np.float32)   # row -> similarity of its k-th neighbour
+
+    # Features
+
+    def _features(self, product: Product) -> np.ndarray:
+        """Feature row of one product"""
+        row = np.zeros(_DIMENSIONS, dtype=np.float32)
+        if product.category_id:
+            row[_slot(str(product.category_id), _CATEGORY_SLOTS)] = self.CATEGORY_WEIGHT
+        price = float(product.price or 0)
+        for offset, band in enumerate(PRICE_BANDS):
+            if band.contains(price):
+                row[_BAND_OFFSET + offset] = self.PRICE_WEIGHT
+        if product.bestSeller:
+            row[_BESTSELLER_OFFSET] = self.BESTSELLER_WEIGHT
+
+        tokens = tokenize(product.name)
+        if tokens:
+            name = np.zeros(_NAME_SLOTS, dtype=np.float32)
+            for token in tokens:
+                name[_slot(token, _NAME_SLOTS)] += 1.0
+            name *= self.NAME_WEIGHT / np.linalg.norm(name)
+            row[_NAME_OFFSET:] = name
+
+        norm = np.linalg.norm(row)
+        return row / norm if norm else row
+
+    # Scoring
+
+    def _top_k(self, rows: np.ndarray) -> None:
+        """Recompute neighbour lists of `rows`, one matrix product per batch (lock must be held)"""
+        rows = rows[self._alive[rows]]
+        k = min(self.k, int(self._alive.sum()) - 1)
+        for start in range(0, len(rows), self.SCORE_BATCH_ROWS):
+            batch = rows[start:start + self.SCORE_BATCH_ROWS]
+            scores = self._matrix[batch] @ self._matrix.T
+            scores[:, ~self._alive] = -np.inf
+            scores[np.arange(len(batch)), batch] = -np.inf
+            for i, row in enumerate(batch):
+                row = int(row)
+                if k <= 0:
+                    self._neighbours[row], self._floor[row] = [], 0.0
+                    continue
+                candidates = np.argpartition(-scores[i], k - 1)[:k]
+                ordered = candidates[np.argsort(-scores[i][candidates], kind='stable')]
+                ordered = [int(c) for c in ordered if scores[i][c] > 0]
+                self._neighbours[row] = ordered
+                # A list with free slots accepts any positive match
+                self._floor[row] = scores[i][ordered[-1]] if len(ordered) >= self.k else 0.0
+
+    def _affected_rows(self, row: int, listed_by: set) -> np.ndarray:
+        """Rows whose top-k may change after `row` changed (lock must be held)"""
+        affected = set(listed_by)
+        if self._alive[row]:
+            similarities = self._matrix @ self._matrix[row]
+            beaten = self._alive & (similarities > self._floor)
+            affected.update(int(other) for other in np.nonzero(beaten)[0])
+            affected.add(row)
+        return np.array(sorted(affected), dtype=np.int64)
+
+    # Building
+
+    def _load(self, products: List[Product]) -> None:
+        """Build every row and score all pairs in one pass (lock is held)"""
+        self._reset()
+        products = [product for product in products if product.id is not None]
+        if not products:
+            return
+        self._matrix = np.vstack([self._features(product) for product in products])
+        self._alive = np.ones(len(products), dtype=bool)
+        self._floor = np.zeros(len(products), dtype=np.float32)
+        self._row_product = [str(product.id) for product in products]
+        self._product_row = {product_id: row for row, product_id in enumerate(self._row_product)}
+        self._top_k(np.arange(len(products)))
+
+    def _listing(self, row: int) -> set:
+        """Rows that currently list `row` as a neighbour (lock must be held)"""
+        return {other for other, neighbours in self._neighbours.items() if row in neighbours}
+
+    def index_product(self, product: Product) -> None:
+        """Add or replace one product and refresh only the affected neighbour lists"""
+        if product.id is None:
+            return
+        features = self._features(product)
+        with self._lock:
+            product_id = str(product.id)
+            row = self._product_row.get(product_id)
+            if row is None:
+                row = len(self._row_product)
+                self._matrix = np.vstack([self._matrix, features])
+                self._alive = np.append(self._alive, True)
+                self._floor = np.append(self._floor, np.float32(0.0))
+                self._row_product.append(product_id)
+                self._product_row[product_id] = row
+                listed_by = set()
+            else:
+                self._matrix[row] = features
+                self._alive[row] = True
+                listed_by = self._listing(row)
+            self._top_k(self._affected_rows(row, listed_by))
+
+    def remove_product(self, product_id) -> None:
+        """Drop one product and refill the lists that contained it"""
+        with self._lock:
+            row = self._product_row.pop(str(product_id), None)
+            if row is None:
+                return
+            self._alive[row] = False
+            self._matrix[row] = 0
+            self._neighbours.pop(row, None)
+            self._floor[row] = 0.0
+            self._top_k(np.array(sorted(self._listing(row)), dtype=np.int64))
+
+    # Querying
+
+    def similar_to(self, product_id, limit: int = 4) -> List[str]:
+        """IDs of the most similar products, best first"""
+        with self._lock:
+            row = self._product_row.get(str(product_id))
+            if row is None:
+                return []
+            return [self._row_product[other] for other in self._neighbours.get(row, [])[:limit]]
+
+    def get_stats(self) -> dict:
+        """Index size counters"""
+        with self._lock:
+            return {
+                'products': len(self._product_row),
+                'rows': len(self._row_product),
+                'dimensions': _DIMENSIONS,
+                'k': self.k
+            }
@@ -0,0 +1,175 @@
+"""Suggestion Index - Sorted-array prefix index for search-as-you-type"""
+import bisect
+import heapq
+from typing import Dict, List, Optional, Tuple
+from ...domain.entities import Product, Suggestion
+from ...domain.repositories import ISuggestionIndex
+from .catalog_index import CatalogIndex
+from .text import tokenize
+
+
+class PrefixSuggestionIndex(CatalogIndex, ISuggestionIndex):
+    """
+    Autocomplete over product and category names.
+
+    Every name is stored once per word boundary in a sorted array of folded
+    keys ("samsung galaxy s24", "galaxy s24", "s24"), so a prefix lookup is a
+    bisect to the range of keys starting with it. Categories rank first, then
+    products whose name starts with the prefix, then bestsellers, then
+    shorter names.
+
+    The whole range is ranked, so short prefixes never lose their best
+    entries to a scan cut-off. Each prefix's top entries are kept until the
+    next change, since short prefixes (the widest ranges) are also the most
+    typed.
+    """
+
+    MAX_CACHED_PREFIXES = 2048
+
+    def __init__(self):
+        super().__init__()
+        self._keys: List[str] = []                      # sorted folded keys
+        self._refs: List[Tuple[str, object]] = []       # parallel (kind, id)
+        self._products: Dict[str, Tuple[str, str, int, int]] = {}  # id -> (name, folded, bestSeller, category_id)
+        self._categories: Dict[int, str] = {}            # id -> name
+        self._category_sizes: Dict[int, int] = {}        # id -> number of indexed products
+        self._pending: Optional[List[Tuple[str, Tuple[str, object]]]] = None  # collected during _load
+        self._top: Dict[Tuple[str, int], List[Suggestion]] = {}  # (prefix, limit) -> best entries
+
+    # Building
+
+    @staticmethod
+    def _boundary_keys(name: str) -> List[str]:
+        """Folded name from each word onwards"""
+        tokens = tokenize(name)
+        return [' '.join(tokens[i:]) for i in range(len(tokens))]
+
+    def _insert_keys(self, name: str, ref: Tuple[str, object]) -> None:
+        """Insert every boundary key of a name (lock must be held)"""
+        for key in self._boundary_keys(name):
+            if self._pending is not None:
+                self._pending.append((key, ref))
+                continue
+            index = bisect.bisect_right(self._keys, key)
+            self._keys.insert(index, key)
+            self._refs.insert(index, ref)
+
+    def _delete_keys(self, name: str, ref: Tuple[str, object]) -> None:
+        """Delete every boundary key of a name (lock must be held)"""
+        for key in self._boundary_keys(name):
+            index = bisect.bisect_left(self._keys, key)
+            while index < len(self._keys) and self._keys[index] == key:
+                if self._refs[index] == ref:
+                    del self._keys[index]
+                    del self._refs[index]
+                    break
+                index += 1
+
+    def _add(self, product: Product) -> None:
+        """Add a product and, if new, its category (lock must be held)"""
+        product_id = str(product.id)
+        self._products[product_id] = (
+            product.name, ' '.join(tokenize(product.name)),
+            int(product.bestSeller or 0), product.category_id
+        )
+        self._insert_keys(product.name, ('product', product_id))
+
+        category_id = product.category_id
+        if category_id and product.category_name:
+            current = self._categories.get(category_id)
+            if current != product.category_name:
+                if current is not None:
+                    self._delete_keys(current, ('category', category_id))
+                self._categories[category_id] = product.category_name
+                self._insert_keys(product.category_name, ('category', category_id))
+            self._category_sizes[category_id] = self._category_sizes.get(category_id, 0) + 1
+
+    def _remove(self, product_id: str) -> None:
+        """Remove a product; drop its category once no product refers to it (lock must be held)"""
+        entry = self._products.pop(product_id, None)
+        if entry is None:
+            return
+        name, _, _, category_id = entry
+        self._delete_keys(name, ('product', product_id))
+
+        if category_id in self._category_sizes:
+            self._category_sizes[category_id] -= 1
+            if self._category_sizes[category_id] <= 0:
+                del self._category_sizes[category_id]
+                self._delete_keys(self._categories.pop(category_id), ('category', category_id))
+
+    def _load(self, products: List[Product]) -> None:
+        """Replace all entries (lock is held)"""
+        self._keys, self._refs = [], []
+        self._products, self._categories, self._category_sizes = {}, {}, {}
+        self._top = {}
+        # Collect then sort once instead of n inserts into the middle of a list
+        self._pending = []
+        try:
+            for product in products:
+                if product.id is not None:
+                    self._add(product)
+            self._pending.sort()
+            self._keys = [key for key, _ in self._pending]
+            self._refs = [ref for _, ref in self._pending]
+        finally:
+            self._pending = None
+
+    def index_product(self, product: Product) -> None:
+        """Add or replace one product"""
+        if product.id is None:
+            return
+        with self._lock:
+            self._remove(str(product.id))
+            self._add(product)
+            self._top = {}
+
+    def remove_product(self, product_id) -> None:
+        """Drop one product"""
+        with self._lock:
+            self._remove(str(product_id))
+            self._top = {}
+
+    # Querying
+
+    def suggest(self, prefix: str, limit: int = 8) -> List[Suggestion]:
+        """Best products/categories whose name (or a word in it) starts with prefix"""
+        query = ' '.join(tokenize(prefix))
+        if not query or limit <= 0:
+            return []
+        with self._lock:
+            cached = self._top.get((query, limit))
+            if cached is not None:
+                return list(cached)
+            start = bisect.bisect_left(self._keys, query)
+            end = bisect.bisect_left(self._keys, query + '\U0010ffff', start)
+            ranked = {}
+            for index in range(start, end):
+                key = self._keys[index]
+                kind, target_id = self._refs[index]
+                if kind == 'category':
+                    name = self._categories[target_id]
+                    rank = (0, 0, 0, len(name))
+                else:
+                    name, folded, best_seller, _ = self._products[target_id]
+                    rank = (1, 0 if key == folded else 1, -best_seller, len(name))
+                ref = (kind, target_id)
+                if ref not in ranked or rank < ranked[ref][0]:
+                    ranked[ref] = (rank, name)
+
+            best = heapq.nsmallest(limit, ranked.items(), key=lambda item: item[1][0])
+            suggestions = [Suggestion(text=name, kind=kind, target_id=str(target_id))
+                           for (kind, target_id), (_, name) in best]
+            if len(self._top) >= self.MAX_CACHED_PREFIXES:
+                self._top = {}
+            self._top[(query, limit)] = suggestions
+        return list(suggestions)
+
+    def get_stats(self) -> dict:
+        """Index size counters"""
+        with self._lock:
+            return {
+                'keys': len(self._keys),
+                'products': len(self._products),
+                'categories': len(self._categories)
+            }
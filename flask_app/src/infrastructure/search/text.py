@@ -0,0 +1,27 @@
+"""Text Normalization - Case and Vietnamese diacritic folding for search"""
+import re
+import unicodedata
+from typing import List
+
+_TOKEN_RE = re.compile(r'[a-z0-9]+')
+# đ/Đ are separate letters, not d + combining mark, so NFD does not split them
+_SPECIAL_FOLDS = str.maketrans({'đ': 'd', 'Đ': 'd'})
+
+
+def fold(text: str) -> str:
+    """Lowercase and strip diacritics: 'Điện Thoại' -> 'dien thoai'"""
+    if not text:
+        return ''
+    text = str(text).translate(_SPECIAL_FOLDS).lower()
+    decomposed = unicodedata.normalize('NFD', text)
+    return ''.join(ch for ch in decomposed if not unicodedata.combining(ch))
+
+
+def tokenize(text: str) -> List[str]:
+    """Fold then split into alphanumeric tokens"""
+    return _TOKEN_RE.findall(fold(text))
+
+
+def normalize_query(text: str) -> str:
+    """Canonical form of a query: folded tokens joined by single spaces"""
+    return ' '.join(tokenize(text))
@@ -0,0 +1,149 @@
+"""Trigram Index - Typo-tolerant matching of product names"""
+from array import array
+from collections import Counter
+from typing import Dict, List, Optional
+from ...domain.entities import Product
+from ...domain.repositories import IFuzzyProductIndex
+from .catalog_index import CatalogIndex, id_order
+from .text import tokenize
+
+
+def _compact(text: str) -> str:
+    """Folded text without separators, so "z fold" and "zfold" look alike"""
+    return ''.join(tokenize(text))
+
+
+def _trigrams(text: str) -> set:
+    """Distinct character trigrams of a compact string"""
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def substring_edit_distance(pattern: str, text: str) -> int:
+    """
+    Smallest edit distance between pattern and any substring of text
+    (Sellers' algorithm: the match may start and end anywhere in text)
+    """
+    if not pattern:
+        return 0
+    previous = list(range(len(pattern) + 1))
+    best = previous[-1]
+    for char in text:
+        current = [0]
+        for j, pattern_char in enumerate(pattern, 1):
+            cost = 0 if pattern_char == char else 1
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost))
+        best = min(best, current[-1])
+        previous = current
+    return best
+
+
+class TrigramProductIndex(CatalogIndex, IFuzzyProductIndex):
+    """
+    Fuzzy name search for queries like "s24 ulta", "zfold" or "galaxi a35".
+
+    - Names are folded and compacted ("Galaxy Z Fold5" -> "galaxyzfold5")
+      and split into character trigrams
+    - Trigrams are integer-coded and postings are array('I') of dense
+      document numbers, appended in increasing order so they stay sorted
+    - Candidates need at least `threshold` of the query's trigrams; the best
+      `rerank_limit` are re-ranked by substring edit distance
+    - Removed products are tombstoned; the periodic rebuild compacts them
+    """
+
+    MAX_QUERY_LENGTH = 32
+
+    def __init__(self, threshold: float = 0.4, rerank_limit: int = 40):
+        super().__init__()
+        self.threshold = threshold
+        self.rerank_limit = rerank_limit
+        self._gram_codes: Dict[str, int] = {}
+        self._postings: List[array] = []             # code -> sorted doc numbers
+        self._doc_product: List[str] = []             # doc -> product id
+        self._doc_text: List[Optional[str]] = []     # doc -> compact name (None = removed)
+        self._product_doc: Dict[str, int] = {}       # product id -> live doc
+
+    # Building
+
+    def _add(self, product: Product) -> None:
+        """Append a new document for the product (lock must be held)"""
+        product_id = str(product.id)
+        text = _compact(product.name)
+        doc = len(self._doc_text)
+        self._doc_product.append(product_id)
+        self._doc_text.append(text)
+        self._product_doc[product_id] = doc
+        for gram in _trigrams(text):
+            code = self._gram_codes.get(gram)
+            if code is None:
+                code = self._gram_codes[gram] = len(self._postings)
+                self._postings.append(array('I'))
+            self._postings[code].append(doc)
+
+    def _remove(self, product_id: str) -> None:
+        """Tombstone the product's document (lock must be held)"""
+        doc = self._product_doc.pop(product_id, None)
+        if doc is not None:
+            self._doc_text[doc] = None
+
+    def _load(self, products: List[Product]) -> None:
+        """Replace all postings (lock is held)"""
+        self._gram_codes, self._postings = {}, []
+        self._doc_product, self._doc_text, self._product_doc = [], [], {}
+        for product in products:
+            if product.id is not None:
+                self._add(product)
+
+    def index_product(self, product: Product) -> None:
+        """Add or replace one product"""
+        if product.id is None:
+            return
+        with self._lock:
+            self._remove(str(product.id))
+            self._add(product)
+
+    def remove_product(self, product_id) -> None:
+        """Drop one product"""
+        with self._lock:
+            self._remove(str(product_id))
+
+    # Querying
+
+    def search(self, query: str, limit: int = 50) -> List[str]:
+        """Product IDs whose name approximately contains the query, closest first"""
+        pattern = _compact(query)[:self.MAX_QUERY_LENGTH]
+        grams = _trigrams(pattern)
+        if not grams:
+            return []
+        with self._lock:
+            counts = Counter()
+            for gram in grams:
+                code = self._gram_codes.get(gram)
+                if code is not None:
+                    counts.update(self._postings[code])
+
+            needed = max(1, int(len(grams) * self.threshold + 0.999))
+            candidates = [
+                (shared, doc) for doc, shared in counts.most_common()
+                if shared >= needed and self._doc_text[doc] is not None
+            ][:self.rerank_limit]
+            scored = [
+                (substring_edit_distance(pattern, self._doc_text[doc]), -shared,
+                 len(self._doc_text[doc]), id_order(self._doc_product[doc]))
+                for shared, doc in candidates
+            ]
+
+        # Allow roughly one edit per three query characters
+        max_distance = max(1, len(pattern) // 3)
+        scored.sort()
+        return [product_id for distance, _, _, (_, product_id) in scored
+                if distance <= max_distance][:limit]
+
+    def get_stats(self) -> dict:
+        """Index size counters"""
+        with self._lock:
+            return {
+                'trigrams': len(self._postings),
+                'documents': len(self._product_doc),
+                'tombstones': len(self._doc_text) - len(self._product_doc),
+                'postings': sum(len(postings) for postings in self._postings)
+            }
@@ -1,13 +1,16 @@
 """Order Controller - Handles order-related routes"""
+from datetime import date
 from flask import render_template, request, redirect, url_for, session, flash
 from ...application.use_cases import (
     CreateOrderUseCase,
     GetUserOrdersUseCase,
     GetOrderByIdUseCase,
     GetAllOrdersUseCase,
-    UpdateOrderStatusUseCase
+    UpdateOrderStatusUseCase,
+    GetProductsByIdsUseCase,
+    GetBoughtTogetherUseCase
 )
-from ...domain.entities import Order, OrderItem, OrderStatus
+from ...domain.entities import Order, OrderItem, OrderStatus, OrderFilter, OrderSort
 
 
 class OrderController:
@@ -17,12 +20,16 @@ class OrderController:
                  get_user_orders_use_case: GetUserOrdersUseCase,
                  get_by_id_use_case: GetOrderByIdUseCase,
                  get_all_use_case: GetAllOrdersUseCase,
-                 update_status_use_case: UpdateOrderStatusUseCase):
+                 update_status_use_case: UpdateOrderStatusUseCase,
+                 get_products_by_ids_use_case: GetProductsByIdsUseCase,
+                 bought_together_use_case: GetBoughtTogetherUseCase = None):
         self.create_use_case = create_use_case
         self.get_user_orders_use_case = get_user_orders_use_case
         self.get_by_id_use_case = get_by_id_use_case
         self.get_all_use_case = get_all_use_case
         self.update_status_use_case = update_status_use_case
+        self.get_products_by_ids_use_case = get_products_by_ids_use_case
+        self.bought_together_use_case = bought_together_use_case
 
     def _is_admin_user(self) -> bool:
         """Check if current session belongs to an admin account."""
@@ -34,16 +41,14 @@ class OrderController:
         return redirect(url_for('admin_orders'))
     
     def _get_cart_with_details(self):
-        """Get cart with product details"""
-        from ...application.use_cases import GetProductByIdUseCase
-        from src.container import container
-        
+        """Get cart with product details (all lines resolved in one query)"""
         cart = session.get('cart', {})
         cart_items = []
         total = 0
         
+        products = self.get_products_by_ids_use_case.execute([int(pid) for pid in cart])
         for product_id, item in cart.items():
-            product = container.get_product_by_id_use_case.execute(int(product_id))
+            product = products.get(str(product_id))
             if product:
                 cart_item = {
                     'id': product.id,
@@ -64,7 +69,10 @@ class OrderController:
             return self._block_admin_purchase()
 
         cart_items, total = self._get_cart_with_details()
-        return render_template('cart.html', cart=cart_items, total=total)
+        bought_together = []
+        if cart_items and self.bought_together_use_case:
+            bought_together = self.bought_together_use_case.execute([item['id'] for item in cart_items])
+        return render_template('cart.html', cart=cart_items, total=total, bought_together=bought_together)
     
     def add_to_cart(self, product_id):
         """Add product to cart"""
@@ -215,8 +223,10 @@ class OrderController:
             return redirect(url_for('login'))
         
         user_id = session['user_id']
-        orders = self.get_user_orders_use_case.execute(user_id)
-        return render_template('order_history.html', orders=orders)
+        page = self.get_user_orders_use_case.execute_page(
+            user_id, request.args.get('cursor'), request.args.get('page_size', 20, type=int)
+        )
+        return render_template('order_history.html', orders=page.items, page=page)
     
     def order_detail(self, order_id):
         """Show order detail"""
@@ -242,8 +252,33 @@ class OrderController:
             flash('Bạn không có quyền truy cập', 'danger')
             return redirect(url_for('index'))
         
-        orders = self.get_all_use_case.execute()
-        return render_template('admin_orders.html', orders=orders)
+        filters = self._order_filter_args()
+        sort = request.args.get('sort', OrderSort.NEWEST.value)
+        # Page + its items + status counts: three queries whatever the table size
+        page, status_counts = self.get_all_use_case.execute_page(
+            filters, sort, request.args.get('cursor'), request.args.get('page_size', 25, type=int)
+        )
+        return render_template('admin_orders.html', orders=page.items, page=page,
+                               filters=filters, filter_args=filters.to_query_args(),
+                               tab_args={k: v for k, v in filters.to_query_args().items() if k != 'status'},
+                               sort=OrderSort.from_string(sort).value, sort_options=list(OrderSort),
+                               statuses=list(OrderStatus), status_counts=status_counts)
+    
+    def _order_filter_args(self) -> OrderFilter:
+        """Read admin order filters from the query string; invalid values are ignored"""
+        def parse_date(name):
+            try:
+                return date.fromisoformat(request.args.get(name, ''))
+            except ValueError:
+                return None
+        
+        status = request.args.get('status', '')
+        return OrderFilter(
+            status=status if status in {s.value for s in OrderStatus} else None,
+            date_from=parse_date('date_from'),
+            date_to=parse_date('date_to'),
+            keyword=request.args.get('q', '').strip()[:100]
+        )
     
     def admin_order_detail(self, order_id):
         """Admin: Show order detail"""
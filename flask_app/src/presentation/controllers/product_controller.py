@@ -2,18 +2,24 @@
 import os
 import uuid
 from urllib.parse import urlparse, parse_qs, unquote
-from flask import render_template, request, redirect, url_for, session, flash
+from flask import render_template, request, redirect, url_for, session, flash, jsonify
 from werkzeug.utils import secure_filename
 from ...application.use_cases import (
     GetAllProductsUseCase,
+    FilterProductsUseCase,
     GetProductByIdUseCase,
+    GetSimilarProductsUseCase,
+    GetBoughtTogetherUseCase,
     GetProductsByCategoryUseCase,
     SearchProductsUseCase,
+    SuggestProductsUseCase,
+    RecommendProductsUseCase,
     CreateProductUseCase,
     UpdateProductUseCase,
-    DeleteProductUseCase
+    DeleteProductUseCase,
+    BulkUpdateProductsUseCase
 )
-from ...domain.entities import Product
+from ...domain.entities import Product, ProductSort, ProductFilter, PRICE_BANDS
 
 
 class ProductController:
@@ -28,7 +34,13 @@ class ProductController:
                  create_use_case: CreateProductUseCase,
                  update_use_case: UpdateProductUseCase,
                  delete_use_case: DeleteProductUseCase,
-                 get_all_categories_use_case):
+                 get_all_categories_use_case,
+                 suggest_use_case: SuggestProductsUseCase = None,
+                 filter_use_case: FilterProductsUseCase = None,
+                 recommend_use_case: RecommendProductsUseCase = None,
+                 similar_use_case: GetSimilarProductsUseCase = None,
+                 bought_together_use_case: GetBoughtTogetherUseCase = None,
+                 bulk_update_use_case: BulkUpdateProductsUseCase = None):
         self.get_all_use_case = get_all_use_case
         self.get_by_id_use_case = get_by_id_use_case
         self.get_by_category_use_case = get_by_category_use_case
@@ -37,6 +49,12 @@ class ProductController:
         self.update_use_case = update_use_case
         self.delete_use_case = delete_use_case
         self.get_all_categories_use_case = get_all_categories_use_case
+        self.suggest_use_case = suggest_use_case
+        self.filter_use_case = filter_use_case
+        self.recommend_use_case = recommend_use_case
+        self.similar_use_case = similar_use_case
+        self.bought_together_use_case = bought_together_use_case
+        self.bulk_update_use_case = bulk_update_use_case
 
     def _save_uploaded_image(self, image_file):
         """Save uploaded image to static/images and return stored filename"""
@@ -78,10 +96,40 @@ class ProductController:
 
         return image_text
     
+    def _page_args(self):
+        """Read sort/cursor/page-size query parameters"""
+        sort = ProductSort.from_string(request.args.get('sort', '')).value
+        cursor = request.args.get('cursor') or None
+        page_size = request.args.get('per_page', type=int) or 0
+        return sort, cursor, page_size
+    
+    def _filter_args(self) -> ProductFilter:
+        """Read facet filters from query parameters"""
+        return ProductFilter(
+            category_id=request.args.get('category', type=int),
+            price_band=request.args.get('price') or None,
+            min_price=request.args.get('min_price', type=float),
+            max_price=request.args.get('max_price', type=float),
+            in_stock=request.args.get('in_stock') == '1',
+            bestseller=request.args.get('bestseller') == '1'
+        )
+    
     def list_products(self):
-        """Show all products"""
-        products = self.get_all_use_case.execute()
-        return render_template('products.html', products=products)
+        """Show all products (keyset paginated, with facet filters and counts)"""
+        sort, cursor, page_size = self._page_args()
+        filters = self._filter_args()
+        result = None
+        if self.filter_use_case:
+            result = self.filter_use_case.execute(filters, sort, cursor, page_size)
+        if result is None:
+            # Facet index unavailable: plain listing without filters
+            page, facets, filters = self.get_all_use_case.execute_page(sort, cursor, page_size), None, ProductFilter()
+        else:
+            page, facets = result
+        return render_template('products.html', products=page.items, page=page,
+                               sort=sort, sort_options=list(ProductSort),
+                               filters=filters, facets=facets, price_bands=PRICE_BANDS,
+                               filter_args=filters.to_query_args())
     
     def show_product_detail(self, product_id):
         """Show product detail"""
@@ -90,12 +138,18 @@ class ProductController:
             flash('Sản phẩm không tồn tại', 'danger')
             return redirect(url_for('products'))
         
-        return render_template('product_detail.html', product=product)
+        related_products = self.similar_use_case.execute(product.id) if self.similar_use_case else []
+        bought_together = self.bought_together_use_case.execute([product.id]) \
+            if self.bought_together_use_case else []
+        return render_template('product_detail.html', product=product, related_products=related_products,
+                               bought_together=bought_together)
     
     def products_by_category(self, category_id):
         """Show products by category"""
-        products = self.get_by_category_use_case.execute(category_id)
-        return render_template('products.html', products=products, category_id=category_id)
+        sort, cursor, page_size = self._page_args()
+        page = self.get_by_category_use_case.execute_page(category_id, sort, cursor, page_size)
+        return render_template('products.html', products=page.items, page=page,
+                               sort=sort, sort_options=list(ProductSort), category_id=category_id)
     
     def search_products(self):
         """Search products"""
@@ -103,15 +157,114 @@ class ProductController:
         products = self.search_use_case.execute(keyword)
         return render_template('products.html', products=products, keyword=keyword)
     
+    def suggest_products(self):
+        """API: search-as-you-type suggestions as JSON"""
+        keyword = request.args.get('q', '')
+        limit = request.args.get('limit', 8, type=int)
+        suggestions = self.suggest_use_case.execute(keyword, limit) if self.suggest_use_case else []
+        
+        results = []
+        for suggestion in suggestions:
+            item = suggestion.to_dict()
+            if suggestion.kind == 'category':
+                item['url'] = url_for('products_by_category', category_id=suggestion.target_id)
+            else:
+                item['url'] = url_for('product_detail', product_id=suggestion.target_id)
+            results.append(item)
+        return jsonify({'query': keyword, 'suggestions': results})
+    
+    def recommend_products(self):
+        """API: chatbot recommendations by budget/need/series, or by model name (q)"""
+        picks = []
+        if self.recommend_use_case:
+            picks = self.recommend_use_case.execute(
+                min_price=request.args.get('budget_min', type=float),
+                max_price=request.args.get('budget_max', type=float),
+                need=request.args.get('need') or None,
+                series=request.args.get('series') or None,
+                query=request.args.get('q', ''),
+                limit=request.args.get('limit', 3, type=int)
+            )
+        
+        products = []
+        for pick in picks:
+            item = pick.to_dict()
+            item['url'] = url_for('product_detail', product_id=pick.id)
+            products.append(item)
+        return jsonify({'products': products})
+    
     # Admin operations
+    def _admin_grid_args(self):
+        """Read the admin grid query: sort/cursor/page size plus column search"""
+        sort, cursor, page_size = self._page_args()
+        category_id = request.args.get('category', type=int)
+        name_query = request.args.get('q', '').strip()
+        return sort, cursor, page_size or 50, category_id, name_query
+    
+    def _image_src(self, image_value) -> str:
+        """Image URL for JSON rows (same rules as the resolve_image_src template helper)"""
+        image_text = self._normalize_image_url(str(image_value or ''))
+        if not image_text:
+            return 'https://via.placeholder.com/300x200?text=No+Image'
+        if image_text.lower().startswith(('http://', 'https://')):
+            return image_text
+        return url_for('static', filename='images/' + image_text.lstrip('/'))
+    
     def admin_list_products(self):
-        """Admin: List all products"""
+        """Admin: List all products (first page rendered; the grid script fetches the rest)"""
         if session.get('user_role') != 'admin':
             flash('Bạn không có quyền truy cập', 'danger')
             return redirect(url_for('index'))
         
-        products = self.get_all_use_case.execute()
-        return render_template('admin_products.html', products=products)
+        sort, cursor, page_size, category_id, name_query = self._admin_grid_args()
+        page = self.get_all_use_case.execute_page(sort, cursor, page_size, category_id, name_query)
+        return render_template('admin_products.html', products=page.items, page=page, sort=sort,
+                               category_id=category_id, name_query=name_query,
+                               sort_options=[(option.value, option.get_display_name()) for option in ProductSort])
+    
+    def admin_products_data(self):
+        """Admin API: one page of the product grid as lean JSON rows"""
+        if session.get('user_role') != 'admin':
+            return jsonify({'error': 'Bạn không có quyền truy cập'}), 403
+        
+        sort, cursor, page_size, category_id, name_query = self._admin_grid_args()
+        page = self.get_all_use_case.execute_page(sort, cursor, page_size, category_id, name_query)
+        rows = []
+        for product in page.items:
+            rows.append({
+                'id': product.id,
+                'name': product.name,
+                'price': product.price,
+                'category_id': product.category_id,
+                'category_name': product.category_name,
+                'stock_quantity': product.stock_quantity,
+                'bestSeller': product.bestSeller,
+                'release_year': product.release_year,
+                'image_src': self._image_src(product.image_url),
+                'view_url': url_for('product_detail', product_id=product.id),
+                'edit_url': url_for('admin_edit_product', product_id=product.id)
+            })
+        return jsonify({
+            'products': rows,
+            'sort': sort,
+            'page_size': page.page_size,
+            'next_cursor': page.next_cursor,
+            'has_more': page.has_more
+        })
+    
+    def admin_bulk_products(self):
+        """Admin API: apply one bulk action (delete, set_stock, set_bestseller) to the selected rows"""
+        if session.get('user_role') != 'admin':
+            return jsonify({'success': False, 'message': 'Bạn không có quyền truy cập'}), 403
+        if not self.bulk_update_use_case:
+            return jsonify({'success': False, 'message': 'Chức năng chưa được hỗ trợ'}), 404
+        
+        payload = request.get_json(silent=True) or {}
+        ids = payload.get('ids')
+        success, message, result = self.bulk_update_use_case.execute(
+            payload.get('action', ''), ids if isinstance(ids, list) else [], payload.get('value')
+        )
+        return jsonify({'success': success, 'message': message, **result}), (200 if success else 400)
     
     def admin_show_add_product(self):
         """Admin: Show add product form"""
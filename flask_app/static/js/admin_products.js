@@ -0,0 +1,249 @@
+// ===== ADMIN PRODUCT GRID - SERVER-SIDE PAGING, SEARCH AND BULK ACTIONS =====
+// The first page is rendered by the server; later pages come from the JSON
+// endpoint one page at a time, so the browser never holds the whole catalog.
+
+document.addEventListener('DOMContentLoaded', function() {
+    const table = document.getElementById('productGrid');
+    if (!table) return;
+
+    const body = document.getElementById('productGridBody');
+    const filters = document.getElementById('productGridFilters');
+    const searchInput = document.getElementById('gridSearch');
+    const selectAll = document.getElementById('gridSelectAll');
+    const bulkBar = document.getElementById('bulkBar');
+    const bulkCount = document.getElementById('bulkCount');
+    const firstButton = document.getElementById('gridFirst');
+    const prevButton = document.getElementById('gridPrev');
+    const nextButton = document.getElementById('gridNext');
+    const rowCount = document.getElementById('gridRowCount');
+
+    const CATEGORY_BADGES = {
+        1: ['category-s', 'S-Series'],
+        2: ['category-a', 'A-Series'],
+        3: ['category-m', 'M-Series'],
+        4: ['category-z', 'Z-Series']
+    };
+
+    // Cursors of the pages before the current one, for "Trang trước"
+    const previousCursors = [];
+    let currentCursor = table.dataset.cursor || '';
+    let nextCursor = table.dataset.nextCursor || '';
+    let loadSeq = 0;
+    let searchTimer;
+
+    function query(cursor) {
+        const params = new URLSearchParams(new FormData(filters));
+        for (const [key, value] of [...params.entries()]) {
+            if (!value) params.delete(key);
+        }
+        if (cursor) params.set('cursor', cursor);
+        return params;
+    }
+
+    function element(tag, className, text) {
+        const node = document.createElement(tag);
+        if (className) node.className = className;
+        if (text !== undefined) node.textContent = text;
+        return node;
+    }
+
+    function renderRow(product) {
+        const row = element('tr');
+        row.dataset.id = product.id;
+
+        const check = element('input', 'form-check-input grid-select');
+        check.type = 'checkbox';
+        check.value = product.id;
+        row.appendChild(element('td')).appendChild(check);
+
+        row.appendChild(element('td')).appendChild(element('span', 'product-id', product.id));
+
+        const image = element('img', 'product-image-thumb');
+        image.src = product.image_src;
+        image.alt = product.name;
+        image.loading = 'lazy';
+        image.onerror = function() { this.src = 'https://via.placeholder.com/60x60?text=No+Image'; };
+        row.appendChild(element('td')).appendChild(image);
+
+        row.appendChild(element('td')).appendChild(element('span', 'product-name', product.name));
+        row.appendChild(element('td')).appendChild(
+            element('span', 'product-price', `${Math.trunc(product.price || 0).toLocaleString('en-US')} ₫`)
+        );
+
+        const categoryCell = row.appendChild(element('td'));
+        const badge = CATEGORY_BADGES[product.category_id];
+        if (badge) categoryCell.appendChild(element('span', `category-badge ${badge[0]}`, badge[1]));
+
+        row.appendChild(element('td')).appendChild(element('strong', '', product.stock_quantity));
+
+        const bestCell = row.appendChild(element('td'));
+        if (product.bestSeller) {
+            const yes = bestCell.appendChild(element('span', 'bestseller-yes'));
+            yes.appendChild(element('i', 'fas fa-star me-1'));
+            yes.appendChild(document.createTextNode(' Yes'));
+        } else {
+            bestCell.appendChild(element('span', 'bestseller-no', 'No'));
+        }
+
+        const actions = row.appendChild(element('td', 'text-center'));
+        const view = actions.appendChild(element('a', 'action-btn btn-view'));
+        view.href = product.view_url;
+        view.target = '_blank';
+        view.title = 'Xem chi tiết';
+        view.appendChild(element('i', 'fas fa-eye'));
+        const edit = actions.appendChild(element('a', 'action-btn btn-edit'));
+        edit.href = product.edit_url;
+        edit.title = 'Chỉnh sửa';
+        edit.appendChild(element('i', 'fas fa-edit'));
+        const remove = actions.appendChild(element('button', 'action-btn btn-delete'));
+        remove.type = 'button';
+        remove.title = 'Xóa';
+        remove.dataset.deleteId = product.id;
+        remove.appendChild(element('i', 'fas fa-trash'));
+        return row;
+    }
+
+    function render(data) {
+        body.replaceChildren();
+        if (!data.products.length) {
+            const empty = element('td', 'text-center text-muted py-4', 'Không tìm thấy sản phẩm nào');
+            empty.colSpan = 9;
+            body.appendChild(element('tr')).appendChild(empty);
+        }
+        data.products.forEach(product => body.appendChild(renderRow(product)));
+        rowCount.textContent = data.products.length;
+
+        nextCursor = data.next_cursor || '';
+        nextButton.classList.toggle('d-none', !data.has_more);
+        nextButton.href = '#';
+        prevButton.classList.toggle('d-none', previousCursors.length === 0);
+        firstButton.classList.toggle('d-none', !currentCursor);
+        updateSelection();
+    }
+
+    function load(cursor) {
+        const seq = ++loadSeq;
+        const params = query(cursor);
+        body.style.opacity = '0.5';
+        return fetch(`${table.dataset.source}?${params}`, { headers: { 'Accept': 'application/json' } })
+            .then(response => {
+                if (!response.ok) throw new Error(response.status);
+                return response.json();
+            })
+            .then(data => {
+                if (seq !== loadSeq) return;  // a newer request superseded this one
+                currentCursor = cursor || '';
+                render(data);
+                window.history.replaceState(null, '', `${window.location.pathname}?${params}`);
+            })
+            .catch(() => showMessage('Không tải được danh sách sản phẩm', 'danger'))
+            .finally(() => { if (seq === loadSeq) body.style.opacity = ''; });
+    }
+
+    function reload() {
+        previousCursors.length = 0;
+        return load('');
+    }
+
+    // Selection
+
+    function selectedIds() {
+        return [...body.querySelectorAll('.grid-select:checked')].map(box => box.value);
+    }
+
+    function updateSelection() {
+        const boxes = body.querySelectorAll('.grid-select');
+        const ids = selectedIds();
+        bulkCount.textContent = ids.length;
+        bulkBar.classList.toggle('d-none', ids.length === 0);
+        selectAll.checked = boxes.length > 0 && ids.length === boxes.length;
+        selectAll.indeterminate = ids.length > 0 && ids.length < boxes.length;
+    }
+
+    function showMessage(text, type) {
+        const alert = element('div', `alert alert-${type} alert-dismissible fade show`, text);
+        const close = alert.appendChild(element('button', 'btn-close'));
+        close.type = 'button';
+        close.dataset.bsDismiss = 'alert';
+        table.closest('.card-body').prepend(alert);
+        setTimeout(() => alert.remove(), 5000);
+    }
+
+    function runBulk(action, ids, value) {
+        return fetch(table.dataset.bulk, {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json', 'Accept': 'application/json' },
+            body: JSON.stringify({ action: action, ids: ids, value: value })
+        })
+            .then(response => response.json())
+            .then(data => {
+                showMessage(data.message, data.success ? 'success' : 'warning');
+                // Reload the same page so changed rows (or rows moved by the sort) show correctly
+                return load(currentCursor);
+            })
+            .catch(() => showMessage('Đã xảy ra lỗi khi cập nhật', 'danger'));
+    }
+
+    // Events
+
+    filters.addEventListener('submit', function(event) {
+        event.preventDefault();
+        reload();
+    });
+    filters.querySelectorAll('select').forEach(select => select.addEventListener('change', reload));
+    searchInput.addEventListener('input', function() {
+        clearTimeout(searchTimer);
+        searchTimer = setTimeout(reload, 300);
+    });
+
+    nextButton.addEventListener('click', function(event) {
+        event.preventDefault();
+        if (!nextCursor) return;
+        previousCursors.push(currentCursor);
+        load(nextCursor);
+    });
+    prevButton.addEventListener('click', function() {
+        if (!previousCursors.length) return;
+        load(previousCursors.pop());
+    });
+    firstButton.addEventListener('click', function(event) {
+        event.preventDefault();
+        reload();
+    });
+
+    selectAll.addEventListener('change', function() {
+        body.querySelectorAll('.grid-select').forEach(box => { box.checked = selectAll.checked; });
+        updateSelection();
+    });
+    body.addEventListener('change', function(event) {
+        if (event.target.classList.contains('grid-select')) updateSelection();
+    });
+    body.addEventListener('click', function(event) {
+        const button = event.target.closest('[data-delete-id]');
+        if (button && confirm('Bạn có chắc muốn xóa sản phẩm này?')) {
+            runBulk('delete', [button.dataset.deleteId]);
+        }
+    });
+
+    bulkBar.querySelectorAll('[data-bulk-action]').forEach(button => {
+        button.addEventListener('click', function() {
+            const action = button.dataset.bulkAction;
+            const ids = selectedIds();
+            if (!ids.length) return;
+            let value = button.dataset.bulkValue;
+            if (action === 'set_stock') {
+                value = document.getElementById('bulkStock').value;
+                if (value === '' || Number(value) < 0) {
+                    showMessage('Số lượng không hợp lệ', 'warning');
+                    return;
+                }
+            }
+            if (action === 'delete' && !confirm(`Bạn có chắc muốn xóa ${ids.length} sản phẩm đã chọn?`)) {
+                return;
+            }
+            runBulk(action, ids, value);
+        });
+    });
+
+    updateSelection();
+});
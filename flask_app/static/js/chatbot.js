@@ -1,29 +1,12 @@
 // Sales Chatbot Logic (upgraded)
 const chatbot = {
-    products: [],
+    recommendUrl: '/api/chatbot/recommend',
     context: {
         budget: null,
         need: null,
     },
 
-    fallbackCatalog: [
-        { name: 'Galaxy A05', price: 3490000, series: 'A', tags: ['gia re', 'co ban', 'hoc tap'] },
-        { name: 'Galaxy A14', price: 4490000, series: 'A', tags: ['gia re', 'pin tot'] },
-        { name: 'Galaxy A25', price: 6290000, series: 'A', tags: ['gia re', 'camera'] },
-        { name: 'Galaxy A35', price: 8490000, series: 'A', tags: ['can bang', 'camera', 'man hinh'] },
-        { name: 'Galaxy S24', price: 22990000, series: 'S', tags: ['flagship', 'camera', 'hieu nang'] },
-        { name: 'Galaxy S24+', price: 27990000, series: 'S', tags: ['flagship', 'pin', 'man hinh'] },
-        { name: 'Galaxy S24 Ultra', price: 29990000, series: 'S', tags: ['camera', 'spen', 'flagship'] },
-        { name: 'Galaxy S25', price: 24990000, series: 'S', tags: ['flagship', 'hieu nang'] },
-        { name: 'Galaxy S25+', price: 29990000, series: 'S', tags: ['flagship', 'pin', 'man hinh'] },
-        { name: 'Galaxy S25 Ultra', price: 33990000, series: 'S', tags: ['camera', 'spen', 'flagship'] },
-        { name: 'Galaxy Z Flip6', price: 26990000, series: 'Z', tags: ['gap', 'thoi trang', 'nho gon'] },
-        { name: 'Galaxy Z Fold6', price: 43990000, series: 'Z', tags: ['gap', 'da nhiem', 'cao cap'] },
-        { name: 'Galaxy Z Fold7', price: 44990000, series: 'Z', tags: ['gap', 'da nhiem', 'cao cap'] },
-    ],
-
     init() {
-        this.loadProducts();
         this.setupEventListeners();
         this.addBotMessage(
             'Xin chao! Toi la tro ly tu van ban hang cua SAMSUM Center.\n' +
@@ -32,29 +15,22 @@ const chatbot = {
         );
     },
 
-    loadProducts() {
-        const cards = document.querySelectorAll('.product-card');
-        cards.forEach((card) => {
-            const nameText = card.querySelector('.card-title, .product-name')?.textContent?.trim() || '';
-            const priceText = card.querySelector('.text-danger, .product-price')?.textContent || '';
-            const link = card.querySelector('a[href*="/product/"]')?.getAttribute('href') || '';
-            const price = this.parsePrice(priceText);
-
-            if (nameText && price > 0) {
-                this.products.push({
-                    name: nameText,
-                    price,
-                    series: this.detectSeries(nameText),
-                    tags: this.detectTags(nameText),
-                    link,
-                });
+    // Products come from the server-side catalog index: current prices/stock, one small JSON response
+    fetchProducts(params) {
+        const query = new URLSearchParams();
+        Object.entries(params).forEach(([key, value]) => {
+            if (value !== null && value !== undefined && value !== '') {
+                query.set(key, value);
             }
         });
+        return fetch(`${this.recommendUrl}?${query.toString()}`)
+            .then((response) => (response.ok ? response.json() : { products: [] }))
+            .then((data) => data.products || [])
+            .catch(() => null);
+    },
 
-        // Fallback if current page does not expose product cards
-        if (!this.products.length) {
-            this.products = [...this.fallbackCatalog];
-        }
+    replyUnavailable() {
+        this.addBotMessage('Xin loi, minh chua tai duoc danh sach san pham. Ban thu lai sau it phut nhe.');
     },
 
     setupEventListeners() {
@@ -171,8 +147,12 @@ const chatbot = {
         );
     },
 
-    replyPrice(text) {
-        const candidates = this.findByText(text);
+    async replyPrice(text) {
+        const candidates = await this.fetchProducts({ q: text, limit: 6 });
+        if (candidates === null) {
+            this.replyUnavailable();
+            return;
+        }
         if (!candidates.length) {
             this.addBotMessage(
                 'Minh chua bat duoc mau cu the. Ban co the hoi nhu:\n' +
@@ -183,12 +163,16 @@ const chatbot = {
             return;
         }
 
-        const lines = candidates.slice(0, 6).map((p) => `- ${p.name}: ${this.formatCurrency(p.price)}`);
+        const lines = candidates.map((p) => `- ${p.name}: ${this.formatCurrency(p.price)}${p.in_stock ? '' : ' (tam het hang)'}`);
         this.addBotMessage(`Gia tham khao:\n${lines.join('\n')}`);
     },
 
-    replyCompare(text) {
-        const targets = this.findByText(text).slice(0, 2);
+    async replyCompare(text) {
+        const targets = await this.fetchProducts({ q: text, limit: 2 });
+        if (targets === null) {
+            this.replyUnavailable();
+            return;
+        }
         if (targets.length < 2) {
             this.addBotMessage(
                 'Ban hay chi ro 2 mau de so sanh, vi du:\n' +
@@ -214,8 +198,18 @@ const chatbot = {
         );
     },
 
-    replyRecommendation() {
-        const picks = this.rankProducts(this.context.budget, this.context.need).slice(0, 3);
+    async replyRecommendation() {
+        const budget = this.context.budget;
+        const picks = await this.fetchProducts({
+            budget_min: budget ? budget.min : null,
+            budget_max: budget ? budget.max : null,
+            need: this.context.need,
+            limit: 3,
+        });
+        if (picks === null) {
+            this.replyUnavailable();
+            return;
+        }
 
         if (!picks.length) {
             this.addBotMessage('Minh chua tim thay mau phu hop. Ban thu noi ro hon ve muc gia du kien nhe.');
@@ -233,34 +227,6 @@ const chatbot = {
         );
     },
 
-    rankProducts(budget, need) {
-        return [...this.products]
-            .filter((p) => {
-                if (!budget) return true;
-                return p.price >= budget.min && p.price <= budget.max;
-            })
-            .map((p) => ({ ...p, score: this.scoreProduct(p, need) }))
-            .sort((a, b) => b.score - a.score || a.price - b.price);
-    },
-
-    scoreProduct(product, need) {
-        let score = 0;
-
-        if (product.series === 'S') score += 8;
-        if (product.series === 'Z') score += 7;
-        if (product.series === 'A') score += 5;
-
-        if (!need) return score;
-
-        const tags = product.tags.join(' ');
-        if (need === 'game' && (tags.includes('hieu nang') || product.series === 'S')) score += 6;
-        if (need === 'camera' && tags.includes('camera')) score += 7;
-        if (need === 'work' && (product.series === 'Z' || tags.includes('da nhiem'))) score += 7;
-        if (need === 'budget' && product.series === 'A') score += 8;
-
-        return score;
-    },
-
     compareTip(a, b) {
         if (a.series === 'Z' || b.series === 'Z') {
             return 'Dong Z hop voi nguoi uu tien trai nghiem gap va da nhiem.';
@@ -348,56 +314,6 @@ const chatbot = {
         return value;
     },
 
-    findByText(text) {
-        const normalized = this.normalize(text);
-
-        // Try exact name hits first
-        const byName = this.products.filter((p) => normalized.includes(this.normalize(p.name)));
-        if (byName.length) return byName;
-
-        // Series/group level hits
-        const out = [];
-        if (/(s24|galaxy s24)/.test(normalized)) out.push(...this.products.filter((p) => /s24/i.test(p.name)));
-        if (/(s25|galaxy s25)/.test(normalized)) out.push(...this.products.filter((p) => /s25/i.test(p.name)));
-        if (/ultra/.test(normalized)) out.push(...this.products.filter((p) => /ultra/i.test(p.name)));
-        if (/flip/.test(normalized)) out.push(...this.products.filter((p) => /flip/i.test(p.name)));
-        if (/fold|gap/.test(normalized)) out.push(...this.products.filter((p) => /fold/i.test(p.name)));
-        if (/a\d\d|a series|dong a/.test(normalized)) out.push(...this.products.filter((p) => p.series === 'A'));
-
-        // Deduplicate by name
-        const seen = new Set();
-        return out.filter((p) => {
-            const key = p.name.toLowerCase();
-            if (seen.has(key)) return false;
-            seen.add(key);
-            return true;
-        });
-    },
-
-    detectSeries(name) {
-        const n = name.toLowerCase();
-        if (n.includes('fold') || n.includes('flip') || /\bz\b/.test(n)) return 'Z';
-        if (/\bs\d+/i.test(name) || n.includes('galaxy s')) return 'S';
-        if (/\ba\d+/i.test(name) || n.includes('galaxy a')) return 'A';
-        return 'O';
-    },
-
-    detectTags(name) {
-        const n = name.toLowerCase();
-        const tags = [];
-        if (n.includes('ultra')) tags.push('camera', 'hieu nang');
-        if (n.includes('fold')) tags.push('da nhiem', 'cao cap');
-        if (n.includes('flip')) tags.push('thoi trang', 'nho gon');
-        if (/\ba\d+/i.test(name)) tags.push('gia re');
-        if (/\bs\d+/i.test(name)) tags.push('flagship', 'hieu nang');
-        return tags;
-    },
-
-    parsePrice(text) {
-        const digits = (text || '').replace(/[^0-9]/g, '');
-        return digits ? Number(digits) : 0;
-    },
-
     formatCurrency(price) {
         return `${Number(price || 0).toLocaleString('vi-VN')} VND`;
     },
@@ -150,6 +150,69 @@ if (searchForm) {
             }, 500);
         }
     });
+
+    // Live suggestions from /api/search/suggest (debounced, latest response wins)
+    searchInput.setAttribute('autocomplete', 'off');
+    searchForm.style.position = 'relative';
+    const suggestBox = document.createElement('div');
+    suggestBox.className = 'list-group shadow';
+    suggestBox.style.cssText = 'position: absolute; top: 100%; left: 0; right: 0; z-index: 1050; display: none;';
+    searchForm.appendChild(suggestBox);
+
+    let suggestTimer = null;
+    let suggestSeq = 0;
+
+    function hideSuggestions() {
+        suggestBox.style.display = 'none';
+        suggestBox.innerHTML = '';
+    }
+
+    function renderSuggestions(suggestions) {
+        suggestBox.innerHTML = '';
+        suggestions.forEach(item => {
+            const link = document.createElement('a');
+            link.href = item.url;
+            link.className = 'list-group-item list-group-item-action';
+            const icon = document.createElement('i');
+            icon.className = item.type === 'category' ? 'fas fa-folder me-2 text-muted' : 'fas fa-mobile-alt me-2 text-muted';
+            link.appendChild(icon);
+            link.appendChild(document.createTextNode(item.text));
+            suggestBox.appendChild(link);
+        });
+        suggestBox.style.display = suggestions.length ? 'block' : 'none';
+    }
+
+    searchInput.addEventListener('input', function() {
+        clearTimeout(suggestTimer);
+        const query = this.value.trim();
+        if (!query) {
+            hideSuggestions();
+            return;
+        }
+        suggestTimer = setTimeout(() => {
+            const seq = ++suggestSeq;
+            fetch(`/api/search/suggest?q=${encodeURIComponent(query)}`)
+                .then(response => response.json())
+                .then(data => {
+                    if (seq === suggestSeq) {
+                        renderSuggestions(data.suggestions || []);
+                    }
+                })
+                .catch(hideSuggestions);
+        }, 120);
+    });
+
+    searchInput.addEventListener('keydown', function(e) {
+        if (e.key === 'Escape') {
+            hideSuggestions();
+        }
+    });
+
+    document.addEventListener('click', function(e) {
+        if (!searchForm.contains(e.target)) {
+            hideSuggestions();
+        }
+    });
 }
 
 // Password strength indicator
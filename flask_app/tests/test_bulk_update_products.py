@@ -0,0 +1,51 @@
+"""Tests for the admin grid's bulk actions"""
+from src.application.use_cases.product_use_cases import BulkUpdateProductsUseCase
+from src.domain.entities import Product
+
+
+class FakeProducts:
+    """Product repository double; `fail` makes the bulk UPDATE report a database error"""
+
+    def __init__(self, fail=False):
+        self.fail = fail
+        self.document_reads = []
+
+    def set_stock_many(self, product_ids, quantity):
+        return None if self.fail else len(product_ids)
+
+    def set_bestseller_many(self, product_ids, best_seller):
+        return None if self.fail else 0  # nothing changed is still a success
+
+    def get_last_error(self):
+        return "Lock wait timeout exceeded" if self.fail else ""
+
+    def get_search_documents(self, product_ids=None):
+        self.document_reads.append(list(product_ids))
+        return [Product(id=pid, name=f'P{pid}', price=1.0) for pid in product_ids if pid != '3']
+
+
+class RecordingIndex:
+    def __init__(self):
+        self.indexed, self.removed = [], []
+
+    def index_product(self, product):
+        self.indexed.append(product.id)
+
+    def remove_product(self, product_id):
+        self.removed.append(product_id)
+
+
+def test_database_error_is_reported_and_nothing_is_reindexed():
+    products, index = FakeProducts(fail=True), RecordingIndex()
+    success, message, result = BulkUpdateProductsUseCase(products, [index]).execute('set_stock', [1, 2], 5)
+    assert not success and result == {}
+    assert message.endswith("Lock wait timeout exceeded")
+    assert products.document_reads == [] and index.indexed == []
+
+
+def test_unchanged_rows_succeed_and_reindex_in_one_read():
+    products, index = FakeProducts(), RecordingIndex()
+    success, _, result = BulkUpdateProductsUseCase(products, [index]).execute('set_bestseller', [1, 2, 3], '1')
+    assert success and result == {'updated': ['1', '2', '3']}
+    assert products.document_reads == [['1', '2', '3']]
+    assert index.indexed == ['1', '2'] and index.removed == ['3']
@@ -0,0 +1,89 @@
+"""Tests for packet-sized chunking of multi-row statements"""
+from src.infrastructure.database import bulk_writer
+from src.infrastructure.database.bulk_writer import bulk_insert, bulk_update_case, execute_in_chunks
+
+
+class RecordingCursor:
+    """Cursor double that records statements; every row counts as affected"""
+
+    def __init__(self):
+        self.statements = []
+        self.rowcount = 0
+
+    def execute(self, query, params=()):
+        self.statements.append((query, tuple(params)))
+        self.rowcount = query.count('(%s, %s)') or len(params)
+
+
+def test_bulk_insert_single_statement_when_it_fits():
+    cursor = RecordingCursor()
+    inserted = bulk_insert(cursor, 't', ['a', 'b'], [(1, 'x'), (2, 'y'), (3, 'z')], max_packet=1 << 20)
+    assert inserted == 3
+    assert len(cursor.statements) == 1
+    query, params = cursor.statements[0]
+    assert query == "INSERT INTO t (a, b) VALUES (%s, %s), (%s, %s), (%s, %s)"
+    assert params == (1, 'x', 2, 'y', 3, 'z')
+
+
+def test_bulk_insert_splits_by_packet_size_and_keeps_every_row():
+    cursor = RecordingCursor()
+    rows = [(i, 'v' * 100) for i in range(50)]
+    bulk_insert(cursor, 't', ['a', 'b'], rows, max_packet=2000, suffix='ON DUPLICATE KEY UPDATE b = b')
+    assert len(cursor.statements) > 1
+    for query, params in cursor.statements:
+        assert query.endswith(' ON DUPLICATE KEY UPDATE b = b')
+        assert len(query) + sum(len(str(value)) + 4 for value in params) <= 2000
+    sent = [value for _, params in cursor.statements for value in params]
+    assert sent == [value for row in rows for value in row]
+
+
+def test_bulk_insert_caps_rows_per_statement():
+    cursor = RecordingCursor()
+    rows = [(i,) for i in range(bulk_writer._MAX_ROWS_PER_CHUNK + 1)]
+    bulk_insert(cursor, 't', ['a'], rows, max_packet=1 << 30)
+    assert [len(params) for _, params in cursor.statements] == [bulk_writer._MAX_ROWS_PER_CHUNK, 1]
+
+
+def test_bulk_insert_without_rows_does_nothing():
+    cursor = RecordingCursor()
+    assert bulk_insert(cursor, 't', ['a'], [], max_packet=1000) == 0
+    assert cursor.statements == []
+
+
+def test_bulk_update_case_relative_and_non_negative():
+    cursor = RecordingCursor()
+    bulk_update_case(cursor, 'products', 'id', 'stock_quantity', {'1': -2, '2': -1},
+                     relative=True, require_non_negative=True, max_packet=1 << 20)
+    (query, params), = cursor.statements
+    case_sql = "CASE id WHEN %s THEN %s WHEN %s THEN %s END"
+    assert query == (
+        f"UPDATE products SET stock_quantity = stock_quantity + ({case_sql}) WHERE id IN (%s, %s)"
+        f" AND stock_quantity + ({case_sql}) >= 0"
+    )
+    assert params == ('1', -2, '2', -1, '1', '2', '1', -2, '2', -1)
+
+
+def test_bulk_update_case_chunks_large_updates():
+    cursor = RecordingCursor()
+    values = {str(i): i for i in range(300)}
+    bulk_update_case(cursor, 't', 'id', 'v', values, max_packet=4000)
+    assert len(cursor.statements) > 1
+    keys = []
+    for query, params in cursor.statements:
+        rows = query.count('%s') // 3  # WHEN key THEN value pairs, then the IN list
+        keys.extend(params[-rows:])
+    assert keys == list(values)
+
+
+def test_execute_in_chunks_binds_leading_params_in_every_chunk():
+    cursor = RecordingCursor()
+    keys = [f"ORD{i:06d}" for i in range(200)]
+    execute_in_chunks(cursor, "UPDATE orders SET status = %s WHERE id IN ({in_clause})", keys,
+                      params=('cancelled',), max_packet=1500)
+    assert len(cursor.statements) > 1
+    sent = []
+    for query, params in cursor.statements:
+        assert params[0] == 'cancelled'
+        assert query.count('%s') == len(params)
+        sent.extend(params[1:])
+    assert sent == keys
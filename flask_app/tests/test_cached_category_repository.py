@@ -0,0 +1,62 @@
+"""Tests for the in-memory category list"""
+from src.domain.entities import Category
+from src.infrastructure.cache import CachedCategoryRepository
+
+
+class FakeUnitOfWork:
+    """Queues after-commit callbacks until commit()"""
+
+    def __init__(self):
+        self.callbacks = []
+
+    def after_commit(self, callback):
+        self.callbacks.append(callback)
+
+    def has_pending_commit(self):
+        return bool(self.callbacks)
+
+    def commit(self):
+        callbacks, self.callbacks = self.callbacks, []
+        for callback in callbacks:
+            callback()
+
+
+class FakeCategories:
+    """Category repository double: `committed` is what other connections see"""
+
+    def __init__(self):
+        self.committed = [Category(id=1, name='Phones')]
+        self.reads = 0
+
+    def get_all(self):
+        self.reads += 1
+        return list(self.committed)
+
+    def update(self, category):
+        return True
+
+
+def test_list_is_served_from_memory():
+    inner = FakeCategories()
+    repository = CachedCategoryRepository(inner, unit_of_work=FakeUnitOfWork())
+    repository.get_all()
+    repository.get_all()
+    assert inner.reads == 1
+
+
+def test_update_drops_the_list_again_once_committed():
+    inner, unit_of_work = FakeCategories(), FakeUnitOfWork()
+    repository = CachedCategoryRepository(inner, unit_of_work=unit_of_work)
+    repository.get_all()
+
+    assert repository.update(Category(id=1, name='Mobile phones'))
+    # Reads before the commit are not cached: they may see the writer's uncommitted row
+    repository.get_all()
+    assert [c.name for c in repository.get_all()] == ['Phones']
+    assert inner.reads == 3
+
+    inner.committed = [Category(id=1, name='Mobile phones')]
+    unit_of_work.commit()
+    assert [c.name for c in repository.get_all()] == ['Mobile phones']
+    repository.get_all()
+    assert inner.reads == 4
@@ -0,0 +1,87 @@
+"""Tests for the product read-through cache"""
+from src.domain.entities import Product, ProductSort, ProductSummary
+from src.infrastructure.cache import CachedProductRepository
+from tests.test_cached_category_repository import FakeUnitOfWork
+
+
+class FakeProducts:
+    """Product repository double: `stock` is what other connections see"""
+
+    def __init__(self):
+        self.stock = {'1': 5, '2': 5}
+        self.reads = 0
+        self.during_read = None
+
+    def get_by_id(self, product_id):
+        self.reads += 1
+        stock = self.stock[str(product_id)]
+        if self.during_read:
+            self.during_read()
+        return Product(id=str(product_id), name=f'P{product_id}', price=1.0, stock_quantity=stock)
+
+    def get_by_category(self, category_id):
+        self.reads += 1
+        return [ProductSummary(id=pid, name=f'P{pid}', stock_quantity=stock)
+                for pid, stock in self.stock.items() if pid == str(category_id)]
+
+    def get_page(self, sort, after, page_size, category_id=None, name_query=None):
+        self.reads += 1
+        return [ProductSummary(id=pid, stock_quantity=stock) for pid, stock in self.stock.items()]
+
+    def update_stock(self, product_id, quantity):
+        return True
+
+
+def test_stock_change_evicts_only_entries_showing_the_product():
+    inner = FakeProducts()
+    repository = CachedProductRepository(inner, unit_of_work=FakeUnitOfWork())
+    repository.get_by_id('1')
+    repository.get_by_id('2')
+    repository.get_by_category(2)  # holds only product 2
+    repository.get_page(ProductSort.NEWEST, None, 10)  # holds both
+    reads = inner.reads
+
+    repository.update_stock('1', 3)
+    repository.get_by_id('2')
+    repository.get_by_category(2)
+    assert inner.reads == reads
+    repository.get_by_id('1')
+    repository.get_page(ProductSort.NEWEST, None, 10)
+    assert inner.reads == reads + 2
+
+
+def test_write_is_evicted_again_once_committed():
+    inner, unit_of_work = FakeProducts(), FakeUnitOfWork()
+    writer = CachedProductRepository(inner, unit_of_work=unit_of_work)
+    writer.get_by_id('1')
+
+    writer.update_stock('1', 0)
+    # Until the commit another request (no pending writes) still reads and caches the old row
+    pending, unit_of_work.callbacks = unit_of_work.callbacks, []
+    assert writer.get_by_id('1').stock_quantity == 5
+    assert writer.cache.get(('id', '1')) is not None
+    unit_of_work.callbacks = pending
+
+    inner.stock['1'] = 0
+    unit_of_work.commit()
+    assert writer.get_by_id('1').stock_quantity == 0
+
+
+def test_read_overtaken_by_an_eviction_is_not_cached():
+    inner = FakeProducts()
+    repository = CachedProductRepository(inner)
+    inner.during_read = lambda: repository.invalidate(['1'])
+    repository.get_by_id('1')
+    inner.during_read = None
+    assert repository.cache.get(('id', '1')) is None
+
+
+def test_reads_with_uncommitted_writes_are_not_cached():
+    inner, unit_of_work = FakeProducts(), FakeUnitOfWork()
+    repository = CachedProductRepository(inner, unit_of_work=unit_of_work)
+    repository.update_stock('2', 1)
+    repository.get_by_id('1')
+    assert repository.cache.get(('id', '1')) is None
+    unit_of_work.commit()
+    repository.get_by_id('1')
+    assert repository.cache.get(('id', '1')) is not None
@@ -0,0 +1,90 @@
+"""Tests for the MySQL connection pool"""
+import threading
+import pytest
+from src.infrastructure.database.connection_pool import MySQLConnectionPool, PoolExhaustedError
+
+
+class FakeConnection:
+    """Raw connection double"""
+
+    def __init__(self):
+        self.unread_result = False
+        self.in_transaction = False
+        self.autocommit = False
+        self.closed = False
+        self.rollbacks = 0
+        self.healthy = True
+
+    def rollback(self):
+        self.rollbacks += 1
+        self.in_transaction = False
+
+    def ping(self, reconnect=False):
+        if not self.healthy:
+            raise OSError("server has gone away")
+
+    def close(self):
+        self.closed = True
+
+
+class FakePool(MySQLConnectionPool):
+    def __init__(self, **kwargs):
+        super().__init__({}, **kwargs)
+        self.opened = []
+
+    def _connect(self):
+        raw = FakeConnection()
+        self.opened.append(raw)
+        with self._lock:
+            self._connections_created += 1
+        return raw
+
+
+def test_released_connection_is_reused():
+    pool = FakePool(pool_size=2)
+    with pool.get_connection() as conn:
+        first = conn.raw
+    with pool.get_connection() as conn:
+        assert conn.raw is first
+    stats = pool.get_stats()
+    assert stats['connections_created'] == 1 and stats['checkouts'] == 2 and stats['in_use'] == 0
+
+
+def test_release_rolls_back_an_open_transaction():
+    pool = FakePool()
+    conn = pool.get_connection()
+    conn.raw.in_transaction = True
+    raw = conn.raw
+    conn.close()
+    conn.close()  # idempotent
+    assert raw.rollbacks == 1
+    assert pool.get_stats()['idle'] == 1
+
+
+def test_exhausted_pool_waits_then_fails():
+    pool = FakePool(pool_size=1, checkout_timeout=0.05)
+    held = pool.get_connection()
+    raw = held.raw
+    with pytest.raises(PoolExhaustedError):
+        pool.get_connection()
+
+    pool.checkout_timeout = 5
+    threading.Timer(0.05, held.close).start()
+    with pool.get_connection() as conn:  # woken by the release
+        assert conn.raw is raw
+    assert pool.get_stats()['waits'] == 1
+
+
+def test_expired_and_dead_connections_are_replaced():
+    pool = FakePool(max_lifetime=60, health_check_after=0)
+    conn = pool.get_connection()
+    conn.created_at -= 120
+    conn.close()
+    assert pool.opened[0].closed  # past its lifetime when returned
+
+    pool.get_connection().close()
+    pool.opened[1].healthy = False  # fails the ping on the next checkout
+    with pool.get_connection() as conn:
+        assert conn.raw is pool.opened[2]
+    assert pool.opened[1].closed
+    assert pool.get_stats()['connections_recycled'] == 2
@@ -0,0 +1,30 @@
+"""Tests for co-purchase pair counting"""
+from src.infrastructure.jobs import count_pairs
+
+
+def test_count_pairs_is_symmetric_with_order_counts_on_the_diagonal():
+    counts = count_pairs([['a', 'b', 'c'], ['b', 'a'], ['c']])
+    assert counts == {
+        ('a', 'a'): 2, ('b', 'b'): 2, ('c', 'c'): 2,
+        ('a', 'b'): 2, ('b', 'a'): 2,
+        ('a', 'c'): 1, ('c', 'a'): 1,
+        ('b', 'c'): 1, ('c', 'b'): 1,
+    }
+
+
+def test_count_pairs_ignores_duplicate_lines_and_empty_baskets():
+    assert count_pairs([['x', 'x', 'y'], []]) == {
+        ('x', 'x'): 1, ('y', 'y'): 1, ('x', 'y'): 1, ('y', 'x'): 1
+    }
+    assert count_pairs([]) == {}
+
+
+def test_count_pairs_matches_a_naive_count():
+    baskets = [[str(i % 7), str(i % 5), str((i * 3) % 11)] for i in range(60)]
+    expected = {}
+    for basket in baskets:
+        items = sorted(set(basket))
+        for a in items:
+            for b in items:
+                expected[(a, b)] = expected.get((a, b), 0) + 1
+    assert count_pairs(baskets) == expected
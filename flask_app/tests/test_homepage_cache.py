@@ -0,0 +1,52 @@
+"""Tests for the shared homepage cache"""
+from src.application.use_cases.home_use_cases import HomePageViewModel
+from src.domain.entities import ProductSummary
+from src.infrastructure.cache import HomePageCache
+
+
+def _builder(stock):
+    builds = []
+
+    def build():
+        builds.append(1)
+        return HomePageViewModel(featured_products=[
+            ProductSummary(id=product_id, name=product_id, price=1.0, stock_quantity=quantity)
+            for product_id, quantity in stock.items()
+        ])
+    return build, builds
+
+
+def test_builds_once_until_invalidated():
+    cache = HomePageCache(ttl=60)
+    build, builds = _builder({'1': 3})
+    first = cache.get_or_build(build)
+    assert cache.get_or_build(build) is first
+    cache.index_product(None)
+    assert cache.get_or_build(build) is not first
+    assert len(builds) == 2
+
+
+def test_orders_only_drop_the_page_when_a_featured_product_flips_availability():
+    cache = HomePageCache(ttl=60)
+    build, builds = _builder({'1': 3, '2': 0})
+    cache.get_or_build(build)
+
+    cache.stock_changed({'1': -1, '99': -5})  # still in stock; 99 is not featured
+    cache.get_or_build(build)
+    assert len(builds) == 1
+
+    cache.stock_changed({'1': -2})  # sold out
+    cache.get_or_build(build)
+    assert len(builds) == 2
+
+    cache.stock_changed({'2': 4})  # back in stock (the rebuilt page read 0)
+    cache.get_or_build(build)
+    assert len(builds) == 3
+
+
+def test_expires_after_ttl():
+    cache = HomePageCache(ttl=0)
+    build, builds = _builder({'1': 1})
+    cache.get_or_build(build)
+    cache.get_or_build(build)
+    assert len(builds) == 2
@@ -0,0 +1,21 @@
+"""Tests for keyset pagination predicates"""
+from src.infrastructure.database.keyset import keyset_clause
+
+
+def test_single_column_descending():
+    clause, params = keyset_clause(['o.id'], 'DESC', ['ORD2'])
+    assert clause == "((o.id < %s))"
+    assert params == ['ORD2']
+
+
+def test_two_columns_ascending():
+    clause, params = keyset_clause(['p.gia', 'p.id'], 'ASC', [100, '7'])
+    assert clause == "((p.gia > %s) OR (p.gia = %s AND p.id > %s))"
+    assert params == [100, 100, '7']
+
+
+def test_three_columns_bind_every_prefix():
+    clause, params = keyset_clause(['a', 'b', 'c'], 'DESC', [1, 2, 3])
+    assert clause == "((a < %s) OR (a = %s AND b < %s) OR (a = %s AND b = %s AND c < %s))"
+    assert params == [1, 1, 2, 1, 2, 3]
+    assert clause.count('%s') == len(params)
@@ -0,0 +1,23 @@
+"""Tests for the admin order search predicates"""
+import pytest
+from src.domain.entities import OrderFilter
+from src.infrastructure.database.mysql_order_repository import MySQLOrderRepository
+
+
+def _keyword_condition(keyword):
+    conditions, params = MySQLOrderRepository(None)._filter_conditions(OrderFilter(keyword=keyword))
+    return conditions[-1], params[-1]
+
+
+@pytest.mark.parametrize('keyword', ['ORD20240101123000AB12', 'ord20240101123000ab12'])
+def test_generated_order_id_is_an_exact_lookup(keyword):
+    assert _keyword_condition(keyword) == ("o.id = %s", 'ORD20240101123000AB12')
+
+
+@pytest.mark.parametrize('keyword', ['Ordonez', 'order', 'ORD', 'ORD2024', 'ORD20240101123000XY12'])
+def test_other_words_starting_with_ord_search_names(keyword):
+    assert _keyword_condition(keyword) == ("o.shipping_name LIKE %s", f"%{keyword}%")
+
+
+def test_digits_search_the_phone_prefix():
+    assert _keyword_condition('0903') == ("o.shipping_phone LIKE %s", '0903%')
@@ -0,0 +1,136 @@
+"""Tests for placing an order inside a request's unit of work"""
+from flask import Flask
+from src.application.use_cases.order_use_cases import CreateOrderUseCase
+from src.domain.entities import Order, OrderItem
+from src.infrastructure.database.mysql_order_repository import MySQLOrderRepository
+from src.infrastructure.database.unit_of_work import RequestUnitOfWork
+from tests.test_unit_of_work import FakeConnection, FakePool
+
+
+class StockCursor:
+    """Cursor double over a stock table; the conditional decrement only touches rows with enough stock"""
+
+    def __init__(self, connection: 'StockConnection'):
+        self.connection = connection
+        self.rowcount = 0
+        self._rows = []
+
+    def execute(self, query, params=()):
+        sql = ' '.join(query.split())
+        self.connection.calls.append(sql.split(' WHERE ')[0][:40])
+        if sql.startswith('UPDATE products'):
+            # bulk_update_case params: CASE pairs, the IN list, CASE pairs again
+            count = len(params) // 5
+            ids = params[2 * count:3 * count]
+            self.rowcount = sum(1 for pid in ids if self.connection.stock.get(pid, 0) >= self.connection.wanted[pid])
+        elif sql.startswith('SELECT id, stock_quantity'):
+            self._rows = [(pid, self.connection.stock.get(pid, 0)) for pid in params]
+        else:
+            self.rowcount = 1
+
+    def fetchall(self):
+        return self._rows
+
+    def fetchone(self):
+        return (1 << 20,)
+
+    def close(self):
+        pass
+
+
+class StockConnection(FakeConnection):
+    stock = {'1': 5, '2': 0}
+    wanted = {}
+
+    def cursor(self, **kwargs):
+        return StockCursor(self)
+
+
+class StockPool(FakePool):
+    def _connect(self):
+        raw = StockConnection()
+        self.opened.append(raw)
+        return raw
+
+
+class FakeProducts:
+    """Product repository double for CreateOrderUseCase's stock check"""
+
+    def __init__(self):
+        self.invalidated = []
+
+    def get_by_ids(self, product_ids):
+        class Available:
+            def __init__(self, product_id):
+                self.id = product_id
+
+            def can_purchase(self, quantity):
+                return True, ""
+        return [Available(str(pid)) for pid in product_ids]
+
+    def invalidate(self, product_ids):
+        self.invalidated.extend(product_ids)
+
+
+class RecordingIndex:
+    def __init__(self):
+        self.deltas = []
+
+    def stock_changed(self, deltas):
+        self.deltas.append(dict(deltas))
+
+
+def _order(quantities):
+    order = Order(user_id='7', customer_name='A', customer_phone='0900000000', customer_address='B')
+    for product_id, quantity in quantities.items():
+        order.add_item(OrderItem(product_id=product_id, product_name=f'P{product_id}',
+                                 product_price=10.0, quantity=quantity))
+    StockConnection.wanted = {str(pid): quantity for pid, quantity in quantities.items()}
+    return order
+
+
+def _setup():
+    pool = StockPool()
+    unit_of_work = RequestUnitOfWork(pool)
+    app = Flask(__name__)
+    unit_of_work.init_app(app)
+    products, index = FakeProducts(), RecordingIndex()
+    use_case = CreateOrderUseCase(MySQLOrderRepository(unit_of_work), products, [index], None, unit_of_work)
+    return app, pool, use_case, products, index
+
+
+def test_short_stock_rolls_back_to_savepoint_and_keeps_the_request_usable():
+    app, pool, use_case, products, index = _setup()
+    results = {}
+
+    @app.route('/')
+    def view():
+        results['short'] = use_case.execute(_order({'1': 1, '2': 1}))
+        results['placed'] = use_case.execute(_order({'1': 2}))
+        assert index.deltas == []  # nothing moves before the commit
+        return 'ok'
+
+    assert app.test_client().get('/').status_code == 200
+    success, message, _ = results['short']
+    assert not success and message.startswith('P2')
+    assert results['placed'][0]
+
+    calls = pool.opened[0].calls
+    assert 'ROLLBACK TO SAVEPOINT place_order' in calls
+    assert 'rollback' not in calls[:calls.index('commit')]  # no full rollback, no rollback-only unit
+    assert calls.count('commit') == 1 and calls.index('commit') > calls.index('ROLLBACK TO SAVEPOINT place_order')
+    assert index.deltas == [{'1': -2}]
+    assert products.invalidated == ['1']
+
+
+def test_failed_request_drops_the_in_memory_updates():
+    app, pool, use_case, products, index = _setup()
+
+    @app.route('/')
+    def view():
+        assert use_case.execute(_order({'1': 1}))[0]
+        raise RuntimeError('rendering failed')
+
+    assert app.test_client().get('/').status_code == 500
+    assert 'commit' not in pool.opened[0].calls
+    assert index.deltas == [] and products.invalidated == []
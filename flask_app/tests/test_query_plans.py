@@ -0,0 +1,48 @@
+"""
+EXPLAIN every repository query against a seeded local MySQL and fail on
+plan regressions (an indexed query turning into a full scan).
+
+Skipped unless QUERY_PLAN_DATABASE names a local database that has been
+migrated and seeded (`flask query-plans --seed` with MYSQL_CONFIG pointing
+at it), e.g.:
+
+    QUERY_PLAN_DATABASE=samsum_plans python -m pytest tests/test_query_plans.py
+
+Host and credentials come from MYSQL_CONFIG in config.py. The checker runs
+everything in one transaction that is rolled back.
+"""
+import os
+import pytest
+from config import MYSQL_CONFIG
+from src.infrastructure.database import MySQLConnectionPool, RequestUnitOfWork, MigrationRunner, QueryPlanChecker
+
+DATABASE = os.environ.get('QUERY_PLAN_DATABASE')
+
+pytestmark = pytest.mark.skipif(not DATABASE, reason='QUERY_PLAN_DATABASE is not set (no seeded local MySQL)')
+
+
+@pytest.fixture(scope='module')
+def unit_of_work():
+    pool = MySQLConnectionPool({**MYSQL_CONFIG, 'database': DATABASE}, pool_size=2)
+    try:
+        pool.get_connection().close()
+    except Exception as e:
+        pytest.skip(f"MySQL database {DATABASE!r} is not reachable: {e}")
+    yield RequestUnitOfWork(pool)
+    pool.close_all()
+
+
+def test_schema_is_migrated(unit_of_work):
+    pending = MigrationRunner(unit_of_work).pending()
+    assert not pending, f"Unapplied migrations: {[migration.version for migration in pending]}"
+
+
+def test_no_query_plan_regressions(unit_of_work):
+    report = QueryPlanChecker(unit_of_work).run()
+    problems = [
+        f"{statement.case}: {'; '.join(statement.problems)} -- {statement.sql[:120]}"
+        for statement in report.failures
+    ]
+    assert not report.errors, "Cases that raised:\n" + "\n".join(report.errors)
+    assert not report.unchecked, f"Repository methods without a plan case: {report.unchecked}"
+    assert not problems, "Plan regressions:\n" + "\n".join(problems)
@@ -0,0 +1,462 @@
+"""Tests for the in-memory catalog indexes"""
+import math
+import random
+from datetime import datetime, timedelta
+import pytest
+from src.domain.entities import Product, ProductFilter, ProductSort
+from src.infrastructure.cache import SearchResultCache
+from src.infrastructure.search import (
+    InvertedProductIndex, TrigramProductIndex, PrefixSuggestionIndex, FacetIndex, SalesRanking, CatalogRefresher,
+    RecommendationIndex, SimilarProductsIndex, substring_edit_distance, id_order
+)
+from src.infrastructure.search.recommendation_index import SERIES_SCORES, NEED_BONUS
+
+
+def product(product_id, name, price=1_000_000, category_id=1, stock=5, best_seller=0, description=''):
+    return Product(id=product_id, name=name, description=description, price=price, category_id=category_id,
+                   stock_quantity=stock, bestSeller=best_seller)
+
+
+# BM25
+
+@pytest.fixture
+def search_index():
+    index = InvertedProductIndex()
+    index.load([
+        product('1', 'Samsung Galaxy S24 Ultra', description='Camera 200MP'),
+        product('2', 'Samsung Galaxy A55', description='Pin trâu, camera tốt'),
+        product('3', 'Ốp lưng Galaxy', description='Phụ kiện cho S24 Ultra'),
+        product('SM-Z6', 'Galaxy Z Fold6', description='Điện thoại gập'),
+    ])
+    return index
+
+
+def test_bm25_requires_every_term(search_index):
+    assert search_index.search('galaxy a55') == ['2']
+
+
+def test_bm25_name_outranks_description(search_index):
+    # "ultra" is in the name of 1 and only in the description of 3
+    assert search_index.search('s24 ultra')[:2] == ['1', '3']
+
+
+def test_bm25_score_matches_formula():
+    index = InvertedProductIndex()
+    index.load([product('1', 'alpha beta'), product('2', 'gamma')])
+    # tf = NAME_WEIGHT, doc length 6 vs average 4.5, df = 1 of N = 2
+    tf, avg_len, doc_len = index.NAME_WEIGHT, 4.5, 6
+    idf = math.log(1 + (2 - 1 + 0.5) / (1 + 0.5))
+    norm = index.K1 * (1 - index.B + index.B * doc_len / avg_len)
+    expected = idf * tf * (index.K1 + 1) / (tf + norm)
+    assert index._score_term('alpha', 2, avg_len)['1'] == pytest.approx(expected)
+
+
+def test_bm25_folds_diacritics_and_expands_last_prefix(search_index):
+    assert search_index.search('dien thoai') == ['SM-Z6']
+    assert '1' in search_index.search('galaxy s2')
+
+
+def test_bm25_falls_back_to_any_term(search_index):
+    assert search_index.search('fold6 iphone') == ['SM-Z6']
+    assert search_index.unmatched_terms('fold6 iphone') == ['iphone']
+
+
+def test_bm25_reindex_and_remove(search_index):
+    search_index.index_product(product('2', 'Samsung Galaxy A56'))
+    assert search_index.search('a55') == []
+    assert search_index.search('a56') == ['2']
+    search_index.remove_product('2')
+    assert search_index.search('a56') == []
+    assert not search_index.is_empty()
+
+
+# Trigram matching
+
+@pytest.mark.parametrize('pattern, text, distance', [
+    ('ultra', 'galaxys24ultra', 0),
+    ('ulta', 'galaxys24ultra', 1),
+    ('galaxi', 'galaxya35', 1),
+    ('', 'anything', 0),
+    ('abc', '', 3),
+])
+def test_substring_edit_distance(pattern, text, distance):
+    assert substring_edit_distance(pattern, text) == distance
+
+
+@pytest.fixture
+def fuzzy_index():
+    index = TrigramProductIndex()
+    index.load([
+        product('1', 'Galaxy S24 Ultra'),
+        product('2', 'Galaxy Z Fold5'),
+        product('3', 'Galaxy A35'),
+        product('SM-X', 'Galaxy Tab S9'),
+    ])
+    return index
+
+
+def test_trigram_tolerates_typos_and_spacing(fuzzy_index):
+    assert fuzzy_index.search('s24 ulta')[0] == '1'
+    assert fuzzy_index.search('zfold')[0] == '2'
+    assert fuzzy_index.search('galaxi a35')[0] == '3'
+
+
+def test_trigram_rejects_unrelated_queries(fuzzy_index):
+    assert fuzzy_index.search('iphone') == []
+    assert fuzzy_index.search('ab') == []  # too short for a trigram
+
+
+def test_trigram_string_ids_and_tombstones(fuzzy_index):
+    assert fuzzy_index.search('tab s9') == ['SM-X']
+    fuzzy_index.remove_product('SM-X')
+    assert fuzzy_index.search('tab s9') == []
+    fuzzy_index.index_product(product('SM-X', 'Galaxy Tab S10'))
+    assert fuzzy_index.search('tab s10') == ['SM-X']
+    assert fuzzy_index.get_stats()['tombstones'] == 1
+
+
+# Suggestions
+
+def test_suggestions_rank_the_whole_prefix_range():
+    index = PrefixSuggestionIndex()
+    # 800 keys start with "case"; the bestseller sorts last among them
+    catalog = [product(str(i), f'Case {i:04d}') for i in range(800)]
+    catalog.append(product('900', 'Case zz Bestseller', best_seller=1))
+    index.load(catalog)
+    top = index.suggest('cas', 3)
+    assert top[0].target_id == '900'
+    assert all(isinstance(suggestion.target_id, str) for suggestion in top)
+
+    index.remove_product('900')
+    assert index.suggest('cas', 1)[0].target_id != '900'
+
+
+def test_suggestions_put_categories_first():
+    index = PrefixSuggestionIndex()
+    phone = product('1', 'Phone X')
+    phone.category_name = 'Phones'
+    index.load([phone])
+    assert [(s.kind, s.target_id) for s in index.suggest('pho')] == [('category', '1'), ('product', '1')]
+
+
+# Facets
+
+class UnitsSold:
+    """Order repository double for SalesRanking"""
+
+    def __init__(self, units):
+        self.units = units
+
+    def get_units_sold(self, since):
+        return dict(self.units)
+
+
+CATALOG = [
+    product('1', 'A', price=3_000_000, category_id=1, stock=0),
+    product('2', 'B', price=7_000_000, category_id=1, best_seller=1),
+    product('9', 'C', price=15_000_000, category_id=2),
+    product('10', 'D', price=25_000_000, category_id=2, best_seller=1),
+    product('SM-1', 'E', price=35_000_000, category_id=3, stock=0),
+]
+
+
+@pytest.fixture
+def facets():
+    ranking = SalesRanking(UnitsSold({'9': 4, 'SM-1': 4}))
+    ranking.load(CATALOG)
+    index = FacetIndex(sales_ranking=ranking)
+    index.load(CATALOG)
+    return index, ranking
+
+
+def ids(rows):
+    return [product_id for product_id, _ in rows]
+
+
+def test_facet_counts_apply_every_other_filter(facets):
+    index, _ = facets
+    rows, counts = index.query(ProductFilter(category_id=1, in_stock=True), ProductSort.NEWEST, None, 10)
+    assert ids(rows) == ['2']
+    assert counts['total'] == 1
+    # Category counts ignore the category filter but keep in_stock
+    assert counts['categories'] == {1: 1, 2: 2, 3: 0}
+    # in_stock count ignores in_stock but keeps the category
+    assert counts['in_stock'] == 1
+    assert counts['price_bands']['5-10tr'] == 1
+    assert counts['bestseller'] == 1
+
+
+def test_facet_price_band_and_range(facets):
+    index, _ = facets
+    assert ids(index.query(ProductFilter(price_band='10-20tr'), ProductSort.NEWEST, None, 10)[0]) == ['9']
+    rows, _ = index.query(ProductFilter(min_price=7_000_000, max_price=25_000_000), ProductSort.PRICE_ASC, None, 10)
+    assert ids(rows) == ['2', '9']
+
+
+def test_facet_newest_order_matches_sql_sort_id(facets):
+    index, _ = facets
+    # ORDER BY sort_id DESC, id DESC: numeric ids by value, non-numeric ids (sort_id 0) last
+    assert ids(index.query(ProductFilter(), ProductSort.NEWEST, None, 10)[0]) == ['10', '9', '2', '1', 'SM-1']
+    assert id_order('10') > id_order('9') > id_order('SM-1')
+
+
+@pytest.mark.parametrize('sort', list(ProductSort))
+def test_facet_keyset_pages_cover_the_listing_once(facets, sort):
+    index, _ = facets
+    everything = ids(index.query(ProductFilter(), sort, None, 10)[0])
+    paged, after = [], None
+    while True:
+        rows, _ = index.query(ProductFilter(), sort, after, 2)
+        paged.extend(ids(rows))
+        if len(rows) < 2:
+            break
+        after = rows[-1][1]
+        assert after[-1] == rows[-1][0]  # cursors end with the plain product id
+    assert paged == everything
+    assert sorted(paged) == sorted(p.id for p in CATALOG)
+
+
+def test_facet_bestseller_follows_sales_ranking(facets):
+    index, ranking = facets
+    order = ids(index.query(ProductFilter(), ProductSort.BESTSELLER, None, 10)[0])
+    assert order[:2] == ['9', 'SM-1']
+    ranking.record_sales({'1': 10})
+    assert ids(index.query(ProductFilter(), ProductSort.BESTSELLER, None, 1)[0]) == ['1']
+
+
+def test_facet_bestseller_cursor_has_the_sql_key_shape(facets):
+    index, _ = facets
+    rows, _ = index.query(ProductFilter(), ProductSort.BESTSELLER, None, 2)
+    assert rows[0][1] == [4, 0, '9']
+    assert rows[1][1] == ProductSort.BESTSELLER.key_of(CATALOG[4], units_sold=4)
+    after, _ = index.query(ProductFilter(), ProductSort.BESTSELLER, rows[1][1], 10)
+    assert ids(after) == ['10', '2', '1']
+    # A SQL-built cursor (no sales known) continues among the products without sales
+    sql_cursor = ProductSort.BESTSELLER.key_of(CATALOG[3])
+    assert ids(index.query(ProductFilter(), ProductSort.BESTSELLER, sql_cursor, 10)[0]) == ['2', '1']
+
+
+def test_sales_ranking_moves_only_changed_products():
+    ranking = SalesRanking(UnitsSold({'1': 2, '2': 1}))
+    ranking.load(CATALOG)
+    assert ranking.top(3) == ['1', '2', '10']  # then the manual flag, then newest
+    version = ranking.version()
+    ranking.record_sales({'9': 5})
+    assert ranking.top(2) == ['9', '1']
+    assert ranking.changes_since(version) == {'9': 5}
+    assert ranking.changes_since(ranking.version()) == {}
+
+
+def test_sales_ranking_cancellation_and_window():
+    ranking = SalesRanking(UnitsSold({'1': 2}), window_days=30)
+    ranking.load(CATALOG)
+    ranking.record_sales({'1': -2}, datetime.now() - timedelta(days=1))  # cancelled recent order
+    assert ranking.units_sold() == {}
+    assert ranking.top(1) == ['10']
+    ranking.record_sales({'2': -1}, datetime.now() - timedelta(days=45))  # outside the window: never counted
+    ranking.record_sales({'2': 3}, datetime.now() - timedelta(days=45))
+    assert ranking.units_sold() == {}
+    ranking.record_sales({'2': 3})
+    assert ranking.top(1) == ['2']
+
+
+def test_sales_ranking_reload_drops_the_change_log():
+    ranking = SalesRanking(UnitsSold({}))
+    ranking.load(CATALOG)
+    version = ranking.version()
+    ranking.record_sales({'1': 1})
+    ranking.load(CATALOG)
+    assert ranking.changes_since(version) is None  # readers must re-sort
+
+
+def test_facet_updates_masks_in_place(facets):
+    index, _ = facets
+    index.stock_changed({'1': 3})
+    assert '1' in ids(index.query(ProductFilter(in_stock=True), ProductSort.NEWEST, None, 10)[0])
+    index.remove_product('9')
+    _, counts = index.query(ProductFilter(), ProductSort.NEWEST, None, 10)
+    assert counts['total'] == 4
+    assert counts['categories'][2] == 1
+    for i in range(100):  # grows past the initial capacity
+        index.index_product(product(f'N{i}', 'New', category_id=4))
+    _, counts = index.query(ProductFilter(category_id=4), ProductSort.NEWEST, None, 10)
+    assert counts['total'] == 100
+
+
+def test_facet_name_query(facets):
+    index, _ = facets
+    index.index_product(product('11', 'Điện thoại Galaxy'))
+    assert ids(index.query(ProductFilter(name_query='dien THOAI'), ProductSort.NEWEST, None, 10)[0]) == ['11']
+
+
+# Refresher
+
+class RacingCatalog:
+    """Catalog whose snapshot read is overtaken by writes (they land between the read and the swap)"""
+
+    def __init__(self, products, during_read):
+        self.products = products
+        self.during_read = during_read
+
+    def get_search_documents(self):
+        snapshot = list(self.products)
+        self.during_read()
+        return snapshot
+
+
+def test_refresher_replays_changes_made_during_a_rebuild():
+    index, cache = InvertedProductIndex(), SearchResultCache()
+    refresher = CatalogRefresher(None, [index], caches=[cache])
+    refresher.product_repository = RacingCatalog(
+        [product('1', 'Galaxy S24'), product('2', 'Galaxy A55')],
+        lambda: (refresher.index_product(product('3', 'Galaxy Tab')), refresher.remove_product('2'))
+    )
+    assert cache.get_or_compute('galaxy', lambda: ['stale']) == ['stale']
+
+    assert refresher.refresh()
+    assert sorted(index.search('galaxy')) == ['1', '3']
+    assert cache.get_or_compute('galaxy', lambda: index.search('galaxy')) != ['stale']
+
+    # Once the rebuild is over, changes apply directly and are no longer journaled
+    refresher.index_product(product('4', 'Galaxy Watch'))
+    assert '4' in index.search('galaxy')
+    assert refresher.get_stats()['replayed_changes'] == 2
+
+
+def test_refresher_applies_stock_changes_once():
+    index = FacetIndex()
+    refresher = CatalogRefresher(None, [index])
+    refresher.product_repository = RacingCatalog([product('1', 'A', stock=1)],
+                                                 lambda: refresher.stock_changed({'1': -1}))
+    refresher.refresh()
+    assert ids(index.query(ProductFilter(in_stock=True), ProductSort.NEWEST, None, 10)[0]) == []
+    refresher.stock_changed({'1': 1})
+    assert ids(index.query(ProductFilter(in_stock=True), ProductSort.NEWEST, None, 10)[0]) == ['1']
+
+
+def test_sales_recorded_while_the_window_is_read_survive_the_reload():
+    ranking = SalesRanking(None)
+
+    class RacingSales:
+        def get_units_sold(self, since):
+            ranking.record_sales({'2': 5})  # an order committed after the GROUP BY read
+            return {'1': 3}
+
+    ranking.order_repository = RacingSales()
+    ranking.load(CATALOG)
+    assert ranking.units_sold() == {'1': 3, '2': 5}
+    assert ranking.top(2) == ['2', '1']
+
+
+# Recommendations
+
+@pytest.fixture
+def recommendations():
+    index = RecommendationIndex()
+    index.load([
+        product('1', 'Galaxy S24 Ultra', price=30_000_000),
+        product('2', 'Galaxy S24', price=20_000_000),
+        product('3', 'Galaxy A55', price=10_000_000),
+        product('4', 'Galaxy Z Fold6', price=40_000_000),
+        product('5', 'Galaxy A15', price=5_000_000, stock=0),
+    ])
+    return index
+
+
+def rec_ids(picks):
+    return [pick.id for pick in picks]
+
+
+def test_recommend_budget_window_prefers_stock(recommendations):
+    assert rec_ids(recommendations.recommend(max_price=12_000_000)) == ['3']
+    # Nothing in stock in the window: show it anyway
+    picks = recommendations.recommend(max_price=6_000_000)
+    assert rec_ids(picks) == ['5'] and not picks[0].in_stock
+    assert rec_ids(recommendations.recommend(min_price=15_000_000, max_price=35_000_000)) == ['2', '1']
+
+
+def test_recommend_need_and_series(recommendations):
+    picks = recommendations.recommend(need='camera')
+    assert rec_ids(picks) == ['1', '2', '4']
+    assert picks[0].score == SERIES_SCORES['S'] + NEED_BONUS['camera']
+    assert rec_ids(recommendations.recommend(series='z')) == ['4']
+
+
+def test_recommend_model_query_ignores_common_tokens(recommendations):
+    assert rec_ids(recommendations.recommend(query='gia s24 ultra')) == ['1', '2']
+    # One hit each: base models (shorter names) first, then the cheaper one
+    assert rec_ids(recommendations.recommend(query='so sanh s24 va a55')) == ['3', '2', '1']
+    assert recommendations.recommend(query='galaxy') == []
+
+
+def test_recommend_follows_stock_and_product_changes(recommendations):
+    recommendations.stock_changed({'5': 2})
+    assert rec_ids(recommendations.recommend(max_price=12_000_000)) == ['5', '3']
+    recommendations.index_product(product('3', 'Galaxy A55', price=50_000_000))
+    recommendations.remove_product('1')
+    assert rec_ids(recommendations.recommend(max_price=12_000_000)) == ['5']
+    assert rec_ids(recommendations.recommend(query='s24 ultra')) == ['2']
+
+
+# Similar products
+
+def catalog(count, seed):
+    rng = random.Random(seed)
+    models = ['Galaxy S24', 'Galaxy A55', 'Galaxy Z Fold6', 'Galaxy Tab S9', 'Ốp lưng', 'Sạc nhanh', 'Tai nghe Buds']
+    return [product(str(i), f'{rng.choice(models)} {rng.choice(["Ultra", "Plus", "Mini", ""])}',
+                    price=rng.choice([300_000, 5_000_000, 12_000_000, 25_000_000]),
+                    category_id=rng.randint(1, 4), best_seller=rng.randint(0, 1))
+            for i in range(count)]
+
+
+def neighbour_scores(index, products):
+    """Similarity of each product's neighbours, best first (ties may pick different ids)"""
+    features = {p.id: index._features(p) for p in products}
+    return {p.id: [round(float(features[p.id] @ features[other]), 5) for other in index.similar_to(p.id, index.k)]
+            for p in products}
+
+
+def test_similar_products_incremental_updates_match_a_full_build():
+    rng = random.Random(7)
+    products = {p.id: p for p in catalog(60, seed=1)}
+    index = SimilarProductsIndex(k=4)
+    index.load(list(products.values()))
+    extra = iter(catalog(100, seed=2))
+    for step in range(40):
+        action = rng.random()
+        if action < 0.4:
+            added = next(extra)
+            added.id = f'N{step}'
+            products[added.id] = added
+            index.index_product(added)
+        elif action < 0.7:
+            changed = rng.choice(catalog(1, seed=step))
+            changed.id = rng.choice(list(products))
+            products[changed.id] = changed
+            index.index_product(changed)
+        else:
+            removed = rng.choice(list(products))
+            del products[removed]
+            index.remove_product(removed)
+
+        rebuilt = SimilarProductsIndex(k=4)
+        rebuilt.load(list(products.values()))
+        assert neighbour_scores(index, products.values()) == neighbour_scores(rebuilt, products.values())
+
+
+def test_similar_products_rescore_only_affected_rows():
+    products = [product(str(i), f'Ốp lưng {i}', price=300_000, category_id=1) for i in range(20)]
+    products.append(product('phone', 'Galaxy S24 Ultra', price=25_000_000, category_id=2))
+    index = SimilarProductsIndex(k=3)
+    index.load(products)
+    rescored = []
+    original = index._top_k
+    index._top_k = lambda rows: (rescored.append(len(rows)), original(rows))
+
+    index.index_product(product('phone2', 'Galaxy S24', price=25_000_000, category_id=2))
+    assert rescored == [2]
+    assert index.similar_to('phone') == ['phone2'] and index.similar_to('phone2') == ['phone']
+    assert 'phone2' not in index.similar_to('0')
+
+    index.remove_product('phone2')
+    assert index.similar_to('phone') == [] and index.similar_to('phone2') == []
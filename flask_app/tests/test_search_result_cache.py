@@ -0,0 +1,65 @@
+"""Tests for the search result cache"""
+import threading
+import time
+from src.infrastructure.cache.search_result_cache import SearchResultCache
+
+
+def test_equivalent_queries_share_one_entry():
+    cache = SearchResultCache()
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return ['1', '2']
+
+    assert cache.get_or_compute('  Điện Thoại ', compute) == ['1', '2']
+    assert cache.get_or_compute('dien thoai', compute) == ['1', '2']
+    assert cache.get_or_compute('dien thoai', compute, limit=5) == ['1', '2']
+    assert len(calls) == 2  # the limit is part of the key
+
+
+def test_concurrent_misses_compute_once():
+    cache = SearchResultCache()
+    started, release = threading.Event(), threading.Event()
+    calls, results = [], []
+
+    def compute():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return ['7']
+
+    leader = threading.Thread(target=lambda: results.append(cache.get_or_compute('phone', compute)))
+    leader.start()
+    started.wait(5)
+    waiters = [threading.Thread(target=lambda: results.append(cache.get_or_compute('Phone', compute)))
+               for _ in range(3)]
+    for waiter in waiters:
+        waiter.start()
+    for _ in range(5000):
+        if cache.coalesced == 3:
+            break
+        time.sleep(0.001)
+    release.set()
+    for thread in [leader] + waiters:
+        thread.join(5)
+
+    assert calls == [1]
+    assert results == [['7']] * 4
+    assert cache.get_stats()['coalesced'] == 3
+
+
+def test_failed_search_is_not_cached_and_does_not_block():
+    cache = SearchResultCache()
+    assert cache.get_or_compute('tv', lambda: None) is None
+    assert cache.get_or_compute('tv', lambda: ['3']) == ['3']
+
+
+def test_product_write_makes_every_result_stale():
+    cache = SearchResultCache()
+    cache.get_or_compute('tv', lambda: ['3'])
+    cache.index_product(None)
+    assert cache.get_or_compute('tv', lambda: ['4']) == ['4']
+    cache.remove_product('4')
+    assert cache.get_or_compute('tv', lambda: []) == []
+    assert cache.get_stats()['version'] == 2
@@ -0,0 +1,141 @@
+"""Tests for the request-scoped unit of work"""
+import pytest
+from flask import Flask
+from src.infrastructure.database import UnitOfWorkError
+from src.infrastructure.database.connection_pool import MySQLConnectionPool
+from src.infrastructure.database.unit_of_work import RequestUnitOfWork
+
+
+class FakeConnection:
+    """Raw connection double that records transaction calls"""
+
+    def __init__(self):
+        self.calls = []
+        self.unread_result = False
+        self.in_transaction = False
+        self.autocommit = False
+
+    def start_transaction(self):
+        self.calls.append('begin')
+        self.in_transaction = True
+
+    def commit(self):
+        self.calls.append('commit')
+        self.in_transaction = False
+
+    def rollback(self):
+        self.calls.append('rollback')
+        self.in_transaction = False
+
+    def close(self):
+        self.calls.append('close')
+
+
+class FakePool(MySQLConnectionPool):
+    """Real pool bookkeeping over FakeConnections"""
+
+    def __init__(self):
+        super().__init__({}, pool_size=4)
+        self.opened = []
+
+    def _connect(self):
+        raw = FakeConnection()
+        self.opened.append(raw)
+        return raw
+
+
+@pytest.fixture
+def setup():
+    pool = FakePool()
+    unit_of_work = RequestUnitOfWork(pool)
+    app = Flask(__name__)
+    unit_of_work.init_app(app)
+    return app, pool, unit_of_work
+
+
+def test_request_shares_one_connection_and_commits_after_the_view(setup):
+    app, pool, unit_of_work = setup
+    ran = []
+
+    @app.route('/')
+    def view():
+        assert unit_of_work.get_connection() is unit_of_work.get_connection()
+        unit_of_work.after_commit(lambda: ran.append('callback'))
+        assert unit_of_work.has_pending_commit()
+        assert ran == []
+        return 'ok'
+
+    assert app.test_client().get('/').status_code == 200
+    assert len(pool.opened) == 1
+    assert pool.opened[0].calls[:2] == ['begin', 'commit']
+    assert ran == ['callback']
+    assert pool.get_stats()['in_use'] == 0
+
+
+def test_server_error_rolls_back_and_drops_callbacks(setup):
+    app, pool, unit_of_work = setup
+    ran = []
+
+    @app.route('/')
+    def view():
+        unit_of_work.get_connection()
+        unit_of_work.after_commit(lambda: ran.append('callback'))
+        raise RuntimeError('boom')
+
+    assert app.test_client().get('/').status_code == 500
+    assert 'commit' not in pool.opened[0].calls
+    assert ran == []
+
+
+def test_rollback_only_unit_is_never_committed(setup):
+    app, pool, unit_of_work = setup
+    ran = []
+
+    @app.route('/')
+    def view():
+        unit_of_work.get_connection()
+        unit_of_work.after_commit(lambda: ran.append('before'))
+        unit_of_work.rollback()  # what a repository does when a statement fails
+        unit_of_work.after_commit(lambda: ran.append('after'))
+        with pytest.raises(UnitOfWorkError):
+            unit_of_work.commit()
+        return 'ok'
+
+    assert app.test_client().get('/').status_code == 200
+    assert 'commit' not in pool.opened[0].calls
+    assert ran == []
+
+
+def test_explicit_commit_runs_callbacks_and_starts_a_new_transaction(setup):
+    app, pool, unit_of_work = setup
+    ran = []
+
+    @app.route('/')
+    def view():
+        unit_of_work.get_connection()
+        unit_of_work.after_commit(lambda: ran.append('callback'))
+        unit_of_work.commit()
+        assert ran == ['callback']
+        return 'ok'
+
+    app.test_client().get('/')
+    assert pool.opened[0].calls[:4] == ['begin', 'commit', 'begin', 'commit']
+    assert ran == ['callback']
+
+
+def test_app_context_without_request_uses_per_call_connections(setup):
+    app, pool, unit_of_work = setup
+    ran = []
+    with app.app_context():
+        first = unit_of_work.get_connection()
+        first.commit()
+        first.close()
+        unit_of_work.after_commit(lambda: ran.append('callback'))
+        assert ran == ['callback']
+        assert not unit_of_work.has_pending_commit()
+        unit_of_work.rollback()  # nothing shared to mark
+        second = unit_of_work.get_connection()
+        second.close()
+    assert pool.opened[0].calls[:1] == ['commit']
+    assert 'begin' not in pool.opened[0].calls
+    assert pool.get_stats()['in_use'] == 0